@@ -13,28 +13,51 @@ import alembic_pg_autogen.compare_check_constraints as _compare_check_constraint
 # ``alembic_pg_autogen.ops``.  Without it Alembic raises "no dispatch function for object" while rendering the
 # migration script.
 import alembic_pg_autogen.render  # noqa: F401  # pyright: ignore[reportUnusedImport]
+from alembic_pg_autogen.cache import CanonicalizationCache, SnapshotCache
 from alembic_pg_autogen.canonicalize import (
-    CanonicalState,
+    apply_baseline,
     canonicalize,
+    canonicalize_all_check_constraints,
     canonicalize_check_constraints,
     canonicalize_functions,
     canonicalize_triggers,
     canonicalize_views,
 )
+from alembic_pg_autogen.changes import (
+    CatalogVersion,
+    catalog_version,
+    install_change_counter,
+    uninstall_change_counter,
+)
 from alembic_pg_autogen.compare import SQLCreatable, setup
-from alembic_pg_autogen.diff import Action, DiffResult, FunctionOp, TriggerOp, ViewOp, diff
+from alembic_pg_autogen.ddl import ParsedDDL, parse_ddl
+from alembic_pg_autogen.diff import Action, DiffResult, FunctionOp, TriggerOp, ViewOp, diff, iter_diff
 from alembic_pg_autogen.inspect import (
+    CanonicalState,
     CheckConstraintInfo,
     FunctionInfo,
     TriggerInfo,
     ViewInfo,
+    catalog_record,
+    copy_catalog,
+    copy_functions,
+    copy_triggers,
+    copy_views,
     current_schema,
+    definition_digest,
+    inspect_catalog,
     inspect_check_constraints,
     inspect_functions,
     inspect_triggers,
     inspect_views,
+    iter_check_constraints,
+    iter_functions,
+    iter_triggers,
+    iter_views,
 )
+from alembic_pg_autogen.observe import Observer, Phase, add_observer, remove_observer
 from alembic_pg_autogen.ops import (
+    AlterFunctionOp,
     CreateFunctionOp,
     CreateTriggerOp,
     CreateViewOp,
@@ -45,7 +68,18 @@ from alembic_pg_autogen.ops import (
     ReplaceTriggerOp,
     ReplaceViewOp,
 )
+from alembic_pg_autogen.parallel import inspect_catalog_parallel, sibling_connection
+from alembic_pg_autogen.queries import (
+    CallSiteSummary,
+    QueryBudget,
+    QueryBudgetExceeded,
+    QueryRecord,
+    QueryRecorder,
+    query_budget,
+)
+from alembic_pg_autogen.replica import HotStandby, replay_lag
 from alembic_pg_autogen.sentinels import IGNORED, Ignored
+from alembic_pg_autogen.shadow import ShadowDatabase
 
 _Plugin.setup_plugin_from_module(_compare_mod, "alembic_pg_autogen.compare")
 _Plugin.setup_plugin_from_module(_compare_check_constraints_mod, "alembic_pg_autogen.checkconstraints")
@@ -56,7 +90,11 @@ if TYPE_CHECKING:
 
 __all__: Final[Sequence[str]] = [
     "Action",
+    "AlterFunctionOp",
+    "CallSiteSummary",
     "CanonicalState",
+    "CanonicalizationCache",
+    "CatalogVersion",
     "CheckConstraintInfo",
     "CreateFunctionOp",
     "CreateTriggerOp",
@@ -67,26 +105,60 @@ __all__: Final[Sequence[str]] = [
     "DropViewOp",
     "FunctionInfo",
     "FunctionOp",
+    "HotStandby",
     "IGNORED",
     "Ignored",
+    "Observer",
+    "ParsedDDL",
+    "Phase",
+    "QueryBudget",
+    "QueryBudgetExceeded",
+    "QueryRecord",
+    "QueryRecorder",
     "ReplaceFunctionOp",
     "ReplaceTriggerOp",
     "ReplaceViewOp",
     "SQLCreatable",
+    "ShadowDatabase",
+    "SnapshotCache",
     "TriggerInfo",
     "TriggerOp",
     "ViewInfo",
     "ViewOp",
+    "add_observer",
+    "apply_baseline",
     "canonicalize",
+    "canonicalize_all_check_constraints",
     "canonicalize_check_constraints",
     "canonicalize_functions",
     "canonicalize_triggers",
     "canonicalize_views",
+    "catalog_record",
+    "catalog_version",
+    "copy_catalog",
+    "copy_functions",
+    "copy_triggers",
+    "copy_views",
     "current_schema",
+    "definition_digest",
     "diff",
+    "inspect_catalog",
+    "inspect_catalog_parallel",
     "inspect_check_constraints",
     "inspect_functions",
     "inspect_triggers",
     "inspect_views",
+    "install_change_counter",
+    "iter_check_constraints",
+    "iter_diff",
+    "iter_functions",
+    "iter_triggers",
+    "iter_views",
+    "parse_ddl",
+    "query_budget",
+    "remove_observer",
+    "replay_lag",
     "setup",
+    "sibling_connection",
+    "uninstall_change_counter",
 ]
@@ -0,0 +1,190 @@
+"""Asyncio counterparts of the inspection and canonicalization helpers, for SQLAlchemy's ``AsyncConnection``.
+
+Each helper runs its synchronous namesake through :meth:`AsyncConnection.run_sync
+<sqlalchemy.ext.asyncio.AsyncConnection.run_sync>`, which suspends the coroutine at every round trip rather than
+blocking the event loop, so helpers awaited together on different connections overlap.  :func:`diff_database` uses
+that to inspect the current state and canonicalize the desired one at the same time::
+
+    async with engine.connect() as conn, engine.connect() as scratch:
+        result = await aio.diff_database(
+            conn, function_ddl=PG_FUNCTIONS, schemas=["app"], canonicalize_conn=scratch
+        )
+
+Inside ``alembic revision --autogenerate`` nothing here is needed: Alembic's async ``env.py`` template runs the
+migration context through ``run_sync``, so the comparators receive a synchronous connection as usual.
+
+Requires SQLAlchemy's asyncio extra (``greenlet``) and an async driver such as asyncpg or psycopg 3.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from alembic_pg_autogen import inspect as _inspect
+from alembic_pg_autogen.canonicalize import canonicalize as _canonicalize
+from alembic_pg_autogen.canonicalize import canonicalize_all_check_constraints as _canonicalize_all_check_constraints
+from alembic_pg_autogen.compare import filter_to_schemas, with_undeclared_overloads
+from alembic_pg_autogen.diff import diff
+from alembic_pg_autogen.sentinels import IGNORED
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+    from alembic_pg_autogen.cache import CanonicalizationCache
+    from alembic_pg_autogen.ddl import ParsedDDL
+    from alembic_pg_autogen.diff import DiffResult
+    from alembic_pg_autogen.inspect import CanonicalState, CheckConstraintInfo, FunctionInfo, TriggerInfo, ViewInfo
+    from alembic_pg_autogen.sentinels import Ignored
+
+log = logging.getLogger(__name__)
+
+
+async def current_schema(conn: AsyncConnection) -> str:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.current_schema`."""
+    return await conn.run_sync(_inspect.current_schema)
+
+
+async def inspect_catalog(
+    conn: AsyncConnection,
+    schemas: Sequence[str] | None = None,
+    *,
+    functions: bool = True,
+    triggers: bool = True,
+    views: bool = True,
+    function_identities: Sequence[tuple[str | None, str]] | None = None,
+    trigger_identities: Sequence[tuple[str | None, str, str]] | None = None,
+    view_identities: Sequence[tuple[str | None, str]] | None = None,
+    digests: bool = False,
+    baseline: CanonicalState | None = None,
+    shard: tuple[int, int] | None = None,
+) -> CanonicalState:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.inspect_catalog`."""
+    return await conn.run_sync(
+        _inspect.inspect_catalog,
+        schemas,
+        functions=functions,
+        triggers=triggers,
+        views=views,
+        function_identities=function_identities,
+        trigger_identities=trigger_identities,
+        view_identities=view_identities,
+        digests=digests,
+        baseline=baseline,
+        shard=shard,
+    )
+
+
+async def inspect_functions(conn: AsyncConnection, schemas: Sequence[str] | None = None) -> Sequence[FunctionInfo]:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.inspect_functions`."""
+    return await conn.run_sync(_inspect.inspect_functions, schemas)
+
+
+async def inspect_triggers(conn: AsyncConnection, schemas: Sequence[str] | None = None) -> Sequence[TriggerInfo]:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.inspect_triggers`."""
+    return await conn.run_sync(_inspect.inspect_triggers, schemas)
+
+
+async def inspect_views(conn: AsyncConnection, schemas: Sequence[str] | None = None) -> Sequence[ViewInfo]:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.inspect_views`."""
+    return await conn.run_sync(_inspect.inspect_views, schemas)
+
+
+async def inspect_check_constraints(
+    conn: AsyncConnection, schemas: Sequence[str] | None = None, table_names: Sequence[str] | None = None
+) -> Sequence[CheckConstraintInfo]:
+    """Async counterpart of :func:`~alembic_pg_autogen.inspect.inspect_check_constraints`."""
+    return await conn.run_sync(_inspect.inspect_check_constraints, schemas, table_names)
+
+
+async def canonicalize(
+    conn: AsyncConnection,
+    *,
+    function_ddl: Sequence[str | ParsedDDL] | Ignored = (),
+    view_ddl: Sequence[str | ParsedDDL] | Ignored = (),
+    trigger_ddl: Sequence[str | ParsedDDL] | Ignored = (),
+    schemas: Sequence[str] | None = None,
+    declared_only: bool = False,
+    baseline: CanonicalState | None = None,
+    cache: CanonicalizationCache | None = None,
+) -> CanonicalState:
+    """Async counterpart of :func:`~alembic_pg_autogen.canonicalize.canonicalize`."""
+    return await conn.run_sync(
+        _canonicalize,
+        function_ddl=function_ddl,
+        view_ddl=view_ddl,
+        trigger_ddl=trigger_ddl,
+        schemas=schemas,
+        declared_only=declared_only,
+        baseline=baseline,
+        cache=cache,
+    )
+
+
+async def canonicalize_all_check_constraints(
+    conn: AsyncConnection,
+    tables: Mapping[tuple[str | None, str], Mapping[str, str]],
+    *,
+    shadow: bool = False,
+) -> dict[tuple[str | None, str], Mapping[str, str]]:
+    """Async counterpart of :func:`~alembic_pg_autogen.canonicalize.canonicalize_all_check_constraints`."""
+    return await conn.run_sync(_canonicalize_all_check_constraints, tables, shadow=shadow)
+
+
+async def diff_database(
+    conn: AsyncConnection,
+    *,
+    function_ddl: Sequence[str | ParsedDDL] | Ignored = IGNORED,
+    view_ddl: Sequence[str | ParsedDDL] | Ignored = IGNORED,
+    trigger_ddl: Sequence[str | ParsedDDL] | Ignored = IGNORED,
+    schemas: Sequence[str] | None = None,
+    canonicalize_conn: AsyncConnection | None = None,
+) -> DiffResult:
+    """Diff the database behind *conn* against the declared DDL, the way the autogenerate comparator does.
+
+    An object type left :data:`~alembic_pg_autogen.IGNORED` is neither inspected nor diffed.  Every other object in
+    *schemas* that the DDL does not declare is dropped, except undeclared overloads of a declared function name.
+
+    Args:
+        conn: The connection whose database is inspected.
+        function_ddl: The desired functions, as for :func:`canonicalize`.
+        view_ddl: The desired views.
+        trigger_ddl: The desired triggers.
+        schemas: The schemas to diff.  When *None*, all user schemas are included.
+        canonicalize_conn: A second connection to the same database.  When given, the DDL is canonicalized on it while
+            *conn* is being inspected, instead of after.  Canonicalization runs in a savepoint that is rolled back, but
+            its DDL briefly locks the objects it replaces, so use a connection with nothing else in flight.
+    """
+    current = inspect_catalog(
+        conn,
+        schemas,
+        functions=function_ddl is not IGNORED,
+        triggers=trigger_ddl is not IGNORED,
+        views=view_ddl is not IGNORED,
+    )
+    canonical = canonicalize(
+        canonicalize_conn if canonicalize_conn is not None else conn,
+        function_ddl=function_ddl,
+        view_ddl=view_ddl,
+        trigger_ddl=trigger_ddl,
+        schemas=schemas,
+        declared_only=True,
+    )
+    if canonicalize_conn is None:
+        current_state = await current
+        canonical_state = await canonical
+    else:
+        current_state, canonical_state = await asyncio.gather(current, canonical)
+    # The comparator's own steps, so the result matches what autogenerate would emit.
+    desired = with_undeclared_overloads(filter_to_schemas(canonical_state, schemas), current_state)
+    result = diff(current_state, desired)
+    log.info(
+        "Diffed the database: %d function, %d trigger, and %d view ops",
+        len(result.function_ops),
+        len(result.trigger_ops),
+        len(result.view_ops),
+    )
+    return result
@@ -0,0 +1,56 @@
+"""Performance benchmarks for the autogenerate pipeline.
+
+:func:`generate_schema` builds a synthetic schema of any size — schemas, overloaded functions, triggers on partitioned
+tables, layered views, check constraints and extension-owned noise — and :func:`run_benchmark` times each phase of the
+pipeline against it.  Results serialize to JSON and :func:`compare_results` checks them against a stored baseline.
+:func:`measure_memory` sizes the catalog snapshots the pipeline holds for the same schema, and
+:func:`run_extraction_benchmark` times the ways of loading full definitions, JSON aggregation against ``COPY``.
+
+Run it from the command line against a local PostgreSQL::
+
+    python -m alembic_pg_autogen.benchmark --url postgresql+psycopg://localhost/postgres --output results.json
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from alembic_pg_autogen.benchmark.generate import GeneratedSchema, SchemaSpec, generate_schema
+from alembic_pg_autogen.benchmark.runner import (
+    EXTRACTIONS,
+    PHASES,
+    SNAPSHOTS,
+    BenchmarkResult,
+    PhaseTiming,
+    Regression,
+    SnapshotMemory,
+    compare_results,
+    format_memory_table,
+    format_table,
+    measure_memory,
+    run_benchmark,
+    run_extraction_benchmark,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Final
+
+__all__: Final[Sequence[str]] = [
+    "EXTRACTIONS",
+    "PHASES",
+    "SNAPSHOTS",
+    "BenchmarkResult",
+    "GeneratedSchema",
+    "PhaseTiming",
+    "Regression",
+    "SchemaSpec",
+    "SnapshotMemory",
+    "compare_results",
+    "format_memory_table",
+    "format_table",
+    "generate_schema",
+    "measure_memory",
+    "run_benchmark",
+    "run_extraction_benchmark",
+]
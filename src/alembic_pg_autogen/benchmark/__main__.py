@@ -0,0 +1,89 @@
+"""Command-line entry point: ``python -m alembic_pg_autogen.benchmark``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import create_engine
+
+from alembic_pg_autogen.benchmark.generate import SchemaSpec
+from alembic_pg_autogen.benchmark.runner import (
+    BenchmarkResult,
+    compare_results,
+    format_memory_table,
+    format_table,
+    measure_memory,
+    run_benchmark,
+    run_extraction_benchmark,
+)
+from alembic_pg_autogen.queries import QueryRecorder
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the benchmark and return the process exit code: 1 if a phase regressed against the baseline, else 0."""
+    parser = argparse.ArgumentParser(prog="python -m alembic_pg_autogen.benchmark", description=__doc__)
+    parser.add_argument("--url", required=True, help="SQLAlchemy URL of the PostgreSQL database to benchmark against")
+    defaults = SchemaSpec()
+    for field in SchemaSpec._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=getattr(defaults, field))
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per phase (default: %(default)s)")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against the results stored in this JSON file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--queries", type=Path, help="record every statement the run sends and write them to this JSON file"
+    )
+    parser.add_argument("--memory", action="store_true", help="also measure the memory held by catalog snapshots")
+    parser.add_argument(
+        "--extraction",
+        action="store_true",
+        help="time the ways of loading full definitions (JSON, cursor, COPY) instead of the pipeline",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    spec = SchemaSpec(**{field: getattr(args, field) for field in SchemaSpec._fields})
+
+    engine = create_engine(args.url)
+    recorder = QueryRecorder()
+    try:
+        with engine.connect() as conn:
+            with recorder.recording(conn):
+                benchmark = run_extraction_benchmark if args.extraction else run_benchmark
+                result = benchmark(conn, spec, repeat=args.repeat)
+            # Outside the recording, whose records would be counted as memory the snapshots hold.
+            memory = measure_memory(conn, spec) if args.memory else ()
+    finally:
+        engine.dispose()
+
+    regressions = []
+    if args.baseline is not None:
+        baseline = BenchmarkResult.from_json(json.loads(args.baseline.read_text()))
+        if baseline.spec != spec:
+            print(f"warning: the baseline was measured with {baseline.spec}", file=sys.stderr)
+        regressions = compare_results(result, baseline, tolerance=args.tolerance)
+
+    print(format_table(result, regressions))
+    if memory:
+        print()
+        print(format_memory_table(memory))
+    if args.output is not None:
+        args.output.write_text(json.dumps(result.to_json(), indent=2) + "\n")
+    if args.queries is not None:
+        recorder.write_json(args.queries)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Synthetic large-schema generator for the benchmark runner."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlalchemy import CheckConstraint, Column, Date, Integer, MetaData, Numeric, Table, Text
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class SchemaSpec(NamedTuple):
+    """The shape of a generated schema.  Every count except *schemas* is per schema, or per table where noted."""
+
+    schemas: int = 2
+    functions: int = 20
+    """Function names, each declared with *overloads* signatures."""
+    overloads: int = 2
+    tables: int = 5
+    """Range-partitioned tables, each split into *partitions* partitions."""
+    partitions: int = 4
+    triggers: int = 2
+    """Row triggers per table, each with a trigger function of its own."""
+    view_layers: int = 3
+    """Depth of the view stack: the first layer selects from the tables, each later one from the layer below."""
+    views: int = 5
+    """Views per layer."""
+    check_constraints: int = 3
+    """Named ``CHECK`` constraints per table."""
+    extension_noise: int = 0
+    """Functions and views per schema attached to an extension, the way PostGIS fills ``public``."""
+    change_every: int = 10
+    """Declare every *change_every*-th object differently from the database, so the diff has work to do."""
+
+
+class GeneratedSchema(NamedTuple):
+    """The database state to create and the desired state to autogenerate against."""
+
+    spec: SchemaSpec
+    schema_names: tuple[str, ...]
+    setup: tuple[str, ...]
+    """Statements creating the current state; run them inside a transaction that is rolled back afterwards."""
+    function_ddl: tuple[str, ...]
+    trigger_ddl: tuple[str, ...]
+    view_ddl: tuple[str, ...]
+    metadata: MetaData
+    """The partitioned tables and their check constraints, for the check constraint comparator."""
+
+    @property
+    def counts(self) -> Mapping[str, int]:
+        """The number of declared objects of each kind."""
+        return {
+            "schemas": len(self.schema_names),
+            "functions": len(self.function_ddl),
+            "triggers": len(self.trigger_ddl),
+            "views": len(self.view_ddl),
+            "tables": len(self.metadata.tables),
+            "check_constraints": sum(
+                isinstance(constraint, CheckConstraint)
+                for table in self.metadata.tables.values()
+                for constraint in table.constraints
+            ),
+        }
+
+
+SCHEMA_PREFIX = "bench_"
+"""Every generated schema's name starts with this prefix."""
+
+_NOISE_EXTENSION = "plpgsql"
+"""The extension noise objects are attached to.  Always installed, and attaching to it needs no extension files."""
+
+
+def generate_schema(spec: SchemaSpec) -> GeneratedSchema:
+    """Generate the statements and metadata for *spec*.
+
+    The output is deterministic.  The current state is created by :attr:`GeneratedSchema.setup`; the declared DDL and
+    metadata match it except for every ``change_every``-th function, trigger, view and check constraint, which are
+    declared differently, and one undeclared function per schema, which autogenerate will drop.
+
+    Attaching the ``extension_noise`` objects to an extension requires a superuser.
+    """
+    setup: list[str] = []
+    functions: list[str] = []
+    triggers: list[str] = []
+    views: list[str] = []
+    metadata = MetaData()
+    schema_names = tuple(f"{SCHEMA_PREFIX}{index}" for index in range(spec.schemas))
+
+    for schema in schema_names:
+        setup.append(f"CREATE SCHEMA {schema}")
+        setup.append(f"CREATE FUNCTION {schema}.undeclared() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+
+        for index in range(spec.functions):
+            for overload in range(spec.overloads):
+                changed = _changed(spec, index * spec.overloads + overload)
+                setup.append(_function(schema, index, overload, changed=False))
+                functions.append(_function(schema, index, overload, changed=changed))
+
+        for index in range(spec.tables):
+            setup.extend(_table(schema, index, spec))
+            constraints = [
+                CheckConstraint(
+                    _check(number, changed=_changed(spec, index * spec.check_constraints + number)), name=name
+                )
+                for number, name in enumerate(_check_names(index, spec))
+            ]
+            Table(
+                f"t{index}",
+                metadata,
+                Column("id", Integer, nullable=False),
+                Column("amount", Numeric()),
+                Column("status", Text()),
+                Column("created", Date()),
+                *constraints,
+                schema=schema,
+            )
+            for number in range(spec.triggers):
+                changed = _changed(spec, index * spec.triggers + number)
+                setup.append(_trigger_function(schema, index, number))
+                functions.append(_trigger_function(schema, index, number))
+                setup.append(_trigger(schema, index, number, changed=False))
+                triggers.append(_trigger(schema, index, number, changed=changed))
+
+        for layer in range(spec.view_layers):
+            for index in range(spec.views):
+                changed = _changed(spec, layer * spec.views + index)
+                setup.append(_view(schema, layer, index, spec, changed=False))
+                views.append(_view(schema, layer, index, spec, changed=changed))
+
+        for index in range(spec.extension_noise):
+            setup.append(
+                f"CREATE FUNCTION {schema}.noise_{index}(integer) RETURNS integer LANGUAGE sql AS $$ SELECT $1 $$"
+            )
+            setup.append(f"ALTER EXTENSION {_NOISE_EXTENSION} ADD FUNCTION {schema}.noise_{index}(integer)")
+            setup.append(f"CREATE VIEW {schema}.noise_view_{index} AS SELECT {index} AS noise")
+            setup.append(f"ALTER EXTENSION {_NOISE_EXTENSION} ADD VIEW {schema}.noise_view_{index}")
+
+    return GeneratedSchema(spec, schema_names, tuple(setup), tuple(functions), tuple(triggers), tuple(views), metadata)
+
+
+def _changed(spec: SchemaSpec, ordinal: int) -> bool:
+    return spec.change_every > 0 and ordinal % spec.change_every == 0
+
+
+def _function(schema: str, index: int, overload: int, *, changed: bool) -> str:
+    params = ", ".join(f"a{arg} integer" for arg in range(overload + 1))
+    increment = overload + (2 if changed else 1)
+    return (
+        f"CREATE OR REPLACE FUNCTION {schema}.fn_{index}({params}) RETURNS integer LANGUAGE sql IMMUTABLE "
+        f"AS $$ SELECT a0 + {increment} $$"
+    )
+
+
+def _table(schema: str, index: int, spec: SchemaSpec) -> list[str]:
+    table = f"{schema}.t{index}"
+    statements = [
+        f"CREATE TABLE {table} (id integer NOT NULL, amount numeric, status text, created date) PARTITION BY RANGE (id)"
+    ]
+    for partition in range(spec.partitions):
+        statements.append(
+            f"CREATE TABLE {table}_p{partition} PARTITION OF {table} "
+            f"FOR VALUES FROM ({partition * 1000}) TO ({(partition + 1) * 1000})"
+        )
+    for number, name in enumerate(_check_names(index, spec)):
+        statements.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({_check(number, changed=False)})")
+    return statements
+
+
+def _check_names(index: int, spec: SchemaSpec) -> list[str]:
+    return [f"ck_t{index}_{number}" for number in range(spec.check_constraints)]
+
+
+def _check(number: int, *, changed: bool) -> str:
+    # Written the way a model would spell it, not the way the catalog deparses it, so every one needs a round trip.
+    return f"amount {'>' if changed else '>='} {number}"
+
+
+def _trigger_function(schema: str, index: int, number: int) -> str:
+    return (
+        f"CREATE OR REPLACE FUNCTION {schema}.trg_t{index}_{number}() RETURNS trigger LANGUAGE plpgsql "
+        "AS $$ BEGIN RETURN NEW; END $$"
+    )
+
+
+def _trigger(schema: str, index: int, number: int, *, changed: bool) -> str:
+    event = "INSERT OR UPDATE" if changed else "INSERT"
+    return (
+        f"CREATE TRIGGER trg_{number} AFTER {event} ON {schema}.t{index} "
+        f"FOR EACH ROW EXECUTE FUNCTION {schema}.trg_t{index}_{number}()"
+    )
+
+
+def _view(schema: str, layer: int, index: int, spec: SchemaSpec, *, changed: bool) -> str:
+    if layer > 0:
+        source = f"{schema}.v{layer - 1}_{index}"
+    elif spec.tables > 0:
+        source = f"{schema}.t{index % spec.tables}"
+    else:
+        source = "(VALUES (1, 1.0)) AS s (id, amount)"
+    where = " WHERE amount > 0" if changed else ""
+    return f"CREATE OR REPLACE VIEW {schema}.v{layer}_{index} AS SELECT id, amount FROM {source}{where}"
@@ -0,0 +1,431 @@
+"""Phase-by-phase timing of the autogenerate pipeline against a generated schema, and the memory its snapshots hold."""
+
+# The runner times the comparator's internal steps one at a time, so it calls them directly.
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import logging
+import math
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from alembic.autogenerate import produce_migrations, render_python_code
+from alembic.operations.ops import UpgradeOps
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import CheckConstraint, text
+
+from alembic_pg_autogen.benchmark.generate import SchemaSpec, generate_schema
+from alembic_pg_autogen.canonicalize import canonicalize, canonicalize_all_check_constraints
+from alembic_pg_autogen.compare import (
+    _filter_to_declared,
+    _hydrate_current,
+    _order_ops,
+    _parse_declared,
+    filter_to_schemas,
+    with_undeclared_overloads,
+)
+from alembic_pg_autogen.context import RunContext
+from alembic_pg_autogen.diff import diff
+from alembic_pg_autogen.inspect import (
+    CanonicalState,
+    copy_catalog,
+    inspect_catalog,
+    inspect_check_constraints,
+    iter_functions,
+    iter_triggers,
+    iter_views,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Mapping, Sequence
+    from typing import Final
+
+    from sqlalchemy import Connection
+
+    from alembic_pg_autogen.benchmark.generate import GeneratedSchema
+
+log = logging.getLogger(__name__)
+
+_FORMAT_VERSION: Final = 1
+"""Written to every result file; :meth:`BenchmarkResult.from_json` rejects any other version."""
+
+PHASES: Final = (
+    "parse",
+    "inspect_catalog",
+    "canonicalize",
+    "filter",
+    "diff",
+    "hydrate",
+    "order",
+    "render",
+    "inspect_check_constraints",
+    "canonicalize_check_constraints",
+    "autogenerate",
+)
+"""Every phase the runner times, in pipeline order.  ``autogenerate`` is a whole Alembic run, end to end."""
+
+EXTRACTIONS: Final = ("extract_json", "extract_cursor", "extract_copy_text", "extract_copy_binary")
+"""Every way :func:`run_extraction_benchmark` loads the current state with full definitions.
+
+``extract_json`` is :func:`~alembic_pg_autogen.inspect.inspect_catalog`'s single statement, ``extract_cursor`` the
+``iter_*`` helpers' server-side cursors, and the ``extract_copy_*`` phases
+:func:`~alembic_pg_autogen.inspect.copy_catalog` in each ``COPY`` format.
+"""
+
+SNAPSHOTS: Final = ("current", "current_uninterned", "current_digests", "desired", "desired_digests")
+"""Every snapshot :func:`measure_memory` sizes.
+
+``current_uninterned`` is the current state rebuilt with a string object per identifier per record, as records were
+built before identifiers were interned; the ``desired`` snapshots are sized on top of the current one they are diffed
+against, so identifiers both sides share are not counted twice.
+"""
+
+
+class PhaseTiming(NamedTuple):
+    """The wall-clock seconds one phase took in each repetition."""
+
+    phase: str
+    seconds: tuple[float, ...]
+
+    @property
+    def median(self) -> float:
+        """The median over the repetitions, which is what baselines are compared on."""
+        return statistics.median(self.seconds)
+
+    @property
+    def best(self) -> float:
+        """The fastest repetition."""
+        return min(self.seconds)
+
+
+class BenchmarkResult(NamedTuple):
+    """The timings of one benchmark run, and what they were measured against."""
+
+    spec: SchemaSpec
+    counts: Mapping[str, int]
+    server_version: str
+    phases: tuple[PhaseTiming, ...]
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the result as a JSON-serializable mapping."""
+        return {
+            "format": _FORMAT_VERSION,
+            "spec": self.spec._asdict(),
+            "counts": dict(self.counts),
+            "server_version": self.server_version,
+            "phases": {
+                timing.phase: {"median": timing.median, "best": timing.best, "seconds": list(timing.seconds)}
+                for timing in self.phases
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> BenchmarkResult:
+        """Rebuild a result from the mapping :meth:`to_json` produced.
+
+        Raises:
+            ValueError: If *data* was written by an incompatible version of the runner.
+        """
+        if data.get("format") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported benchmark result format: {data.get('format')!r}")
+        return cls(
+            spec=SchemaSpec(**data["spec"]),
+            counts=dict(data["counts"]),
+            server_version=data["server_version"],
+            phases=tuple(PhaseTiming(phase, tuple(values["seconds"])) for phase, values in data["phases"].items()),
+        )
+
+
+class SnapshotMemory(NamedTuple):
+    """The memory one catalog snapshot holds."""
+
+    snapshot: str
+    records: int
+    bytes: int
+    """Bytes allocated while building the snapshot and still held once it is built, as :mod:`tracemalloc` counts them."""
+
+    @property
+    def per_record(self) -> float:
+        """The average bytes held per record."""
+        return self.bytes / self.records if self.records else 0.0
+
+
+class Regression(NamedTuple):
+    """A phase whose median got slower than the baseline's by more than the tolerance."""
+
+    phase: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """How many times slower the phase has become."""
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def run_benchmark(conn: Connection, spec: SchemaSpec, *, repeat: int = 3) -> BenchmarkResult:
+    """Create the schema *spec* describes and time every phase of the pipeline against it *repeat* times.
+
+    Everything runs inside a transaction (a savepoint if *conn* already has one) that is rolled back at the end, so the
+    database is left as it was.
+
+    Raises:
+        ValueError: If *repeat* is not positive.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be positive, got {repeat}")
+    generated = generate_schema(spec)
+    timings: dict[str, list[float]] = {phase: [] for phase in PHASES}
+
+    with _created(conn, generated):
+        for iteration in range(repeat):
+            _run_once(conn, generated, timings)
+            log.info("Benchmark repetition %d of %d done", iteration + 1, repeat)
+
+    version = conn.dialect.server_version_info or ()
+    return BenchmarkResult(
+        spec=spec,
+        counts=generated.counts,
+        server_version=".".join(str(part) for part in version),
+        phases=tuple(PhaseTiming(phase, tuple(timings[phase])) for phase in PHASES),
+    )
+
+
+def run_extraction_benchmark(conn: Connection, spec: SchemaSpec, *, repeat: int = 3) -> BenchmarkResult:
+    """Create the schema *spec* describes and time each of :data:`EXTRACTIONS` against it *repeat* times.
+
+    Like :func:`run_benchmark`, everything runs inside a transaction that is rolled back at the end.  ``COPY`` needs
+    psycopg 3, so the ``extract_copy_*`` phases are only timed on a psycopg 3 connection.
+
+    Raises:
+        ValueError: If *repeat* is not positive.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be positive, got {repeat}")
+    generated = generate_schema(spec)
+    schemas = list(generated.schema_names)
+    extractions: dict[str, Callable[[], CanonicalState]] = {
+        "extract_json": lambda: inspect_catalog(conn, schemas),
+        "extract_cursor": lambda: CanonicalState(
+            list(iter_functions(conn, schemas)), list(iter_triggers(conn, schemas)), list(iter_views(conn, schemas))
+        ),
+        "extract_copy_text": lambda: copy_catalog(conn, schemas, binary=False),
+        "extract_copy_binary": lambda: copy_catalog(conn, schemas, binary=True),
+    }
+    if conn.dialect.driver != "psycopg":
+        log.warning("COPY extraction needs psycopg 3, not %s; timing the other extractions only", conn.dialect.driver)
+        extractions = {phase: extract for phase, extract in extractions.items() if not phase.startswith("extract_copy")}
+    timings: dict[str, list[float]] = {phase: [] for phase in extractions}
+
+    with _created(conn, generated):
+        for iteration in range(repeat):
+            for phase, extract in extractions.items():
+                with _timed(timings, phase):
+                    extract()
+            log.info("Extraction repetition %d of %d done", iteration + 1, repeat)
+
+    version = conn.dialect.server_version_info or ()
+    return BenchmarkResult(
+        spec=spec,
+        counts=generated.counts,
+        server_version=".".join(str(part) for part in version),
+        phases=tuple(PhaseTiming(phase, tuple(seconds)) for phase, seconds in timings.items()),
+    )
+
+
+def measure_memory(conn: Connection, spec: SchemaSpec) -> tuple[SnapshotMemory, ...]:
+    """Create the schema *spec* describes and measure the memory each of :data:`SNAPSHOTS` holds.
+
+    Like :func:`run_benchmark`, everything runs inside a transaction that is rolled back at the end.  Tracing slows
+    the pipeline down, so this is kept apart from the timings.
+    """
+    generated = generate_schema(spec)
+    schemas = list(generated.schema_names)
+    functions = _parse_declared(generated.function_ddl, "function")
+    triggers = _parse_declared(generated.trigger_ddl, "trigger")
+    views = _parse_declared(generated.view_ddl, "view")
+
+    def desired(baseline: CanonicalState | None) -> CanonicalState:
+        return canonicalize(
+            conn, function_ddl=functions, view_ddl=views, trigger_ddl=triggers, declared_only=True, baseline=baseline
+        )
+
+    with _created(conn, generated):
+        # Warm up first, so one-off allocations (compiled statements, type caches) are not charged to a snapshot.
+        inspect_catalog(conn, schemas)
+        desired(inspect_catalog(conn, schemas, digests=True))
+        # The current snapshots stay referenced while the desired ones are built on top of them.
+        _current, memory = _traced("current", lambda: inspect_catalog(conn, schemas))
+        _, uninterned = _traced("current_uninterned", lambda: _uninterned(inspect_catalog(conn, schemas)))
+        digests, digest_memory = _traced("current_digests", lambda: inspect_catalog(conn, schemas, digests=True))
+        _, desired_memory = _traced("desired", lambda: desired(None))
+        _, desired_digest_memory = _traced("desired_digests", lambda: desired(digests))
+    return (memory, uninterned, digest_memory, desired_memory, desired_digest_memory)
+
+
+def compare_results(
+    result: BenchmarkResult, baseline: BenchmarkResult, *, tolerance: float = 0.25, floor: float = 0.005
+) -> list[Regression]:
+    """Return the phases of *result* whose median is slower than *baseline*'s by more than *tolerance*.
+
+    Args:
+        result: The run to check.
+        baseline: The stored run to check against.  Phases missing from either side are skipped.
+        tolerance: The allowed slowdown, as a fraction of the baseline median.
+        floor: Seconds of absolute slowdown below which a phase is never reported, since timer noise dominates there.
+    """
+    before = {timing.phase: timing.median for timing in baseline.phases}
+    regressions: list[Regression] = []
+    for timing in result.phases:
+        previous = before.get(timing.phase)
+        if previous is None:
+            continue
+        if timing.median - previous > max(previous * tolerance, floor):
+            regressions.append(Regression(timing.phase, previous, timing.median))
+    return regressions
+
+
+@contextmanager
+def _created(conn: Connection, generated: GeneratedSchema) -> Generator[None]:
+    """Create *generated*'s current state for the block, in a transaction (or savepoint) rolled back afterwards."""
+    transaction = conn.begin_nested() if conn.in_transaction() else conn.begin()
+    try:
+        for statement in generated.setup:
+            conn.execute(text(statement))
+        log.info("Benchmark schema created: %s", dict(generated.counts))
+        yield
+    finally:
+        transaction.rollback()
+
+
+def _traced(snapshot: str, build: Callable[[], CanonicalState]) -> tuple[CanonicalState, SnapshotMemory]:
+    """Build a snapshot, returning it with the memory it holds."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        state = build()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    records = len(state.functions) + len(state.triggers) + len(state.views)
+    log.debug("Benchmark snapshot %s holds %d bytes in %d records", snapshot, held, records)
+    return state, SnapshotMemory(snapshot, records, held)
+
+
+def _uninterned(state: CanonicalState) -> CanonicalState:
+    """Rebuild *state* with a string object of its own for every identifier of every record."""
+
+    def copied(records: Sequence[Any]) -> list[Any]:
+        return [record._make([*(value.encode().decode() for value in record[:-1]), record[-1]]) for record in records]
+
+    return CanonicalState(copied(state.functions), copied(state.triggers), copied(state.views))
+
+
+def _run_once(conn: Connection, generated: GeneratedSchema, timings: dict[str, list[float]]) -> None:
+    """Run the pipeline once, as ``_compare_pg_objects`` does, timing each phase into *timings*."""
+    schemas = list(generated.schema_names)
+    run = RunContext(conn)
+
+    with _timed(timings, "parse"):
+        functions = _parse_declared(generated.function_ddl, "function")
+        triggers = _parse_declared(generated.trigger_ddl, "trigger")
+        views = _parse_declared(generated.view_ddl, "view")
+    with _timed(timings, "inspect_catalog"):
+        current = inspect_catalog(conn, schemas, digests=True)
+    with _timed(timings, "canonicalize"):
+        canonical = canonicalize(
+            conn, function_ddl=functions, view_ddl=views, trigger_ddl=triggers, declared_only=True, baseline=current
+        )
+    with _timed(timings, "filter"):
+        desired = with_undeclared_overloads(
+            _filter_to_declared(filter_to_schemas(canonical, schemas), functions, triggers, views, run), current
+        )
+    with _timed(timings, "diff"):
+        result = diff(current, desired)
+    with _timed(timings, "hydrate"):
+        result = _hydrate_current(conn, result)
+    with _timed(timings, "order"):
+        ops = _order_ops(result.function_ops, result.trigger_ops, result.view_ops)
+    with _timed(timings, "render"):
+        render_python_code(UpgradeOps(ops=ops))
+
+    tables = generated.metadata.tables.values()
+    with _timed(timings, "inspect_check_constraints"):
+        inspect_check_constraints(conn, schemas=schemas, table_names=sorted({table.name for table in tables}))
+    expressions: dict[tuple[str | None, str], dict[str, str]] = {
+        (table.schema or run.current_schema, table.name): {
+            str(constraint.name): str(constraint.sqltext)
+            for constraint in table.constraints
+            if isinstance(constraint, CheckConstraint)
+        }
+        for table in tables
+    }
+    with _timed(timings, "canonicalize_check_constraints"):
+        canonicalize_all_check_constraints(conn, expressions)
+
+    with _timed(timings, "autogenerate"):
+        produce_migrations(_migration_context(conn, generated), generated.metadata)
+
+
+def _migration_context(conn: Connection, generated: GeneratedSchema) -> MigrationContext:
+    """Configure Alembic the way a project using this package would, restricted to the generated schemas."""
+    schemas = set(generated.schema_names)
+    tables = {(table.schema, table.name) for table in generated.metadata.tables.values()}
+
+    def include_name(name: str | None, type_: str, parent_names: Mapping[str, str | None]) -> bool:
+        if type_ == "schema":
+            return name in schemas
+        if type_ == "table":
+            # Partitions are not in the metadata; leave them out rather than have Alembic drop them.
+            return (parent_names.get("schema_name"), name) in tables
+        return True
+
+    return MigrationContext.configure(
+        connection=conn,
+        opts={
+            "target_metadata": generated.metadata,
+            "autogenerate_plugins": ["alembic.autogenerate.*", "alembic_pg_autogen.*"],
+            "include_schemas": True,
+            "include_name": include_name,
+            "pg_functions": generated.function_ddl,
+            "pg_triggers": generated.trigger_ddl,
+            "pg_views": generated.view_ddl,
+        },
+    )
+
+
+@contextmanager
+def _timed(timings: dict[str, list[float]], phase: str) -> Generator[None]:
+    start = time.perf_counter()
+    yield
+    timings[phase].append(time.perf_counter() - start)
+    log.debug("Benchmark phase %s took %.4fs", phase, timings[phase][-1])
+
+
+def format_memory_table(usage: Sequence[SnapshotMemory]) -> str:
+    """Return a plain-text table of what :func:`measure_memory` measured."""
+    lines = [f"{'snapshot':<32} {'records':>10} {'bytes':>12} {'per record':>12}"]
+    for snapshot in usage:
+        lines.append(
+            f"{snapshot.snapshot:<32} {snapshot.records:>10} {snapshot.bytes:>12} {snapshot.per_record:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def format_table(result: BenchmarkResult, regressions: Sequence[Regression] = ()) -> str:
+    """Return a plain-text table of *result*'s phases, marking the ones in *regressions*."""
+    slower = {regression.phase: regression for regression in regressions}
+    lines = [f"{'phase':<32} {'median':>10} {'best':>10}"]
+    for timing in result.phases:
+        line = f"{timing.phase:<32} {timing.median:>10.4f} {timing.best:>10.4f}"
+        if timing.phase in slower:
+            line += f"  REGRESSION x{slower[timing.phase].ratio:.2f}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,285 @@
+"""Persistent caches of canonical catalog records and of catalog snapshots."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from alembic_pg_autogen.changes import COUNTER_SCHEMA
+from alembic_pg_autogen.inspect import CanonicalState, FunctionInfo, TriggerInfo, ViewInfo, catalog_record
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterator, Mapping, Sequence
+    from typing import Final
+
+    from alembic_pg_autogen.changes import CatalogVersion
+
+log = logging.getLogger(__name__)
+
+_FORMAT_VERSION: Final = 1
+"""Mixed into every key, so a change to what an entry holds invalidates all existing entries."""
+
+_SQLITE_MAX_VARIABLES: Final = 500
+"""Keys per ``IN (...)`` lookup, comfortably below SQLite's historical limit of 999 bound variables."""
+
+
+class CanonicalizationCache:
+    """An on-disk LRU cache mapping declared DDL to the canonical record PostgreSQL produces for it.
+
+    Entries live in a SQLite database in write-ahead-log mode, opened afresh for every operation, so any number of
+    processes — ``pytest-xdist`` workers, parallel CI jobs — can share one file.  Writes take SQLite's write lock up
+    front and wait up to *timeout* seconds for it.  Once the cache holds more than *max_entries*, the entries used
+    least recently are evicted.
+
+    Keys come from :meth:`key`, which hashes the normalized DDL together with the server context that shapes its
+    canonical form.  Most canonical forms also depend on the rest of the catalog: a view declared with ``SELECT *``
+    gains a column when its table does.  Only functions with a string body are keyed on their DDL alone; views,
+    triggers and functions with a SQL-standard body are keyed on the catalog version as well, read from the change
+    counter of :mod:`alembic_pg_autogen.changes` in *counter_schema*, and are not cached where it is not installed.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_entries: int = 10_000,
+        counter_schema: str = COUNTER_SCHEMA,
+        timeout: float = 30.0,
+    ) -> None:
+        """Open the cache at *path*, creating it if needed.
+
+        Args:
+            path: The cache file.  Missing parent directories are created.
+            max_entries: The number of entries kept before the least recently used are evicted.
+            counter_schema: The schema the change counter was installed in, if it was.
+            timeout: Seconds to wait for another process's write lock before giving up.
+
+        Raises:
+            ValueError: If *max_entries* is not positive.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+        self.path: Final = Path(path)
+        self.max_entries: Final = max_entries
+        self.counter_schema: Final = counter_schema
+        self._timeout: Final = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    @staticmethod
+    def key(
+        kind: str, ddl: str, *, server_version_num: str, search_path: str, catalog: CatalogVersion | None = None
+    ) -> str:
+        """Return the cache key for canonicalizing *ddl* as an object of *kind*.
+
+        Args:
+            kind: The object type, e.g. ``"function"``.
+            ddl: The statement as executed — normalized, so that layout and comments do not split entries.
+            server_version_num: The server's ``server_version_num``; deparsed output differs across releases.
+            search_path: The effective ``search_path``, which resolves every unqualified name in *ddl*.
+            catalog: The catalog version, for a statement whose canonical form depends on the objects it references.
+        """
+        version = None if catalog is None else [catalog.database, catalog.counter]
+        material = json.dumps([_FORMAT_VERSION, kind, server_version_num, search_path, version, ddl])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get_many(self, keys: Collection[str]) -> dict[str, list[str]]:
+        """Return the cached record for each of *keys* that has one, marking those entries as recently used."""
+        if not keys:
+            return {}
+        found: dict[str, list[str]] = {}
+        with self._connect() as db:
+            for chunk in _chunks(list(keys)):
+                placeholders = ", ".join("?" * len(chunk))
+                rows = db.execute(f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk)
+                found.update((key, json.loads(value)) for key, value in rows)
+            if found:
+                now = time.time_ns()
+                db.execute("BEGIN IMMEDIATE")
+                db.executemany("UPDATE entries SET used = ? WHERE key = ?", [(now, key) for key in found])
+                db.execute("COMMIT")
+        log.debug("Canonicalization cache: %d of %d keys hit", len(found), len(keys))
+        return found
+
+    def put_many(self, entries: Mapping[str, Sequence[str]]) -> None:
+        """Store a record under each key of *entries*, then evict the least recently used beyond *max_entries*."""
+        if not entries:
+            return
+        now = time.time_ns()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, used) VALUES (?, ?, ?)",
+                [(key, json.dumps(list(record)), now) for key, record in entries.items()],
+            )
+            evicted = db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            db.execute("COMMIT")
+        log.debug("Canonicalization cache: stored %d entries, evicted %d", len(entries), evicted)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._connect() as db:
+            db.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        """Return the number of entries currently stored."""
+        with self._connect() as db:
+            (count,) = db.execute("SELECT count(*) FROM entries").fetchone()
+        return count
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        return _connect(self.path, self._timeout)
+
+
+class SnapshotCache:
+    """An on-disk store of catalog snapshots, each served for as long as the catalog version it was taken at is current.
+
+    Versions come from the change counter of :mod:`alembic_pg_autogen.changes`, which must be installed in
+    *counter_schema* for the cache to be used.  One snapshot is kept per database, schema list, snapshot shape and
+    deparse settings, replaced whenever a newer one is stored.  Like :class:`CanonicalizationCache`, the file is a
+    SQLite database that any number of processes can share.
+
+    A restored copy of a database carries the counter of the original, so do not share one file between copies that
+    then diverge.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, counter_schema: str = COUNTER_SCHEMA, timeout: float = 30.0
+    ) -> None:
+        """Open the cache at *path*, creating it and any missing parent directories if needed.
+
+        Args:
+            path: The cache file.
+            counter_schema: The schema the change counter was installed in.
+            timeout: Seconds to wait for another process's write lock before giving up.
+        """
+        self.path: Final = Path(path)
+        self.counter_schema: Final = counter_schema
+        self._timeout: Final = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def get(
+        self,
+        version: CatalogVersion,
+        schemas: Collection[str] | None,
+        *,
+        functions: bool = True,
+        triggers: bool = True,
+        views: bool = True,
+        digests: bool = False,
+        settings: Mapping[str, str] | None = None,
+    ) -> CanonicalState | None:
+        """Return the snapshot of *schemas* stored at *version*, or *None* if there is none or the catalog has changed.
+
+        The keyword arguments describe the snapshot as they do for :func:`~alembic_pg_autogen.inspect.inspect_catalog`.
+        *settings* are the session's :data:`~alembic_pg_autogen.parallel.DEPARSE_SETTINGS`, as
+        :func:`~alembic_pg_autogen.parallel.deparse_settings` returns them: the server deparses definitions according
+        to them, so a snapshot is only served to a session that deparses the same way.
+        """
+        key = _snapshot_key(version, schemas, (functions, triggers, views, digests), settings)
+        with self._connect() as db:
+            row = db.execute("SELECT version, value FROM snapshots WHERE key = ?", (key,)).fetchone()
+        if row is None or json.loads(row[0]) != version.counter:
+            log.debug("Snapshot cache: miss for schemas %s", schemas)
+            return None
+        value = json.loads(row[1])
+        return CanonicalState(
+            functions=[catalog_record(FunctionInfo, record) for record in value["functions"]],
+            triggers=[catalog_record(TriggerInfo, record) for record in value["triggers"]],
+            views=[catalog_record(ViewInfo, record) for record in value["views"]],
+        )
+
+    def put(
+        self,
+        version: CatalogVersion,
+        schemas: Collection[str] | None,
+        state: CanonicalState,
+        *,
+        functions: bool = True,
+        triggers: bool = True,
+        views: bool = True,
+        digests: bool = False,
+        settings: Mapping[str, str] | None = None,
+    ) -> None:
+        """Store *state* as the snapshot of *schemas* at *version*, replacing any earlier one of the same shape.
+
+        *settings* are those *state* was deparsed under, as for :meth:`get`.
+        """
+        key = _snapshot_key(version, schemas, (functions, triggers, views, digests), settings)
+        value = {
+            "functions": [list(record) for record in state.functions],
+            "triggers": [list(record) for record in state.triggers],
+            "views": [list(record) for record in state.views],
+        }
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO snapshots (key, version, value) VALUES (?, ?, ?)",
+                (key, json.dumps(version.counter), json.dumps(value)),
+            )
+        log.debug("Snapshot cache: stored the snapshot of schemas %s", schemas)
+
+    def clear(self) -> None:
+        """Remove every snapshot."""
+        with self._connect() as db:
+            db.execute("DELETE FROM snapshots")
+
+    def __len__(self) -> int:
+        """Return the number of snapshots currently stored."""
+        with self._connect() as db:
+            (count,) = db.execute("SELECT count(*) FROM snapshots").fetchone()
+        return count
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        return _connect(self.path, self._timeout)
+
+
+def _connect(path: Path, timeout: float) -> closing[sqlite3.Connection]:
+    """Open a cache file in autocommit mode; transactions are begun explicitly where they matter."""
+    return closing(sqlite3.connect(path, timeout=timeout, isolation_level=None))
+
+
+def _snapshot_key(
+    version: CatalogVersion,
+    schemas: Collection[str] | None,
+    shape: tuple[bool, ...],
+    settings: Mapping[str, str] | None,
+) -> str:
+    """Hash what identifies a snapshot apart from the counter.
+
+    That is the database, the schemas, which sections it holds, and the settings its definitions were deparsed under.
+    """
+    material = json.dumps([
+        _FORMAT_VERSION,
+        version.database,
+        version.server_version_num,
+        None if schemas is None else sorted(schemas),
+        shape,
+        None if settings is None else sorted(settings.items()),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _chunks(keys: Sequence[str]) -> Iterator[Sequence[str]]:
+    """Split *keys* into runs small enough to bind in one statement."""
+    for start in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+        yield keys[start : start + _SQLITE_MAX_VARIABLES]
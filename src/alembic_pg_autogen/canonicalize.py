@@ -3,12 +3,25 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, NamedTuple
+import re
+from itertools import groupby
+from typing import TYPE_CHECKING, TypeVar, cast
 
 from sqlalchemy import text
 from sqlalchemy.exc import DBAPIError
 
-from alembic_pg_autogen.inspect import inspect_functions, inspect_triggers, inspect_views
+from alembic_pg_autogen.changes import catalog_version
+from alembic_pg_autogen.ddl import ensure_parsed
+from alembic_pg_autogen.inspect import CanonicalState as CanonicalState  # re-exported for backwards compatibility
+from alembic_pg_autogen.inspect import (
+    FunctionInfo,
+    TriggerInfo,
+    ViewInfo,
+    catalog_record,
+    definition_digest,
+    inspect_catalog,
+)
+from alembic_pg_autogen.observe import phase
 from alembic_pg_autogen.sentinels import IGNORED
 
 log = logging.getLogger(__name__)
@@ -17,31 +30,33 @@ if TYPE_CHECKING:
     from collections.abc import Mapping, Sequence
 
     from sqlalchemy import Connection
+    from typing_extensions import Unpack
 
-    from alembic_pg_autogen.inspect import FunctionInfo, TriggerInfo, ViewInfo
+    from alembic_pg_autogen.cache import CanonicalizationCache
+    from alembic_pg_autogen.ddl import DDLKind, ParsedDDL
     from alembic_pg_autogen.sentinels import Ignored
 
-
-class CanonicalState(NamedTuple):
-    """Post-DDL catalog snapshot returned by :func:`canonicalize`."""
-
-    functions: Sequence[FunctionInfo]
-    triggers: Sequence[TriggerInfo]
-    views: Sequence[ViewInfo] = ()
+    _NameIdentity = tuple[str | None, str]
+    _TriggerIdentity = tuple[str | None, str, str]
 
 
 def canonicalize(
     conn: Connection,
     *,
-    function_ddl: Sequence[str] | Ignored = (),
-    view_ddl: Sequence[str] | Ignored = (),
-    trigger_ddl: Sequence[str] | Ignored = (),
+    function_ddl: Sequence[str | ParsedDDL] | Ignored = (),
+    view_ddl: Sequence[str | ParsedDDL] | Ignored = (),
+    trigger_ddl: Sequence[str | ParsedDDL] | Ignored = (),
     schemas: Sequence[str] | None = None,
+    declared_only: bool = False,
+    baseline: CanonicalState | None = None,
+    cache: CanonicalizationCache | None = None,
 ) -> CanonicalState:
     """Canonicalize user-provided DDL by round-tripping through PostgreSQL.
 
-    Executes the given DDL statements inside a savepoint, reads back canonical forms via ``inspect_functions`` /
-    ``inspect_views`` / ``inspect_triggers``, then rolls back the savepoint — leaving the database unchanged.
+    Executes the given DDL statements inside a savepoint, reads back canonical forms in one round trip via
+    :func:`~alembic_pg_autogen.inspect.inspect_catalog`, then rolls back the savepoint — leaving the database
+    unchanged.  The statements are shipped to the server as one array and executed there by a temporary helper
+    function, so the number of round trips does not grow with the number of statements.
 
     DDL executes in dependency order: functions first (standalone), then views (may reference functions), then triggers
     (may reference functions and INSTEAD OF triggers may be on views).
@@ -49,29 +64,76 @@ def canonicalize(
     An object type passed as :data:`~alembic_pg_autogen.IGNORED` is skipped entirely: no DDL is executed for it and its
     catalog is not read back, so the corresponding :class:`CanonicalState` field is empty.
 
+    By default the read-back covers every object in *schemas*, including ones that existed before the DDL ran.  With
+    *declared_only*, the identities the DDL declares are pushed down into the catalog query instead, so the server
+    deparses only those objects — ``(schema, name)`` for functions and views, ``(schema, table, trigger)`` for
+    triggers, with unqualified names resolved through the connection's ``search_path``.  Every overload of a declared
+    function name is read back, matching how the autogenerate comparator matches functions.
+
+    With *baseline* — the current state as loaded by :func:`~alembic_pg_autogen.inspect.inspect_catalog` with
+    ``digests=True`` — an object the DDL leaves unchanged is returned with its baseline digest as its definition, and
+    only changed or new objects carry a full definition.  Diffing the result against *baseline* then yields exactly
+    the changes, without transferring the definitions of everything else.
+
+    With a *cache*, each statement's canonical record is looked up by its normalized DDL, the server version, and the
+    effective ``search_path``.  When every statement hits, no savepoint is opened and no DDL runs; otherwise all the
+    DDL runs as usual — a cached function may be what an uncached view depends on — but only the misses are read back,
+    and they are stored for next time.  The result then holds exactly the declared objects: undeclared overloads of a
+    declared function name are not read back.  The cache is bypassed on servers whose encoding is not ``UTF8``, where
+    digests computed client-side would not match *baseline*.
+
     Args:
         conn: An open SQLAlchemy connection (may have an active transaction).
         function_ddl: ``CREATE FUNCTION`` / ``CREATE PROCEDURE`` statements, or :data:`~alembic_pg_autogen.IGNORED`.
+            Each may be passed already parsed, as a :class:`~alembic_pg_autogen.ddl.ParsedDDL`, so that callers that
+            parse the DDL themselves do not have it parsed again here; the same holds for *view_ddl* and
+            *trigger_ddl*.
         view_ddl: ``CREATE VIEW`` statements, or :data:`~alembic_pg_autogen.IGNORED`.
         trigger_ddl: ``CREATE TRIGGER`` statements, or :data:`~alembic_pg_autogen.IGNORED`.
         schemas: Optional schema list passed to the inspect helpers.  When *None*, all user schemas are included.
+        declared_only: Restrict the read-back to the objects the DDL declares.
+        baseline: A digest snapshot of the current state; definitions matching it are returned as digests.
+        cache: A :class:`~alembic_pg_autogen.cache.CanonicalizationCache` to serve canonical records from.  Requires
+            *declared_only*.
 
     Returns:
-        A :class:`CanonicalState` with the full post-DDL catalog state.
+        A :class:`CanonicalState` with the post-DDL catalog state.
 
     Raises:
-        sqlalchemy.exc.DBAPIError: If any DDL statement is invalid.
+        sqlalchemy.exc.DBAPIError: If any DDL statement is invalid.  The error is the statement's own, with its
+            ``SQLSTATE``, message, ``DETAIL`` and ``HINT``, and names the failing statement in its ``CONTEXT``.
+        ValueError: If *declared_only* is set and a statement's identity cannot be parsed from its DDL, or if *cache*
+            is given without *declared_only*.
     """
-    function_stmts = _declared(function_ddl)
-    view_stmts = _declared(view_ddl)
-    trigger_stmts = _declared(trigger_ddl)
+    function_stmts = _declared(function_ddl, "function")
+    view_stmts = _declared(view_ddl, "view")
+    trigger_stmts = _declared(trigger_ddl, "trigger")
     log.info(
         "Canonicalizing %d function, %d view, and %d trigger DDL statements",
         len(function_stmts),
         len(view_stmts),
         len(trigger_stmts),
     )
-    import postgast
+
+    if cache is not None:
+        if not declared_only:
+            raise ValueError("A canonicalization cache requires declared_only=True")
+        cached = _canonicalize_cached(
+            conn,
+            cache,
+            None if function_ddl is IGNORED else function_stmts,
+            None if view_ddl is IGNORED else view_stmts,
+            None if trigger_ddl is IGNORED else trigger_stmts,
+            baseline,
+        )
+        if cached is not None:
+            return cached
+
+    function_ids = trigger_ids = view_ids = None
+    if declared_only:
+        function_ids = cast("list[_NameIdentity]", _identities(function_stmts))
+        trigger_ids = cast("list[_TriggerIdentity]", _identities(trigger_stmts))
+        view_ids = cast("list[_NameIdentity]", _identities(view_stmts))
 
     functions: Sequence[FunctionInfo] = ()
     views: Sequence[ViewInfo] = ()
@@ -79,19 +141,22 @@ def canonicalize(
 
     savepoint = conn.begin_nested()
     try:
-        for ddl in function_stmts:
-            conn.execute(text(postgast.ensure_or_replace(ddl)))
-        for ddl in view_stmts:
-            conn.execute(text(postgast.ensure_or_replace(ddl)))
-        for ddl in trigger_stmts:
-            conn.execute(text(postgast.ensure_or_replace(ddl)))
-
-        if function_ddl is not IGNORED:
-            functions = inspect_functions(conn, schemas)
-        if view_ddl is not IGNORED:
-            views = inspect_views(conn, schemas)
-        if trigger_ddl is not IGNORED:
-            triggers = inspect_triggers(conn, schemas)
+        _execute_batch(conn, [parsed.or_replace for parsed in (*function_stmts, *view_stmts, *trigger_stmts)])
+
+        # Declaring nothing under *declared_only* has nothing to read back: the empty result is already known.
+        with phase("canonicalize_read_back") as counts:
+            functions, triggers, views = inspect_catalog(
+                conn,
+                schemas,
+                functions=function_ddl is not IGNORED and not (declared_only and not function_stmts),
+                triggers=trigger_ddl is not IGNORED and not (declared_only and not trigger_stmts),
+                views=view_ddl is not IGNORED and not (declared_only and not view_stmts),
+                function_identities=function_ids,
+                trigger_identities=trigger_ids,
+                view_identities=view_ids,
+                baseline=baseline,
+            )
+            counts.update(functions=len(functions), triggers=len(triggers), views=len(views))
     finally:
         savepoint.rollback()
         log.debug("Canonicalization savepoint rolled back")
@@ -106,6 +171,20 @@ def canonicalize(
     return CanonicalState(functions=functions, triggers=triggers, views=views)
 
 
+def apply_baseline(state: CanonicalState, baseline: CanonicalState) -> CanonicalState:
+    """Return *state* as :func:`canonicalize` would have read it back with *baseline*.
+
+    Each definition whose :func:`~alembic_pg_autogen.inspect.definition_digest` equals the digest of the same object in
+    *baseline* is replaced by that digest.  Use it when *state* had to be canonicalized before *baseline* was known.
+    The digests are computed client-side, so they match the server's only in a ``UTF8`` database.
+    """
+    return CanonicalState(
+        functions=_against_baseline(state.functions, baseline.functions),
+        triggers=_against_baseline(state.triggers, baseline.triggers),
+        views=_against_baseline(state.views, baseline.views),
+    )
+
+
 def canonicalize_functions(
     conn: Connection,
     ddl: Sequence[str],
@@ -169,6 +248,7 @@ def canonicalize_check_constraints(
     schema: str | None,
     table_name: str,
     expressions: Mapping[str, str],
+    shadow: bool = False,
 ) -> Mapping[str, str]:
     """Canonicalize desired ``CHECK`` expressions by round-tripping them through PostgreSQL.
 
@@ -182,11 +262,19 @@ def canonicalize_check_constraints(
     ``pg_get_expr()`` deparse.  That is the whole point of the round-trip: ``amount >= 0`` in a SQLAlchemy model and
     ``(amount >= (0)::numeric)`` in the catalog are the same constraint, and only PostgreSQL can say so.
 
+    Adding a constraint takes an ``ACCESS EXCLUSIVE`` lock on the table until the savepoint rolls back, which queues
+    behind every running query on it and then blocks all traffic.  With *shadow*, the probes go to a session-local
+    ``CREATE TEMPORARY TABLE ... (LIKE ...)`` copy of the table instead; copying its definition takes only the
+    ``ACCESS SHARE`` lock any ``SELECT`` takes, and since the copy has the same column types and collations the
+    deparsed expressions are identical.
+
     Args:
         conn: An open SQLAlchemy connection (may have an active transaction).
         schema: Schema qualifying *table_name*, or *None* to resolve it through the connection's ``search_path``.
         table_name: The table the constraints belong to.  It must already exist in the database.
         expressions: Mapping of constraint name to the raw ``CHECK`` expression text to normalize.
+        shadow: Probe a temporary copy of the table rather than the table itself, so no lock blocks other sessions.
+            This needs the ``TEMP`` privilege on the database.
 
     Returns:
         A mapping of constraint name to normalized expression.  Names whose expression could not be applied — an
@@ -195,54 +283,495 @@ def canonicalize_check_constraints(
     """
     if not expressions:
         return {}
+    return canonicalize_all_check_constraints(conn, {(schema, table_name): expressions}, shadow=shadow)[
+        schema, table_name
+    ]
+
+
+def canonicalize_all_check_constraints(
+    conn: Connection,
+    tables: Mapping[tuple[str | None, str], Mapping[str, str]],
+    *,
+    shadow: bool = False,
+) -> dict[tuple[str | None, str], Mapping[str, str]]:
+    """Canonicalize the desired ``CHECK`` expressions of many tables in a single call to the server.
+
+    The bulk form of :func:`canonicalize_check_constraints`, with the same semantics per table.  A temporary helper
+    function probes the tables one at a time: it adds a table's probe constraints in a subtransaction, reads them back
+    and rolls the subtransaction back, releasing that table's ``ACCESS EXCLUSIVE`` lock before taking the next one's.
+    The number of round trips does not grow with the number of tables.  A probe that fails is skipped on its own: the
+    helper first runs a table's probes at once and, only if one of them fails, retries them one at a time, each in its
+    own subtransaction.  A role without the ``TEMP`` privilege on the database cannot create the helper, and runs the
+    same probes in savepoints instead, one round trip per statement; *shadow* needs ``TEMP`` for its temporary tables,
+    and without it every expression is treated as unchanged.
+
+    Args:
+        conn: An open SQLAlchemy connection (may have an active transaction).
+        tables: Mapping of ``(schema, table_name)`` — a *None* schema resolves through the ``search_path`` — to that
+            table's mapping of constraint name to raw ``CHECK`` expression text.
+        shadow: Probe a temporary copy of each table rather than the table itself, as for
+            :func:`canonicalize_check_constraints`.
+
+    Returns:
+        A mapping with the keys of *tables*, each to its table's mapping of constraint name to normalized expression,
+        leaving out the names whose expression could not be applied.
+    """
+    normalized: dict[tuple[str | None, str], dict[str, str]] = {key: {} for key in tables}
+    if not any(tables.values()):
+        return dict(normalized)
 
     preparer = conn.dialect.identifier_preparer
-    qualified = preparer.quote(table_name)
-    if schema is not None:
-        qualified = f"{preparer.quote_schema(schema)}.{qualified}"
-    probes = {f"{_PROBE_PREFIX}{index}": name for index, name in enumerate(expressions)}
+    # One entry per statement: the table and constraint it serves (no constraint for a shadow table's creation) and
+    # the live table's qualified name, for messages.
+    steps: list[tuple[tuple[str | None, str], str | None, str]] = []
+    # Parallel to *steps*: the statement, the position of its table among the probed tables, and the table and name of
+    # the probe constraint it adds (both *None* for a shadow table's creation).
+    statements: list[str] = []
+    groups: list[int] = []
+    targets: list[str | None] = []
+    probe_names: list[str | None] = []
+    for group, (key, expressions) in enumerate(item for item in tables.items() if item[1]):
+        schema, table_name = key
+        qualified = preparer.quote(table_name)
+        if schema is not None:
+            qualified = f"{preparer.quote_schema(schema)}.{qualified}"
+        target = qualified
+        if shadow:
+            target = f"pg_temp.{preparer.quote(f'{_SHADOW_PREFIX}{group}')}"
+            steps.append((key, None, qualified))
+            # LIKE copies every column with its type and collation, which is all pg_get_expr() deparses against.
+            statements.append(f"CREATE TEMPORARY TABLE {target} (LIKE {qualified})")
+            groups.append(group)
+            targets.append(None)
+            probe_names.append(None)
+        for name, expression in expressions.items():
+            probe = f"{_PROBE_PREFIX}{len(steps)}"
+            steps.append((key, name, qualified))
+            # The expression is user-authored SQL from the model's own metadata, interpolated the same way the rest of
+            # this module interpolates user DDL.  It only ever runs inside the savepoint below.
+            statements.append(
+                f"ALTER TABLE {target} ADD CONSTRAINT {preparer.quote(probe)} CHECK ({expression}) NOT VALID"
+            )
+            groups.append(group)
+            targets.append(target)
+            probe_names.append(probe)
 
     savepoint = conn.begin_nested()
     try:
-        for probe, name in probes.items():
-            # The expression is user-authored SQL from the model's own metadata, interpolated the same way the rest of
-            # this module interpolates user DDL.  It only ever runs inside this savepoint.
-            conn.execute(
+        rows: Sequence[tuple[int, str | None, str | None]] = []
+        if conn.execute(text(_TEMP_PRIVILEGE_QUERY)).scalar():
+            conn.execute(text(_TRY_BATCH_FUNCTION_DDL))
+            rows = conn.execute(
                 text(
-                    f"ALTER TABLE {qualified} ADD CONSTRAINT {preparer.quote(probe)} "
-                    f"CHECK ({expressions[name]}) NOT VALID"
-                )
+                    f"SELECT step, error, expression FROM {_TRY_BATCH_FUNCTION}("
+                    "CAST(:statements AS text[]), CAST(:groups AS integer[]), "
+                    "CAST(:targets AS text[]), CAST(:names AS text[]))"
+                ),
+                {"statements": statements, "groups": groups, "targets": targets, "names": probe_names},
+            ).all()
+        elif shadow:
+            log.warning(
+                "Shadow check constraint probes need the TEMP privilege on the database; treating check constraints "
+                "on %d tables as unchanged",
+                len(tables),
             )
-        rows = conn.execute(text(_PROBE_QUERY), {"table": qualified, "names": list(probes)}).all()
-        normalized = {probes[row.name]: row.expression for row in rows}
+        else:
+            rows = _try_one_by_one(conn, statements, groups, targets, probe_names)
+        for step, error, expression in rows:
+            key, name, qualified = steps[int(step) - 1]
+            if expression is not None and name is not None:
+                normalized[key][name] = expression
+            elif name is None:
+                log.warning("Could not create a shadow of %s: %s", qualified, error)
+            else:
+                log.warning("Could not canonicalize check constraint %r on %s: %s", name, qualified, error)
     except DBAPIError:
         log.warning(
-            "Could not canonicalize check constraints on %s; treating them as unchanged", qualified, exc_info=True
+            "Could not canonicalize check constraints on %d tables; treating them as unchanged",
+            len(tables),
+            exc_info=True,
         )
-        normalized = {}
+        normalized = {key: {} for key in tables}
     finally:
         savepoint.rollback()
         log.debug("Check constraint canonicalization savepoint rolled back")
 
-    missing = set(expressions) - set(normalized)
-    if missing:
-        log.warning("Canonicalization produced no expression for check constraints: %s", sorted(missing))
-
-    return normalized
+    for (schema, table_name), expressions in tables.items():
+        missing = set(expressions) - set(normalized[schema, table_name])
+        if missing:
+            log.warning(
+                "Canonicalization produced no expression for check constraints on %s: %s", table_name, sorted(missing)
+            )
+    log.debug("Canonicalized %d check constraints across %d tables", len(set(probe_names) - {None}), len(tables))
+    return dict(normalized)
 
 
 _PROBE_PREFIX = "_alembic_pg_autogen_probe_"
 
+_SHADOW_PREFIX = "_alembic_pg_autogen_shadow_"
+
+_TRY_BATCH_FUNCTION = "pg_temp.alembic_pg_autogen_try"
+
+# Created inside the check constraint savepoint and rolled back with it.  Each table's statements run in a
+# subtransaction that is rolled back, by raising, once its probes are read back: rolling a subtransaction back releases
+# the locks it took, so no more than one table is locked at a time.  A table's statements first run together; only when
+# one fails is each retried in a subtransaction of its own, which keeps the common case from allocating one
+# subtransaction per probe.  A row reports either a failed statement's error or a probe's expression, by step.
+# ``to_regclass()`` rather than a cast: a probe whose table does not exist has failed, and must not fail the read-back.
+_TRY_BATCH_FUNCTION_DDL = f"""\
+CREATE FUNCTION {_TRY_BATCH_FUNCTION}(statements text[], groups integer[], targets text[], names text[])
+RETURNS TABLE (step integer, error text, expression text)
+LANGUAGE plpgsql AS $try$
+DECLARE
+    first integer := 1;
+    last integer;
+    found_steps integer[];
+    found_expressions text[];
+BEGIN
+    WHILE first <= cardinality(statements) LOOP
+        last := first;
+        WHILE last < cardinality(statements) AND groups[last + 1] = groups[first] LOOP
+            last := last + 1;
+        END LOOP;
+        BEGIN
+            BEGIN
+                FOR i IN first .. last LOOP
+                    EXECUTE statements[i];
+                END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                FOR i IN first .. last LOOP
+                    BEGIN
+                        EXECUTE statements[i];
+                    EXCEPTION WHEN OTHERS THEN
+                        step := i;
+                        error := SQLERRM;
+                        expression := NULL;
+                        RETURN NEXT;
+                    END;
+                END LOOP;
+            END;
+            SELECT array_agg(p.i), array_agg(pg_catalog.pg_get_expr(con.conbin, con.conrelid, true))
+              INTO found_steps, found_expressions
+              FROM generate_series(first, last) AS p(i)
+              JOIN pg_catalog.pg_constraint con
+                ON con.conrelid = pg_catalog.to_regclass(targets[p.i])
+               AND con.conname = names[p.i];
+            RAISE EXCEPTION USING ERRCODE = 'raise_exception';
+        EXCEPTION WHEN raise_exception THEN
+            NULL;
+        END;
+        FOR i IN 1 .. coalesce(cardinality(found_steps), 0) LOOP
+            step := found_steps[i];
+            error := NULL;
+            expression := found_expressions[i];
+            RETURN NEXT;
+        END LOOP;
+        first := last + 1;
+    END LOOP;
+END
+$try$
+"""
+
+
+# Reads back the probes of one table by step, as the helper function does.
 _PROBE_QUERY = """\
 SELECT
-    con.conname AS name,
+    p.step,
+    CAST(NULL AS text) AS error,
     pg_catalog.pg_get_expr(con.conbin, con.conrelid, true) AS expression
-FROM pg_catalog.pg_constraint con
-WHERE con.conrelid = CAST(:table AS regclass)
-  AND con.conname = ANY(:names)
+FROM unnest(CAST(:steps AS integer[]), CAST(:targets AS text[]), CAST(:names AS text[])) AS p(step, target, name)
+JOIN pg_catalog.pg_constraint con
+  ON con.conrelid = pg_catalog.to_regclass(p.target)
+ AND con.conname = p.name
+"""
+
+
+def _try_one_by_one(
+    conn: Connection,
+    statements: Sequence[str],
+    groups: Sequence[int],
+    targets: Sequence[str | None],
+    names: Sequence[str | None],
+) -> list[tuple[int, str | None, str | None]]:
+    """Do what :data:`_TRY_BATCH_FUNCTION_DDL` does without creating it, for a role without the ``TEMP`` privilege.
+
+    Each table's probes run in a savepoint that is rolled back once they are read back, and each probe in a savepoint
+    of its own within it, so a failing probe is skipped on its own and no more than one table is locked at a time.  It
+    takes a round trip per statement.
+    """
+    results: list[tuple[int, str | None, str | None]] = []
+    for _, group in groupby(range(len(statements)), key=groups.__getitem__):
+        indexes = list(group)
+        table_savepoint = conn.begin_nested()
+        try:
+            for index in indexes:
+                probe_savepoint = conn.begin_nested()
+                try:
+                    conn.execute(text(_BIND_PARAMETER.sub(r"\\:\1", statements[index])))
+                except DBAPIError as exc:
+                    probe_savepoint.rollback()
+                    results.append((index + 1, str(exc.orig).strip(), None))
+                else:
+                    probe_savepoint.commit()
+            rows = conn.execute(
+                text(_PROBE_QUERY),
+                {
+                    "steps": [index + 1 for index in indexes],
+                    "targets": [targets[index] for index in indexes],
+                    "names": [names[index] for index in indexes],
+                },
+            ).all()
+            results.extend((row.step, row.error, row.expression) for row in rows)
+        finally:
+            table_savepoint.rollback()
+    log.debug("Probed %d check constraint statements one by one, lacking the TEMP privilege", len(statements))
+    return results
+
+
+_BATCH_FUNCTION = "pg_temp.alembic_pg_autogen_execute"
+
+# Created inside the canonicalization savepoint, so it disappears with the savepoint's rollback.  Without an exception
+# block a failing statement's error reaches the client untouched: its SQLSTATE, message, DETAIL and HINT are the
+# statement's own, and PostgreSQL names the statement itself in the error's QUERY or CONTEXT.
+_BATCH_FUNCTION_DDL = f"""\
+CREATE FUNCTION {_BATCH_FUNCTION}(statements text[]) RETURNS void LANGUAGE plpgsql AS $batch$
+DECLARE
+    statement text;
+BEGIN
+    FOREACH statement IN ARRAY statements LOOP
+        EXECUTE statement;
+    END LOOP;
+END
+$batch$
 """
 
+_TEMP_PRIVILEGE_QUERY = "SELECT has_database_privilege(current_database(), 'TEMP')"
+
+# The pattern ``text()`` takes for a bind parameter; each match is escaped so the DDL reaches the server as written.
+_BIND_PARAMETER = re.compile(r"(?<![:\w\\]):(\w+)(?!:)")
+
+
+def _execute_batch(conn: Connection, statements: Sequence[str]) -> None:
+    """Execute *statements* in order in a fixed number of round trips, however many there are.
+
+    The statements travel as one ``text[]`` bind parameter to a temporary PL/pgSQL function that runs each with
+    ``EXECUTE``.  Being a parameter, the SQL is never scanned for SQLAlchemy bind markers.  Must be called inside a
+    savepoint, which the temporary function is rolled back with.  A role without the ``TEMP`` privilege on the database
+    cannot create the function, and executes the statements one round trip each instead.
+    """
+    if not statements:
+        return
+    with phase("canonicalize_execute") as counts:
+        counts["statements"] = len(statements)
+        if not conn.execute(text(_TEMP_PRIVILEGE_QUERY)).scalar():
+            for statement in statements:
+                conn.execute(text(_BIND_PARAMETER.sub(r"\\:\1", statement)))
+            log.debug("Executed %d canonicalization statements one by one, lacking the TEMP privilege", len(statements))
+            return
+        conn.execute(text(_BATCH_FUNCTION_DDL))
+        conn.execute(text(f"SELECT {_BATCH_FUNCTION}(CAST(:statements AS text[]))"), {"statements": list(statements)})
+    log.debug("Executed %d canonicalization statements in one batch", len(statements))
+
+
+_CACHE_CONTEXT_QUERY = """\
+SELECT
+    current_setting('server_version_num') AS server_version_num,
+    current_setting('server_encoding') AS server_encoding,
+    array_to_string(current_schemas(true), ',') AS search_path,
+    current_schema() AS current_schema
+"""
+
+# Reads back declared functions by signature rather than by name, which pins each statement to exactly the overload it
+# created.  The signatures come from each statement's parsed ``DROP`` and are resolved through the connection's search_path.
+_FUNCTIONS_BY_SIGNATURE_QUERY = """\
+SELECT
+    s.position,
+    n.nspname AS schema,
+    p.proname AS name,
+    pg_catalog.pg_get_function_identity_arguments(p.oid) AS identity_args,
+    pg_get_functiondef(p.oid) AS definition
+FROM unnest(CAST(:signatures AS text[])) WITH ORDINALITY AS s(signature, position)
+JOIN pg_catalog.pg_proc p ON p.oid = CAST(s.signature AS regprocedure)
+JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
+"""
+
+
+def _canonicalize_cached(
+    conn: Connection,
+    cache: CanonicalizationCache,
+    function_ddl: Sequence[ParsedDDL] | None,
+    view_ddl: Sequence[ParsedDDL] | None,
+    trigger_ddl: Sequence[ParsedDDL] | None,
+    baseline: CanonicalState | None,
+) -> CanonicalState | None:
+    """Canonicalize the declared objects through *cache*, or return *None* if the server cannot use it.
+
+    An ignored object type is passed as *None*.
+    """
+    context = conn.execute(text(_CACHE_CONTEXT_QUERY)).one()
+    if context.server_encoding != "UTF8":
+        log.info("Canonicalization cache bypassed: server encoding is %s, not UTF8", context.server_encoding)
+        return None
+
+    functions, views, triggers = function_ddl or (), view_ddl or (), trigger_ddl or ()
+    version = None
+    if not all(parsed.self_contained for parsed in (*functions, *views, *triggers)):
+        version = catalog_version(conn, schema=cache.counter_schema)
+        if version is None:
+            log.info(
+                "Canonicalization cache: no change counter in %r, so only functions are cached", cache.counter_schema
+            )
+    # Statements whose canonical form depends on a catalog of unknown version get keys no entry is stored under.
+    uncached: set[str] = set()
+
+    def keys(kind: str, stmts: Sequence[ParsedDDL]) -> list[str]:
+        result: list[str] = []
+        for parsed in stmts:
+            if parsed.self_contained or version is not None:
+                key = cache.key(
+                    kind,
+                    parsed.or_replace,
+                    server_version_num=context.server_version_num,
+                    search_path=context.search_path,
+                    catalog=None if parsed.self_contained else version,
+                )
+            else:
+                key = f"uncached:{kind}:{len(uncached)}"
+                uncached.add(key)
+            result.append(key)
+        return result
+
+    function_keys, view_keys, trigger_keys = keys("function", functions), keys("view", views), keys("trigger", triggers)
+    records = cache.get_many([key for key in (*function_keys, *view_keys, *trigger_keys) if key not in uncached])
+    missing = [key for key in (*function_keys, *view_keys, *trigger_keys) if key not in records]
+
+    if missing:
+        log.info("Canonicalization cache: %d of %d statements missed", len(missing), len(records) + len(missing))
+        fresh = _read_back_misses(
+            conn,
+            context.current_schema,
+            [(key, parsed) for key, parsed in zip(function_keys, functions, strict=True) if key not in records],
+            [(key, parsed) for key, parsed in zip(view_keys, views, strict=True) if key not in records],
+            [(key, parsed) for key, parsed in zip(trigger_keys, triggers, strict=True) if key not in records],
+            [parsed.or_replace for parsed in (*functions, *views, *triggers)],
+        )
+        cache.put_many({key: record for key, record in fresh.items() if key not in uncached})
+        records.update(fresh)
+    else:
+        log.info("Canonicalization cache: all %d statements hit", len(records))
+
+    state = CanonicalState(
+        functions=() if function_ddl is None else _assemble(FunctionInfo, function_keys, records),
+        triggers=() if trigger_ddl is None else _assemble(TriggerInfo, trigger_keys, records),
+        views=() if view_ddl is None else _assemble(ViewInfo, view_keys, records),
+    )
+    return state if baseline is None else apply_baseline(state, baseline)
+
+
+def _read_back_misses(
+    conn: Connection,
+    default_schema: str,
+    functions: Sequence[tuple[str, ParsedDDL]],
+    views: Sequence[tuple[str, ParsedDDL]],
+    triggers: Sequence[tuple[str, ParsedDDL]],
+    statements: Sequence[str],
+) -> dict[str, list[str]]:
+    """Execute every statement in a savepoint and read back the records of the ``(key, parsed)`` misses, by key.
+
+    All *statements* run, not just the misses, because a missed statement may depend on a cached one.
+    """
+    view_ids = list(
+        zip(
+            [key for key, _ in views],
+            cast("list[_NameIdentity]", _identities([parsed for _, parsed in views])),
+            strict=True,
+        )
+    )
+    trigger_ids = list(
+        zip(
+            [key for key, _ in triggers],
+            cast("list[_TriggerIdentity]", _identities([parsed for _, parsed in triggers])),
+            strict=True,
+        )
+    )
+    keys_by_identity = {_resolved(identity, default_schema): key for key, identity in (*view_ids, *trigger_ids)}
+    signatures = [_signature(parsed) for _, parsed in functions]
+
+    fresh: dict[str, list[str]] = {}
+    savepoint = conn.begin_nested()
+    try:
+        _execute_batch(conn, statements)
+        with phase("canonicalize_read_back") as counts:
+            if functions:
+                rows = conn.execute(text(_FUNCTIONS_BY_SIGNATURE_QUERY), {"signatures": signatures})
+                for row in rows:
+                    fresh[functions[row.position - 1][0]] = [row.schema, row.name, row.identity_args, row.definition]
+            if views or triggers:
+                loaded = inspect_catalog(
+                    conn,
+                    functions=False,
+                    triggers=bool(triggers),
+                    views=bool(views),
+                    trigger_identities=[identity for _, identity in trigger_ids],
+                    view_identities=[identity for _, identity in view_ids],
+                )
+                fresh.update(
+                    (keys_by_identity[record[:-1]], list(record)) for record in (*loaded.triggers, *loaded.views)
+                )
+            counts.update(functions=len(functions), triggers=len(triggers), views=len(views))
+    finally:
+        savepoint.rollback()
+        log.debug("Canonicalization savepoint rolled back")
+    return fresh
+
+
+_InfoT = TypeVar("_InfoT", FunctionInfo, TriggerInfo, ViewInfo)
+
+
+def _assemble(record_type: type[_InfoT], keys: Sequence[str], records: Mapping[str, Sequence[str]]) -> list[_InfoT]:
+    """Build the records for *keys* in identity order, as :func:`inspect_catalog` returns them."""
+    by_identity = {
+        record[:-1]: record for record in (catalog_record(record_type, records[key]) for key in keys if key in records)
+    }
+    return [by_identity[identity] for identity in sorted(by_identity)]
+
+
+def _against_baseline(records: Sequence[_InfoT], known: Sequence[_InfoT]) -> Sequence[_InfoT]:
+    """Replace each definition that matches its *known* digest by that digest, as a baseline read-back would."""
+    if not records:
+        return records
+    digests = {item[:-1]: item[-1] for item in known}
+    return [
+        record._replace(definition=digests[record[:-1]])
+        if digests.get(record[:-1]) == definition_digest(record.definition)
+        else record
+        for record in records
+    ]
+
+
+def _signature(parsed: ParsedDDL) -> str:
+    """Return the ``regprocedure`` signature of a function statement — its ``DROP`` without the leading keywords."""
+    if parsed.drop is None:
+        raise ValueError(f"Cannot parse function identity from DDL: {parsed.source!r}")
+    return parsed.drop.split(" ", 2)[2]
+
+
+def _resolved(identity: tuple[str | None, ...], default_schema: str) -> tuple[str | None, ...]:
+    """Fill in the schema of an unqualified identity, as PostgreSQL resolved it when the DDL ran."""
+    schema, *names = identity
+    return (schema if schema is not None else default_schema, *names)
+
+
+def _identities(stmts: Sequence[ParsedDDL]) -> list[tuple[str | None, Unpack[tuple[str, ...]]]]:
+    """Return the identity of every statement in *stmts*, raising if one does not declare an object of its kind."""
+    identities: list[tuple[str | None, Unpack[tuple[str, ...]]]] = []
+    for parsed in stmts:
+        if parsed.identity is None:
+            raise ValueError(f"Cannot parse {parsed.kind} identity from DDL: {parsed.source!r}")
+        identities.append(parsed.identity)
+    return identities
+
 
-def _declared(ddl: Sequence[str] | Ignored) -> Sequence[str]:
-    """Return the DDL statements to execute, treating :data:`~alembic_pg_autogen.IGNORED` as "none"."""
-    return () if ddl is IGNORED else ddl
+def _declared(ddl: Sequence[str | ParsedDDL] | Ignored, kind: DDLKind) -> Sequence[ParsedDDL]:
+    """Parse the DDL statements to execute, treating :data:`~alembic_pg_autogen.IGNORED` as "none"."""
+    return () if ddl is IGNORED else [ensure_parsed(item, kind) for item in ddl]
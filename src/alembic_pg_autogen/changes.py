@@ -0,0 +1,126 @@
+"""A catalog change counter, kept by event triggers, that tells when the catalog has not changed since a snapshot.
+
+:func:`install_change_counter` adds a bookkeeping schema holding a database-wide counter and two event triggers that
+bump it whenever DDL creates, alters or drops anything outside temporary schemas.  :func:`catalog_version` reads it
+back: while the version is unchanged, so is everything :func:`~alembic_pg_autogen.inspect.inspect_catalog` would return,
+and a stored snapshot can be reused.
+
+The counter is one for the whole database rather than one per schema.  A definition deparsed in one schema changes with
+DDL in another: renaming a column of ``a.t`` rewrites a view in ``b`` that selects from it, and renaming ``a.f()``
+rewrites a trigger in ``b`` that calls it.  A statement moving an object with ``SET SCHEMA`` changes the schema it left,
+which no event trigger function can name.  Event triggers do not fire while ``event_triggers`` is off; clear any
+snapshot cache after DDL run that way.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlalchemy import text
+
+if TYPE_CHECKING:
+    from typing import Final
+
+    from sqlalchemy import Connection
+
+log = logging.getLogger(__name__)
+
+COUNTER_SCHEMA: Final = "alembic_pg_autogen"
+"""The schema :func:`install_change_counter` keeps its table and trigger function in, unless told otherwise."""
+
+_EVENT_TRIGGERS: Final = ("alembic_pg_autogen_ddl_end", "alembic_pg_autogen_sql_drop")
+
+
+class CatalogVersion(NamedTuple):
+    """The version of a database's catalog, as :func:`catalog_version` read it.
+
+    Two versions are equal only if no counted DDL ran in between, on the same database.
+    """
+
+    database: str
+    server_version_num: str
+    counter: int
+    """The database-wide change counter."""
+
+
+def install_change_counter(conn: Connection, *, schema: str = COUNTER_SCHEMA) -> None:
+    """Create the counter table, its trigger function and the event triggers, replacing any earlier install.
+
+    Event triggers are database-wide and creating them requires a superuser.  The trigger function runs with the
+    privileges of the installing role, so DDL by any role is counted.  Runs in the caller's transaction; commit it.
+    """
+    quoted = conn.dialect.identifier_preparer.quote_schema(schema)
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {quoted}"))
+    # A single row, seeded with a random value so a counter from before an uninstall never matches one from after it.
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {quoted}.catalog_version "
+            "(single boolean PRIMARY KEY DEFAULT true CHECK (single), version bigint NOT NULL)"
+        )
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO {quoted}.catalog_version (version) "
+            "VALUES ((random() * 2 ^ 52)::bigint) ON CONFLICT DO NOTHING"
+        )
+    )
+    conn.execute(text(_BUMP_FUNCTION.format(schema=quoted)))
+    for name, event in zip(_EVENT_TRIGGERS, ("ddl_command_end", "sql_drop"), strict=True):
+        conn.execute(text(f"DROP EVENT TRIGGER IF EXISTS {name}"))
+        conn.execute(text(f"CREATE EVENT TRIGGER {name} ON {event} EXECUTE FUNCTION {quoted}.bump_catalog_version()"))
+    log.info("Catalog change counter installed in schema %r", schema)
+
+
+def uninstall_change_counter(conn: Connection, *, schema: str = COUNTER_SCHEMA) -> None:
+    """Drop the event triggers and the bookkeeping schema.  Runs in the caller's transaction; commit it."""
+    for name in _EVENT_TRIGGERS:
+        conn.execute(text(f"DROP EVENT TRIGGER IF EXISTS {name}"))
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {conn.dialect.identifier_preparer.quote_schema(schema)} CASCADE"))
+    log.info("Catalog change counter uninstalled from schema %r", schema)
+
+
+def catalog_version(conn: Connection, *, schema: str = COUNTER_SCHEMA) -> CatalogVersion | None:
+    """Return the current version of the catalog.
+
+    Read it before inspecting: a change committed between the two then makes the stored version stale, never the
+    snapshot.
+
+    Returns:
+        The version, or *None* if the change counter is not installed in *schema*.
+    """
+    quoted = conn.dialect.identifier_preparer.quote_schema(schema)
+    row = conn.execute(
+        text(
+            "SELECT current_database() AS database, current_setting('server_version_num') AS server_version_num, "
+            "to_regclass(:table) IS NOT NULL AS installed"
+        ),
+        {"table": f"{quoted}.catalog_version"},
+    ).one()
+    if not row.installed:
+        log.debug("Catalog change counter is not installed in schema %r", schema)
+        return None
+    counter = conn.execute(text(f"SELECT version FROM {quoted}.catalog_version")).scalar_one()
+    return CatalogVersion(row.database, row.server_version_num, counter)
+
+
+# Bumps the counter once per command that touched anything outside temporary schemas.  A drop reports its objects to
+# ``sql_drop`` and none to ``ddl_command_end``, so it is counted once.
+_BUMP_FUNCTION = """\
+CREATE OR REPLACE FUNCTION {schema}.bump_catalog_version() RETURNS event_trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp AS $$
+DECLARE
+    counted boolean;
+BEGIN
+    IF TG_EVENT = 'sql_drop' THEN
+        SELECT bool_or(NOT o.is_temporary) INTO counted FROM pg_event_trigger_dropped_objects() o;
+    ELSE
+        SELECT bool_or(c.schema_name IS NULL OR c.schema_name !~ '^pg_(toast_)?temp')
+        INTO counted
+        FROM pg_event_trigger_ddl_commands() c;
+    END IF;
+    IF counted THEN
+        UPDATE {schema}.catalog_version SET version = version + 1;
+    END IF;
+END
+$$"""
@@ -4,16 +4,26 @@ from __future__ import annotations
 
 import difflib
 import logging
-from typing import TYPE_CHECKING, Protocol
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Protocol, TypeVar
 
 from alembic.runtime.plugins import Plugin
 from alembic.util import PriorityDispatchResult
-from sqlalchemy import Connection
-
-from alembic_pg_autogen.canonicalize import CanonicalState, canonicalize
-from alembic_pg_autogen.diff import Action, diff
-from alembic_pg_autogen.inspect import current_schema, inspect_functions, inspect_triggers, inspect_views
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+
+from alembic_pg_autogen.cache import CanonicalizationCache, SnapshotCache
+from alembic_pg_autogen.canonicalize import apply_baseline, canonicalize
+from alembic_pg_autogen.changes import catalog_version
+from alembic_pg_autogen.context import run_context
+from alembic_pg_autogen.ddl import alter_function_statement, ensure_parsed, parse_ddl
+from alembic_pg_autogen.diff import Action, DiffResult, diff
+from alembic_pg_autogen.inspect import CanonicalState, FunctionInfo, TriggerInfo, inspect_catalog
+from alembic_pg_autogen.observe import observing, phase, run_observers
 from alembic_pg_autogen.ops import (
+    AlterFunctionOp,
     CreateFunctionOp,
     CreateTriggerOp,
     CreateViewOp,
@@ -24,23 +34,47 @@ from alembic_pg_autogen.ops import (
     ReplaceTriggerOp,
     ReplaceViewOp,
 )
+from alembic_pg_autogen.parallel import deparse_settings, inspect_catalog_parallel, sibling_connection
+from alembic_pg_autogen.replica import resolve_hot_standby
 from alembic_pg_autogen.sentinels import IGNORED
+from alembic_pg_autogen.shadow import ShadowDatabase
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Mapping, Sequence
+    import os
+    from collections.abc import Callable, Iterable, Mapping, Sequence
     from typing import Final
 
     from alembic.autogenerate.api import AutogenContext
     from alembic.operations.ops import MigrateOperation, UpgradeOps
+    from sqlalchemy import URL, Engine
 
+    from alembic_pg_autogen.context import RunContext
+    from alembic_pg_autogen.ddl import DDLKind, ParsedDDL
     from alembic_pg_autogen.diff import FunctionOp, TriggerOp, ViewOp
-    from alembic_pg_autogen.inspect import FunctionInfo, TriggerInfo, ViewInfo
+    from alembic_pg_autogen.inspect import ViewInfo
     from alembic_pg_autogen.sentinels import Ignored
 
 log = logging.getLogger(__name__)
 
 _DESIRED_STATE_KEYS: Final = ("pg_functions", "pg_triggers", "pg_views")
-"""Configuration keys this comparator reads from ``autogen_context.opts``."""
+"""Configuration keys this comparator reads the desired state from."""
+
+_OPTION_KEYS: Final = (
+    "pg_canonicalize_cache",
+    "pg_inspect_workers",
+    "pg_lock_free_check_constraints",
+    "pg_observers",
+    "pg_pipeline",
+    "pg_replica_max_lag",
+    "pg_replica_url",
+    "pg_shadow_template",
+    "pg_shadow_url",
+    "pg_snapshot_cache",
+)
+"""Configuration keys that tune how this package's comparators run rather than what they manage."""
+
+_PIPELINE_LOCK_TIMEOUT: Final = "1s"
+"""How long ``pg_pipeline``'s second connection waits for a lock before canonicalization falls back to the first."""
 
 _TYPO_CUTOFF: Final = 0.8
 """Similarity above which an unrecognized ``pg_*`` option is reported as a probable misspelling."""
@@ -77,6 +111,16 @@ def _compare_pg_objects(
     schemas: set[str | None],
 ) -> PriorityDispatchResult:
     """Compare current database state against desired functions/triggers/views."""
+    with observing(run_observers(autogen_context)):
+        return _compare_observed(autogen_context, upgrade_ops, schemas)
+
+
+def _compare_observed(
+    autogen_context: AutogenContext,
+    upgrade_ops: UpgradeOps,
+    schemas: set[str | None],
+) -> PriorityDispatchResult:
+    """The body of :func:`_compare_pg_objects`, run with the run's observers active."""
     opts = autogen_context.opts  # pyright: ignore[reportAttributeAccessIssue]
     log.debug(
         "_compare_pg_objects called, schemas=%r, pg_functions in opts=%r, pg_triggers in opts=%r, pg_views in opts=%r",
@@ -87,9 +131,12 @@ def _compare_pg_objects(
     )
     _warn_unrecognized_options(opts)
 
-    pg_functions = _resolve_ddl(opts.get("pg_functions", IGNORED))
-    pg_triggers = _resolve_ddl(opts.get("pg_triggers", IGNORED))
-    pg_views = _resolve_ddl(opts.get("pg_views", IGNORED))
+    # Each statement is parsed exactly once, here; canonicalization and filtering reuse the parsed form.
+    with phase("parse") as counts:
+        pg_functions = _parse_declared(_resolve_ddl(opts.get("pg_functions", IGNORED)), "function")
+        pg_triggers = _parse_declared(_resolve_ddl(opts.get("pg_triggers", IGNORED)), "trigger")
+        pg_views = _parse_declared(_resolve_ddl(opts.get("pg_views", IGNORED)), "view")
+        counts.update(_declared_counts(pg_functions, pg_triggers, pg_views))
 
     unmanaged = [
         label
@@ -102,42 +149,97 @@ def _compare_pg_objects(
     if unmanaged:
         log.info("PostgreSQL object types left unmanaged: %s", ", ".join(unmanaged))
 
-    conn = autogen_context.connection
-    assert conn is not None  # guaranteed during online autogenerate
+    run = run_context(autogen_context)
+    conn = run.connection
 
-    resolved_schemas = _resolve_schemas(conn, schemas)
+    snapshot_cache = _resolve_snapshot_cache(opts.get("pg_snapshot_cache"))
+    resolved_schemas = _resolve_schemas(run, schemas)
+    if snapshot_cache is not None and resolved_schemas is not None:
+        # The change counter's own trigger function is not the project's to manage.
+        resolved_schemas = [schema for schema in resolved_schemas if schema != snapshot_cache.counter_schema]
     log.debug("resolved_schemas=%r", resolved_schemas)
 
-    current_functions: Sequence[FunctionInfo] = ()
-    current_triggers: Sequence[TriggerInfo] = ()
-    current_views: Sequence[ViewInfo] = ()
-    if pg_functions is not IGNORED:
-        current_functions = inspect_functions(conn, resolved_schemas)
-    if pg_triggers is not IGNORED:
-        current_triggers = inspect_triggers(conn, resolved_schemas)
-    if pg_views is not IGNORED:
-        current_views = inspect_views(conn, resolved_schemas)
-    current = CanonicalState(functions=current_functions, triggers=current_triggers, views=current_views)
-    log.info(
-        "Found %d functions, %d triggers, and %d views in database",
-        len(current_functions),
-        len(current_triggers),
-        len(current_views),
-    )
-
-    canonical = canonicalize(conn, function_ddl=pg_functions, view_ddl=pg_views, trigger_ddl=pg_triggers)
-    canonical = _filter_to_schemas(canonical, resolved_schemas)
-    desired = _filter_to_declared(canonical, pg_functions, pg_triggers, pg_views, conn)
-    log.debug(
-        "desired: %d functions, %d triggers, %d views",
-        len(desired.functions),
-        len(desired.triggers),
-        len(desired.views),
-    )
-
-    result = diff(current, desired)
+    # Definitions are fetched lazily: the current state is loaded as digests, canonicalization returns full definitions
+    # only for objects whose digest changed, and the current definitions an op renders are hydrated after the diff.
+    standby = resolve_hot_standby(opts.get("pg_replica_url"), opts.get("pg_replica_max_lag"))
+    canonicalize_cache = _resolve_cache(opts.get("pg_canonicalize_cache"))
+    shadow = _resolve_shadow(opts.get("pg_shadow_url"), opts.get("pg_shadow_template"))
+
+    # The inspecting session stays open until hydration, which must read the catalog the digests were taken from: a
+    # standby lags the primary, so the primary may hold other definitions, or none, for the objects the diff names.
+    with nullcontext(conn) if standby is None else standby.inspecting(conn) as inspector:
+
+        def inspect_current() -> CanonicalState:
+            with phase("inspect") as counts:
+                current, cached = _inspect_current(
+                    inspector,
+                    resolved_schemas,
+                    snapshot_cache,
+                    workers=opts.get("pg_inspect_workers", 1),
+                    functions=pg_functions is not IGNORED,
+                    triggers=pg_triggers is not IGNORED,
+                    views=pg_views is not IGNORED,
+                )
+                counts.update(_state_counts(current))
+                if snapshot_cache is not None:
+                    counts["cached"] = int(cached)
+            log.info(
+                "Found %d functions, %d triggers, and %d views in %s",
+                len(current.functions),
+                len(current.triggers),
+                len(current.views),
+                "the snapshot cache, the catalog being unchanged" if cached else "database",
+            )
+            return current
+
+        # With a shadow database the declared DDL never runs on the migration connection, which is only read from.
+        with nullcontext() if shadow is None else shadow.prepared(conn, autogen_context.metadata) as scratch:
+            pipelined = (
+                _canonicalize_alongside(
+                    conn, inspect_current, pg_functions, pg_triggers, pg_views, canonicalize_cache, shadow=scratch
+                )
+                if opts.get("pg_pipeline")
+                else None
+            )
+            if pipelined is not None:
+                current, canonical = pipelined
+            else:
+                current = inspect_current()
+                canonical = canonicalize(
+                    conn if scratch is None else scratch,
+                    function_ddl=pg_functions,
+                    view_ddl=pg_views,
+                    trigger_ddl=pg_triggers,
+                    declared_only=True,
+                    baseline=current,
+                    cache=canonicalize_cache,
+                )
+        with phase("filter") as counts:
+            canonical = filter_to_schemas(canonical, resolved_schemas)
+            desired = with_undeclared_overloads(
+                _filter_to_declared(canonical, pg_functions, pg_triggers, pg_views, run), current
+            )
+            counts.update(_state_counts(desired))
+        log.debug(
+            "desired: %d functions, %d triggers, %d views",
+            len(desired.functions),
+            len(desired.triggers),
+            len(desired.views),
+        )
 
-    ops = _order_ops(result.function_ops, result.trigger_ops, result.view_ops)
+        with phase("diff") as counts:
+            result = diff(current, desired)
+            counts.update(
+                functions=len(result.function_ops), triggers=len(result.trigger_ops), views=len(result.view_ops)
+            )
+        with phase("hydrate") as counts:
+            result = _hydrate_current(inspector, result)
+            counts["ops"] = sum(
+                op.current is not None for op in (*result.function_ops, *result.trigger_ops, *result.view_ops)
+            )
+    with phase("order") as counts:
+        ops = _order_ops(result.function_ops, result.trigger_ops, result.view_ops)
+        counts["ops"] = len(ops)
     log.info("Autogenerate produced %d migration ops: %r", len(ops), [type(o).__name__ for o in ops])
     upgrade_ops.ops.extend(ops)
 
@@ -151,10 +253,11 @@ def _warn_unrecognized_options(opts: Mapping[str, object]) -> None:
     disable management of that type.  Only close matches are reported: a ``pg_*`` option belonging to another plugin is
     not a typo and is left alone.
     """
+    known = (*_DESIRED_STATE_KEYS, *_OPTION_KEYS)
     for key in opts:
-        if key in _DESIRED_STATE_KEYS or not key.startswith("pg_"):
+        if key in known or not key.startswith("pg_"):
             continue
-        matches = difflib.get_close_matches(key, _DESIRED_STATE_KEYS, n=1, cutoff=_TYPO_CUTOFF)
+        matches = difflib.get_close_matches(key, known, n=1, cutoff=_TYPO_CUTOFF)
         if matches:
             log.warning("Unrecognized autogenerate option %r — did you mean %r?", key, matches[0])
 
@@ -170,36 +273,210 @@ def _resolve_ddl(items: Sequence[str | SQLCreatable] | Ignored) -> tuple[str, ..
     return tuple(item if isinstance(item, str) else item.to_sql_statement_create().text for item in items)
 
 
+def _parse_declared(ddl: Sequence[str] | Ignored, kind: DDLKind) -> tuple[ParsedDDL, ...] | Ignored:
+    """Parse every declared statement of *kind*, passing :data:`~alembic_pg_autogen.IGNORED` through unchanged."""
+    if ddl is IGNORED:
+        return IGNORED
+    return tuple(parse_ddl(item, kind) for item in ddl)
+
+
+def _declared_counts(
+    functions: Sequence[ParsedDDL] | Ignored,
+    triggers: Sequence[ParsedDDL] | Ignored,
+    views: Sequence[ParsedDDL] | Ignored,
+) -> dict[str, int]:
+    """Count the declared statements of each managed kind, for observers."""
+    declared = {"functions": functions, "triggers": triggers, "views": views}
+    return {kind: len(statements) for kind, statements in declared.items() if statements is not IGNORED}
+
+
+def _state_counts(state: CanonicalState) -> dict[str, int]:
+    """Count the objects of each kind in *state*, for observers."""
+    return {"functions": len(state.functions), "triggers": len(state.triggers), "views": len(state.views)}
+
+
+def _resolve_cache(option: str | os.PathLike[str] | CanonicalizationCache | None) -> CanonicalizationCache | None:
+    """Turn the ``pg_canonicalize_cache`` option — a cache or the path of its file — into a cache."""
+    if option is None or isinstance(option, CanonicalizationCache):
+        return option
+    return CanonicalizationCache(option)
+
+
+def _resolve_snapshot_cache(option: str | os.PathLike[str] | SnapshotCache | None) -> SnapshotCache | None:
+    """Turn the ``pg_snapshot_cache`` option — a cache or the path of its file — into a cache."""
+    if option is None or isinstance(option, SnapshotCache):
+        return option
+    return SnapshotCache(option)
+
+
+def _resolve_shadow(option: str | URL | Engine | ShadowDatabase | None, template: str | None) -> ShadowDatabase | None:
+    """Turn the ``pg_shadow_url`` option — a shadow database, an engine, or a URL — into a shadow database.
+
+    ``pg_shadow_template`` applies only when the option is not already a :class:`~alembic_pg_autogen.ShadowDatabase`.
+    """
+    if option is None or isinstance(option, ShadowDatabase):
+        return option
+    return ShadowDatabase(option, template=template)
+
+
+def _inspect_current(
+    conn: Connection,
+    schemas: Sequence[str] | None,
+    cache: SnapshotCache | None,
+    *,
+    workers: int,
+    functions: bool,
+    triggers: bool,
+    views: bool,
+) -> tuple[CanonicalState, bool]:
+    """Load the current state as digests, from *cache* if the catalog has not changed since it was stored.
+
+    Returns the state and whether it came from the cache.  Without the change counter installed the catalog is
+    always inspected, and the cache left untouched.  The catalog is inspected on *workers* connections.
+    """
+
+    def inspect() -> CanonicalState:
+        return inspect_catalog_parallel(
+            conn, schemas, workers=workers, functions=functions, triggers=triggers, views=views, digests=True
+        )
+
+    if cache is None:
+        return inspect(), False
+
+    version = catalog_version(conn, schema=cache.counter_schema)
+    if version is None:
+        log.warning(
+            "pg_snapshot_cache is set but the catalog change counter is not installed in schema %r; "
+            "inspecting the catalog",
+            cache.counter_schema,
+        )
+        return inspect(), False
+    # Digests are taken of deparsed definitions, which schema-qualify names by the search_path among other settings.
+    settings = deparse_settings(conn)
+    state = cache.get(
+        version, schemas, functions=functions, triggers=triggers, views=views, digests=True, settings=settings
+    )
+    if state is not None:
+        return state, True
+    state = inspect()
+    cache.put(
+        version, schemas, state, functions=functions, triggers=triggers, views=views, digests=True, settings=settings
+    )
+    return state, False
+
+
+def _canonicalize_alongside(
+    conn: Connection,
+    inspect_current: Callable[[], CanonicalState],
+    pg_functions: Sequence[ParsedDDL] | Ignored,
+    pg_triggers: Sequence[ParsedDDL] | Ignored,
+    pg_views: Sequence[ParsedDDL] | Ignored,
+    cache: CanonicalizationCache | None,
+    *,
+    shadow: Connection | None = None,
+) -> tuple[CanonicalState, CanonicalState] | None:
+    """Canonicalize on a :func:`~alembic_pg_autogen.parallel.sibling_connection` while *conn* is being inspected.
+
+    Returns the current state and the canonical state against it, as the sequential path computes them.  Returns
+    *None*, before inspecting anything, when the two cannot overlap: outside a ``UTF8`` database, where the baseline
+    cannot be applied client-side, or when *conn*'s transaction cannot share its snapshot.  If the sibling fails — say
+    it times out on a lock *conn*'s transaction holds — the DDL is canonicalized again on *conn*.
+
+    A *shadow* connection, from :meth:`ShadowDatabase.prepared <alembic_pg_autogen.ShadowDatabase.prepared>`, takes the
+    sibling's place.  It needs no snapshot, so the transaction may have written, and a failure is retried on it too.
+    """
+    encoding = conn.execute(text("SELECT current_setting('server_encoding')")).scalar()
+    if encoding != "UTF8":
+        log.info("pg_pipeline ignored: the server encoding is %s, not UTF8", encoding)
+        return None
+    with (
+        nullcontext(shadow) if shadow is not None else sibling_connection(conn, lock_timeout=_PIPELINE_LOCK_TIMEOUT)
+    ) as sibling:
+        if sibling is None:
+            log.info("pg_pipeline ignored: the migration transaction has written, so no other session sees its state")
+            return None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="alembic-pg-autogen-canonicalize") as pool:
+            # In a copy of this context, so that the run's observers see the canonicalization phases too.
+            future = pool.submit(
+                copy_context().run,
+                canonicalize,
+                sibling,
+                function_ddl=pg_functions,
+                view_ddl=pg_views,
+                trigger_ddl=pg_triggers,
+                declared_only=True,
+                cache=cache,
+            )
+            current = inspect_current()
+            try:
+                canonical = future.result()
+            except DBAPIError as exc:
+                log.warning(
+                    "Canonicalizing on a second connection failed, retrying on the %s connection: %s",
+                    "migration" if shadow is None else "shadow",
+                    exc,
+                )
+                canonical = None
+    if canonical is None:
+        canonical = canonicalize(
+            conn if shadow is None else shadow,
+            function_ddl=pg_functions,
+            view_ddl=pg_views,
+            trigger_ddl=pg_triggers,
+            declared_only=True,
+            baseline=current,
+            cache=cache,
+        )
+        return current, canonical
+    return current, apply_baseline(canonical, current)
+
+
+def with_undeclared_overloads(desired: CanonicalState, current: CanonicalState) -> CanonicalState:
+    """Keep every current overload of a declared function name that the desired state does not mention.
+
+    Functions are managed by name: declaring one overload must not drop its siblings.  A full read-back already
+    contains them, unchanged, but a cached canonicalization holds only the declared overloads, so the missing siblings
+    are taken from *current* as they stand.
+    """
+    names = {(f.schema, f.name) for f in desired.functions}
+    keys = {f[:-1] for f in desired.functions}
+    siblings = [f for f in current.functions if (f.schema, f.name) in names and f[:-1] not in keys]
+    if not siblings:
+        return desired
+    log.debug("Keeping %d undeclared overloads of declared functions", len(siblings))
+    return desired._replace(functions=sorted((*desired.functions, *siblings)))
+
+
 def _filter_to_declared(
     canonical: CanonicalState,
-    pg_functions: Sequence[str] | Ignored,
-    pg_triggers: Sequence[str] | Ignored,
-    pg_views: Sequence[str] | Ignored,
-    conn: Connection,
+    pg_functions: Sequence[str | ParsedDDL] | Ignored,
+    pg_triggers: Sequence[str | ParsedDDL] | Ignored,
+    pg_views: Sequence[str | ParsedDDL] | Ignored,
+    run: RunContext,
 ) -> CanonicalState:
     """Filter canonical state to only include objects declared in user DDL.
 
     ``canonicalize()`` returns a full catalog snapshot after executing DDL, which includes pre-existing objects.  This
-    function parses identity info from the raw DDL strings and keeps only those canonical entries that match.  Object
+    function takes identity info from the declared DDL and keeps only those canonical entries that match.  Object
     types marked :data:`~alembic_pg_autogen.IGNORED` yield an empty desired set without parsing any DDL.
     """
     functions: Sequence[FunctionInfo] = ()
     if pg_functions is not IGNORED:
-        fn_names = _parse_function_names(pg_functions, conn)
+        fn_names = _parse_function_names(pg_functions, run)
         functions = [f for f in canonical.functions if (f.schema, f.name) in fn_names]
         if pg_functions and not functions:
             log.warning("No canonical functions matched user DDL — check schema qualifiers in pg_functions")
 
     triggers: Sequence[TriggerInfo] = ()
     if pg_triggers is not IGNORED:
-        trg_ids = _parse_trigger_identities(pg_triggers, conn)
+        trg_ids = _parse_trigger_identities(pg_triggers, run)
         triggers = [t for t in canonical.triggers if (t.schema, t.table_name, t.trigger_name) in trg_ids]
         if pg_triggers and not triggers:
             log.warning("No canonical triggers matched user DDL — check schema qualifiers in pg_triggers")
 
     views: Sequence[ViewInfo] = ()
     if pg_views is not IGNORED:
-        view_names = _parse_view_names(pg_views, conn)
+        view_names = _parse_view_names(pg_views, run)
         views = [v for v in canonical.views if (v.schema, v.name) in view_names]
         if pg_views and not views:
             log.warning("No canonical views matched user DDL — check schema qualifiers in pg_views")
@@ -218,65 +495,61 @@ def _filter_to_declared(
     return CanonicalState(functions=functions, triggers=triggers, views=views)
 
 
-def _parse_function_names(ddl_list: Sequence[str], conn: Connection) -> set[tuple[str, str]]:
-    """Extract ``(schema, name)`` pairs from function DDL strings via postgast.
+def _parse_function_names(ddl_list: Sequence[str | ParsedDDL], run: RunContext) -> set[tuple[str, str]]:
+    """Extract ``(schema, name)`` pairs from function DDL via postgast.
 
     Raises:
         ValueError: If any DDL string does not contain a valid ``CREATE FUNCTION`` statement.
     """
-    import postgast
-
-    default_schema = current_schema(conn)
+    default_schema = run.current_schema
     names: set[tuple[str, str]] = set()
     for ddl in ddl_list:
-        identity = postgast.extract_function_identity(postgast.parse(ddl))
+        parsed = ensure_parsed(ddl, "function")
+        identity = parsed.identity
         if identity is None:
-            raise ValueError(f"Cannot parse function identity from pg_functions DDL: {ddl!r}")
-        schema = identity.schema if identity.schema is not None else default_schema
-        names.add((schema, identity.name))
+            raise ValueError(f"Cannot parse function identity from pg_functions DDL: {parsed.source!r}")
+        schema, name = identity
+        names.add((schema if schema is not None else default_schema, name))
     return names
 
 
-def _parse_trigger_identities(ddl_list: Sequence[str], conn: Connection) -> set[tuple[str, str, str]]:
-    """Extract ``(schema, table_name, trigger_name)`` triples from trigger DDL strings via postgast.
+def _parse_trigger_identities(ddl_list: Sequence[str | ParsedDDL], run: RunContext) -> set[tuple[str, str, str]]:
+    """Extract ``(schema, table_name, trigger_name)`` triples from trigger DDL via postgast.
 
     Raises:
         ValueError: If any DDL string does not contain a valid ``CREATE TRIGGER`` statement.
     """
-    import postgast
-
-    default_schema = current_schema(conn)
+    default_schema = run.current_schema
     identities: set[tuple[str, str, str]] = set()
     for ddl in ddl_list:
-        identity = postgast.extract_trigger_identity(postgast.parse(ddl))
+        parsed = ensure_parsed(ddl, "trigger")
+        identity = parsed.identity
         if identity is None:
-            raise ValueError(f"Cannot parse trigger identity from pg_triggers DDL: {ddl!r}")
-        schema = identity.schema if identity.schema is not None else default_schema
-        identities.add((schema, identity.table, identity.trigger))
+            raise ValueError(f"Cannot parse trigger identity from pg_triggers DDL: {parsed.source!r}")
+        schema, table_name, trigger_name = identity
+        identities.add((schema if schema is not None else default_schema, table_name, trigger_name))
     return identities
 
 
-def _parse_view_names(ddl_list: Sequence[str], conn: Connection) -> set[tuple[str, str]]:
-    """Extract ``(schema, name)`` pairs from view DDL strings via postgast.
+def _parse_view_names(ddl_list: Sequence[str | ParsedDDL], run: RunContext) -> set[tuple[str, str]]:
+    """Extract ``(schema, name)`` pairs from view DDL via postgast.
 
     Raises:
         ValueError: If any DDL string does not contain a valid ``CREATE VIEW`` statement.
     """
-    import postgast
-    from postgast.pg_query_pb2 import ViewStmt
-
-    default_schema = current_schema(conn)
+    default_schema = run.current_schema
     names: set[tuple[str, str]] = set()
     for ddl in ddl_list:
-        view = next((node.view for node in postgast.find_nodes(postgast.parse(ddl), ViewStmt)), None)
-        if view is None:
-            raise ValueError(f"Cannot parse view identity from pg_views DDL: {ddl!r}")
-        # ``schemaname`` is the empty string, not None, when the DDL leaves the view unqualified.
-        names.add((view.schemaname or default_schema, view.relname))
+        parsed = ensure_parsed(ddl, "view")
+        identity = parsed.identity
+        if identity is None:
+            raise ValueError(f"Cannot parse view identity from pg_views DDL: {parsed.source!r}")
+        schema, name = identity
+        names.add((schema if schema is not None else default_schema, name))
     return names
 
 
-def _resolve_schemas(conn: Connection, schemas: Iterable[str | None]) -> list[str] | None:
+def _resolve_schemas(run: RunContext, schemas: Iterable[str | None]) -> list[str] | None:
     """Convert Alembic's schema set to a list suitable for inspect functions.
 
     Alembic passes ``{None}`` to mean "only the default schema".  This function resolves ``None`` to the connection's
@@ -285,17 +558,10 @@ def _resolve_schemas(conn: Connection, schemas: Iterable[str | None]) -> list[st
     """
     if not schemas:
         return None
+    return [run.resolve_schema(s) for s in schemas]
 
-    resolved: list[str] = []
-    for s in schemas:
-        if s is None:
-            resolved.append(current_schema(conn))
-        else:
-            resolved.append(s)
-    return resolved
 
-
-def _filter_to_schemas(state: CanonicalState, schemas: Iterable[str] | None) -> CanonicalState:
+def filter_to_schemas(state: CanonicalState, schemas: Iterable[str] | None) -> CanonicalState:
     """Filter a CanonicalState to only include objects in the given schemas."""
     if schemas is None:
         return state
@@ -307,6 +573,63 @@ def _filter_to_schemas(state: CanonicalState, schemas: Iterable[str] | None) ->
     )
 
 
+def _hydrate_current(conn: Connection, result: DiffResult) -> DiffResult:
+    """Replace the digest-only current side of *result*'s ops with full definitions, in one round trip.
+
+    Only ``REPLACE`` and ``DROP`` ops carry a current object, and they need its definition to render the downgrade.
+    """
+    functions = {op.current[:-1] for op in result.function_ops if op.current is not None}
+    triggers = {op.current[:-1] for op in result.trigger_ops if op.current is not None}
+    views = {op.current[:-1] for op in result.view_ops if op.current is not None}
+    if not (functions or triggers or views):
+        return result
+
+    loaded = inspect_catalog(
+        conn,
+        functions=bool(functions),
+        triggers=bool(triggers),
+        views=bool(views),
+        function_identities=sorted({(schema, name) for schema, name, _ in functions}),
+        trigger_identities=sorted(triggers),
+        view_identities=sorted(views),
+    )
+    log.debug("Hydrated %d current definitions for rendering", len(functions) + len(triggers) + len(views))
+    return DiffResult(
+        function_ops=_with_definitions(result.function_ops, loaded.functions),
+        trigger_ops=_with_definitions(result.trigger_ops, loaded.triggers),
+        view_ops=_with_definitions(result.view_ops, loaded.views),
+    )
+
+
+_OpT = TypeVar("_OpT", "FunctionOp", "TriggerOp", "ViewOp")
+
+
+def _with_definitions(ops: Sequence[_OpT], loaded: Sequence[tuple[str, ...]]) -> list[_OpT]:
+    """Swap each op's current object for its fully loaded counterpart in *loaded*, matched by identity.
+
+    Raises:
+        RuntimeError: If an op's current object is missing from *loaded*, because the catalog changed between
+            inspecting and hydrating it.
+    """
+    by_key = {item[:-1]: item for item in loaded}
+    missing = [op.current for op in ops if op.current is not None and op.current[:-1] not in by_key]
+    if missing:
+        raise RuntimeError(
+            f"{', '.join(_describe(item) for item in missing)} disappeared from the catalog after the current state was "
+            "inspected; the catalog changed while autogenerate ran, so run it again"
+        )
+    return [op if op.current is None else op._replace(current=by_key[op.current[:-1]]) for op in ops]
+
+
+def _describe(item: FunctionInfo | TriggerInfo | ViewInfo) -> str:
+    """Name a catalog object the way an error message should."""
+    if isinstance(item, FunctionInfo):
+        return f"function {item.schema}.{item.name}({item.identity_args})"
+    if isinstance(item, TriggerInfo):
+        return f"trigger {item.trigger_name} on {item.schema}.{item.table_name}"
+    return f"view {item.schema}.{item.name}"
+
+
 def _order_ops(
     function_ops: Sequence[FunctionOp],
     trigger_ops: Sequence[TriggerOp],
@@ -314,8 +637,8 @@ def _order_ops(
 ) -> list[MigrateOperation]:
     """Convert diff ops to MigrateOperation instances in dependency-safe order.
 
-    Order: drop triggers, drop views, drop functions, create/replace functions, create/replace views,
-    create/replace triggers.
+    Order: drop triggers, drop views, drop functions, create/replace/alter functions, create/replace views,
+    create/replace triggers.  A function whose attributes changed but whose body did not is altered in place.
     """
     result: list[MigrateOperation] = []
 
@@ -337,14 +660,14 @@ def _order_ops(
             assert op.current is not None
             result.append(DropFunctionOp(op.current))
 
-    # 4. Create/replace functions (must exist before views reference them)
+    # 4. Create/replace/alter functions (must exist before views reference them)
     for op in function_ops:
         if op.action is Action.CREATE:
             assert op.desired is not None
             result.append(CreateFunctionOp(op.desired))
         elif op.action is Action.REPLACE:
             assert op.current is not None and op.desired is not None
-            result.append(ReplaceFunctionOp(op.current, op.desired))
+            result.append(_replace_function_op(op.current, op.desired))
 
     # 5. Create/replace views (must exist before INSTEAD OF triggers reference them)
     for op in view_ops:
@@ -365,3 +688,15 @@ def _order_ops(
             result.append(ReplaceTriggerOp(op.current, op.desired))
 
     return result
+
+
+def _replace_function_op(current: FunctionInfo, desired: FunctionInfo) -> AlterFunctionOp | ReplaceFunctionOp:
+    """Alter *current* in place when only its attributes changed; only a changed body needs the definition resent."""
+    import postgast
+
+    try:
+        alter = alter_function_statement(current.definition, desired.definition)
+    except postgast.PgQueryError:
+        log.warning("Cannot parse the definition of %s.%s; replacing it whole", desired.schema, desired.name)
+        alter = None
+    return ReplaceFunctionOp(current, desired) if alter is None else AlterFunctionOp(current, desired, alter)
@@ -18,25 +18,46 @@ the function/trigger/view comparator, and only fires for the ``postgresql`` dial
 from __future__ import annotations
 
 import logging
+from contextlib import nullcontext
 from itertools import chain
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 from alembic.operations import ops
 from alembic.util import PriorityDispatchResult
 from sqlalchemy import CheckConstraint
 
-from alembic_pg_autogen.canonicalize import canonicalize_check_constraints
-from alembic_pg_autogen.inspect import current_schema, inspect_check_constraints
+from alembic_pg_autogen.canonicalize import canonicalize_all_check_constraints
+from alembic_pg_autogen.context import run_context
+from alembic_pg_autogen.inspect import inspect_check_constraints
+from alembic_pg_autogen.observe import observing, phase, run_observers
+from alembic_pg_autogen.replica import resolve_hot_standby
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from typing import Final
+
     from alembic.autogenerate.api import AutogenContext
     from alembic.operations.ops import ModifyTableOps
     from alembic.runtime.plugins import Plugin
-    from sqlalchemy import Table
+    from sqlalchemy import Connection, Table
     from sqlalchemy.engine import Dialect
 
+    from alembic_pg_autogen.context import RunContext
+    from alembic_pg_autogen.inspect import CheckConstraintInfo
+
 log = logging.getLogger(__name__)
 
+_PREPASS_KEY: Final = "check_constraints"
+
+_LOCK_FREE_OPTION: Final = "pg_lock_free_check_constraints"
+"""Configuration key that, when true, probes expressions against temporary copies of the tables, locking none of them."""
+
+_REPLICA_OPTION: Final = "pg_replica_url"
+"""Configuration key naming a hot standby to read the catalog's constraints from, as for the object comparator."""
+
+_REPLICA_MAX_LAG_OPTION: Final = "pg_replica_max_lag"
+"""Configuration key for the replay lag, in seconds, beyond which the constraints are read from the primary instead."""
+
 
 def setup(plugin: Plugin) -> None:
     """Register the check constraint expression comparator with Alembic's plugin system."""
@@ -66,47 +87,42 @@ def _compare_check_constraint_expressions(
     if conn is None:  # offline autogenerate has nothing to normalize against
         return PriorityDispatchResult.CONTINUE
 
-    metadata_constraints = _metadata_check_constraints(metadata_table, autogen_context.dialect)
-    if not metadata_constraints:
-        return PriorityDispatchResult.CONTINUE
-
-    resolved_schema = schema if schema is not None else current_schema(conn)
-    current = {
-        info.name: info for info in inspect_check_constraints(conn, schemas=[resolved_schema], table_names=[table_name])
-    }
-
-    # Only constraints that exist on both sides are ours to check.  Additions and removals are Alembic's job.
-    shared = [
-        name
-        for name in sorted(set(metadata_constraints) & set(current))
-        if autogen_context.run_name_filters(name, "check_constraint", {"table_name": table_name, "schema_name": schema})
-    ]
-    if not shared:
-        return PriorityDispatchResult.CONTINUE
+    with observing(run_observers(autogen_context)):
+        _compare_table(autogen_context, modify_table_ops, schema, table_name, conn_table, metadata_table, conn)
+    return PriorityDispatchResult.CONTINUE
 
-    candidates: dict[str, str] = {}
-    for name in shared:
-        expression = _compile_check_expression(metadata_constraints[name], autogen_context.dialect)
-        if expression is None:
-            continue
-        # An expression that already matches the catalog's deparsed form needs no round-trip.
-        if _same_sql(expression, current[name].expression):
-            continue
-        candidates[name] = expression
 
-    if not candidates:
-        return PriorityDispatchResult.CONTINUE
+def _compare_table(
+    autogen_context: AutogenContext,
+    modify_table_ops: ModifyTableOps,
+    schema: str | None,
+    table_name: str,
+    conn_table: Table,
+    metadata_table: Table,
+    conn: Connection,
+) -> None:
+    """Append the drop/add pairs for one table, with the run's observers active."""
+    metadata_constraints = _named_check_constraints(autogen_context, metadata_table, schema)
+    if not metadata_constraints:
+        return
 
-    normalized = canonicalize_check_constraints(
-        conn, schema=resolved_schema, table_name=table_name, expressions=candidates
-    )
+    run = run_context(autogen_context)
+    key = (run.resolve_schema(schema), table_name)
+    # Alembic calls this comparator once per table, so the first call inspects and canonicalizes every table it is
+    # about to compare in one go and the rest only look their table up.
+    state = run.memoize(_PREPASS_KEY, lambda: _prepass(autogen_context, run)).get(key)
+    if state is None:  # a table the prepass could not foresee, e.g. one admitted by a schema name filter
+        state = _load_states(autogen_context, conn, {key: metadata_constraints})[key]
+    current, candidates, normalized = state
 
     for name in sorted(candidates):
         desired = normalized.get(name)
         if desired is None or desired == current[name].expression:
             continue
 
-        metadata_constraint = metadata_constraints[name]
+        metadata_constraint = metadata_constraints.get(name)
+        if metadata_constraint is None:
+            continue
         conn_constraint = CheckConstraint(current[name].expression, name=name, table=conn_table)
         if not autogen_context.run_object_filters(
             metadata_constraint, name, "check_constraint", False, conn_constraint
@@ -123,7 +139,116 @@ def _compare_check_constraint_expressions(
         modify_table_ops.ops.append(ops.DropConstraintOp.from_constraint(conn_constraint))
         modify_table_ops.ops.append(ops.AddConstraintOp.from_constraint(metadata_constraint))
 
-    return PriorityDispatchResult.CONTINUE
+
+class _TableState(NamedTuple):
+    """One table's check constraints as far as the comparator needs them."""
+
+    current: Mapping[str, CheckConstraintInfo]
+    """The catalog's constraints, keyed by name."""
+    candidates: Mapping[str, str]
+    """Compiled metadata expressions, keyed by name, that exist on both sides and differ textually from the catalog."""
+    normalized: Mapping[str, str]
+    """PostgreSQL's deparsed form of each candidate it accepted."""
+
+
+def _prepass(autogen_context: AutogenContext, run: RunContext) -> dict[tuple[str, str], _TableState]:
+    """Load the state of every table Alembic is about to compare, with one query and one canonicalization batch."""
+    tables: dict[tuple[str, str], dict[str, CheckConstraint]] = {}
+    for schema, table in _compared_tables(autogen_context):
+        constraints = _named_check_constraints(autogen_context, table, schema)
+        if constraints:
+            tables[run.resolve_schema(schema), table.name] = constraints
+    if not tables:
+        return {}
+    log.debug("Check constraint prepass over %d table(s)", len(tables))
+    return _load_states(autogen_context, run.connection, tables)
+
+
+def _compared_tables(autogen_context: AutogenContext) -> list[tuple[str | None, Table]]:
+    """Return the metadata tables Alembic will compare, as far as that can be told before it reflects them.
+
+    Mirrors Alembic's own selection: a table qualified with the default schema is compared as unqualified, tables
+    outside the default schema count only with ``include_schemas``, and the schema and table name filters apply.  Each
+    table comes with the schema Alembic will pass the callback.  Object filters run against the metadata table as
+    Alembic runs them, though without the reflected table to compare it to, so a table ``include_object`` excludes is
+    never probed.
+    """
+    include_schemas = autogen_context.opts.get("include_schemas", False)
+    default_schema = autogen_context.dialect.default_schema_name
+    tables: list[tuple[str | None, Table]] = []
+    for table in autogen_context.sorted_tables:
+        schema = None if table.schema == default_schema else table.schema
+        if schema is not None and not include_schemas:
+            continue
+        if not autogen_context.run_name_filters(schema, "schema", {}):
+            continue
+        if not autogen_context.run_name_filters(table.name, "table", {"schema_name": schema}):
+            continue
+        if autogen_context.run_object_filters(table, table.name, "table", False, None):
+            tables.append((schema, table))
+    return tables
+
+
+def _load_states(
+    autogen_context: AutogenContext, conn: Connection, tables: Mapping[tuple[str, str], Mapping[str, CheckConstraint]]
+) -> dict[tuple[str, str], _TableState]:
+    """Inspect and canonicalize the check constraints of *tables*, keyed by ``(schema, table_name)``."""
+    dialect = autogen_context.dialect
+    current: dict[tuple[str, str], dict[str, CheckConstraintInfo]] = {key: {} for key in tables}
+    standby = resolve_hot_standby(
+        autogen_context.opts.get(_REPLICA_OPTION), autogen_context.opts.get(_REPLICA_MAX_LAG_OPTION)
+    )
+    with (
+        phase("check_constraints_inspect") as counts,
+        nullcontext(conn) if standby is None else standby.inspecting(conn) as inspector,
+    ):
+        # The cross product of schemas and names may match tables that were not asked for; they are dropped here.
+        for info in inspect_check_constraints(
+            inspector,
+            schemas=sorted({schema for schema, _ in tables}),
+            table_names=sorted({name for _, name in tables}),
+        ):
+            if (info.schema, info.table_name) in current:
+                current[info.schema, info.table_name][info.name] = info
+        counts.update(tables=len(tables), constraints=sum(map(len, current.values())))
+
+    candidates = {key: _candidates(tables[key], current[key], dialect) for key in tables}
+    with phase("check_constraints_canonicalize") as counts:
+        normalized = canonicalize_all_check_constraints(
+            conn,
+            {key: exprs for key, exprs in candidates.items() if exprs},
+            shadow=bool(autogen_context.opts.get(_LOCK_FREE_OPTION, False)),
+        )
+        counts["expressions"] = sum(map(len, candidates.values()))
+    return {key: _TableState(current[key], candidates[key], normalized.get(key, {})) for key in tables}
+
+
+def _candidates(
+    metadata_constraints: Mapping[str, CheckConstraint], current: Mapping[str, CheckConstraintInfo], dialect: Dialect
+) -> dict[str, str]:
+    """Compile the metadata expressions that need PostgreSQL's verdict, keyed by constraint name."""
+    candidates: dict[str, str] = {}
+    # Only constraints that exist on both sides are ours to check.  Additions and removals are Alembic's job.
+    for name in sorted(set(metadata_constraints) & set(current)):
+        expression = _compile_check_expression(metadata_constraints[name], dialect)
+        if expression is None:
+            continue
+        # An expression that already matches the catalog's deparsed form needs no round-trip.
+        if _same_sql(expression, current[name].expression):
+            continue
+        candidates[name] = expression
+    return candidates
+
+
+def _named_check_constraints(
+    autogen_context: AutogenContext, table: Table, schema: str | None
+) -> dict[str, CheckConstraint]:
+    """Return :func:`_metadata_check_constraints` for *table*, less those the name filters exclude."""
+    return {
+        name: constraint
+        for name, constraint in _metadata_check_constraints(table, autogen_context.dialect).items()
+        if autogen_context.run_name_filters(name, "check_constraint", {"table_name": table.name, "schema_name": schema})
+    }
 
 
 def _metadata_check_constraints(table: Table, dialect: Dialect) -> dict[str, CheckConstraint]:
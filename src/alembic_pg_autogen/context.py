@@ -0,0 +1,82 @@
+"""Per-run memo of database facts shared by this package's autogenerate comparators."""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from functools import cached_property
+from typing import TYPE_CHECKING, TypeVar, cast
+
+from alembic_pg_autogen.inspect import current_schema
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Final
+
+    from alembic.autogenerate.api import AutogenContext
+    from sqlalchemy import Connection
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class RunContext:
+    """Facts about the database that hold for a whole autogenerate run, each looked up at most once.
+
+    Alembic calls the table-level comparators once per table, so anything they query without memoizing costs one round
+    trip per table.  Obtain the instance for a run with :func:`run_context`.
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        """Wrap *conn*; nothing is queried until a fact is first read."""
+        self.connection: Final = conn
+        self._memo: Final[dict[str, object]] = {}
+
+    @cached_property
+    def current_schema(self) -> str:
+        """The connection's ``current_schema()``, which unqualified names resolve to."""
+        schema = current_schema(self.connection)
+        log.debug("Run context: current_schema=%r", schema)
+        return schema
+
+    @cached_property
+    def server_version(self) -> tuple[int, ...]:
+        """The server version, as the dialect read it when the connection was first established."""
+        version = self.connection.dialect.server_version_info
+        assert version is not None, "The dialect has not read the server version"
+        return tuple(int(part) for part in version)
+
+    def memoize(self, key: str, load: Callable[[], _T]) -> _T:
+        """Return the value stored under *key*, calling *load* to produce it on first use.
+
+        For run-wide state that belongs to a single comparator, such as a prepass over every table.
+        """
+        if key not in self._memo:
+            self._memo[key] = load()
+        return cast("_T", self._memo[key])
+
+    def resolve_schema(self, schema: str | None) -> str:
+        """Return *schema*, or the current schema when it is *None* — Alembic's spelling of "the default schema"."""
+        return schema if schema is not None else self.current_schema
+
+
+_RUN_CONTEXTS: weakref.WeakKeyDictionary[AutogenContext, RunContext] = weakref.WeakKeyDictionary()
+
+
+def run_context(autogen_context: AutogenContext) -> RunContext:
+    """Return the :class:`RunContext` for *autogen_context*, creating it on first use.
+
+    The context lives exactly as long as *autogen_context*, so every comparator of one run shares it and the next run
+    starts afresh.
+
+    Raises:
+        ValueError: If *autogen_context* has no connection, as in offline autogenerate.
+    """
+    conn = autogen_context.connection
+    if conn is None:
+        raise ValueError("A run context requires an online autogenerate connection")
+    run = _RUN_CONTEXTS.get(autogen_context)
+    if run is None or run.connection is not conn:
+        run = _RUN_CONTEXTS[autogen_context] = RunContext(conn)
+    return run
@@ -0,0 +1,379 @@
+"""Identity extraction from user-declared DDL via postgast.
+
+Each helper parses one ``CREATE`` statement and returns the identity PostgreSQL will file the object under.  The schema
+component is *None* when the DDL leaves the object unqualified: it is then resolved through the ``search_path`` of
+whichever connection the DDL runs on, so resolving it is left to the caller.
+
+:func:`parse_ddl` parses a statement once and derives everything the pipeline needs from that single tree — identity,
+``CREATE OR REPLACE`` form and ``DROP`` statement — so a large PL/pgSQL body is not re-parsed at every stage.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Final, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from google.protobuf.message import Message
+    from postgast.pg_query_pb2 import (
+        CreateFunctionStmt,
+        CreateTrigStmt,
+        DefElem,
+        DropStmt,
+        Node,
+        ObjectWithArgs,
+        ParseResult,
+        ViewStmt,
+    )
+    from typing_extensions import Unpack
+
+DDLKind = Literal["function", "trigger", "view"]
+"""The object types whose DDL the pipeline manages."""
+
+ALTERABLE_FUNCTION_ATTRIBUTES: Final = (
+    "volatility",
+    "strict",
+    "security",
+    "leakproof",
+    "parallel",
+    "cost",
+    "rows",
+    "set",
+)
+"""``CREATE FUNCTION`` options, by their parse tree name, that ``ALTER FUNCTION`` can change without the body."""
+
+
+class ParsedDDL(NamedTuple):
+    """A declared ``CREATE`` statement, parsed once, with every form derived from it.
+
+    Build instances with :func:`parse_ddl`.
+    """
+
+    kind: DDLKind
+    source: str
+    identity: tuple[str | None, Unpack[tuple[str, ...]]] | None
+    """As returned by :func:`function_identity`, :func:`trigger_identity` or :func:`view_identity` for *kind*."""
+    or_replace: str
+    """The statement deparsed with every eligible ``CREATE`` rewritten to ``CREATE OR REPLACE``."""
+    drop: str | None
+    """The ``DROP`` statement for the object, or *None* unless *source* is a single statement of *kind*."""
+    self_contained: bool
+    """Whether the canonical form depends on nothing else in the catalog.
+
+    Only a single function with a string body qualifies: a view, a trigger or a function with a SQL-standard body is
+    deparsed against the relations and functions it references, which can change under it.
+    """
+
+
+def parse_ddl(ddl: str, kind: DDLKind) -> ParsedDDL:
+    """Parse *ddl* once and derive its identity, ``CREATE OR REPLACE`` form and ``DROP`` statement.
+
+    Raises:
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    tree = postgast.parse(ddl)
+    identity = _IDENTITIES[kind](tree)
+    drop = _drop_statement(tree, kind)
+    function = _single_function(tree) if kind == "function" else None
+    self_contained = function is not None and not function.HasField("sql_body")
+    # Derived last: ``set_or_replace`` rewrites the tree in place.
+    postgast.set_or_replace(tree)
+    return ParsedDDL(kind, ddl, identity, postgast.deparse(tree), drop, self_contained)
+
+
+def drop_statement(ddl: str, kind: DDLKind) -> str:
+    """Return the ``DROP`` statement for a single ``CREATE`` statement of *kind*.
+
+    Cheaper than :func:`parse_ddl` when nothing else is needed: only the small ``DROP`` is deparsed, not the statement.
+
+    Raises:
+        ValueError: If *ddl* is not a single statement of *kind*.
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    drop = _drop_statement(postgast.parse(ddl), kind)
+    if drop is None:
+        raise ValueError(f"Cannot build a DROP statement from {kind} DDL: {ddl!r}")
+    return drop
+
+
+def replace_trigger_statement(ddl: str) -> str | None:
+    """Return *ddl* as a ``CREATE OR REPLACE TRIGGER`` statement, which PostgreSQL 14 and later accept.
+
+    Returns *None* unless *ddl* is a single ``CREATE TRIGGER``: PostgreSQL cannot replace a constraint trigger.
+
+    Raises:
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    tree = postgast.parse(ddl)
+    if len(tree.stmts) != 1 or tree.stmts[0].stmt.WhichOneof("node") != "create_trig_stmt":
+        return None
+    stmt = tree.stmts[0].stmt.create_trig_stmt
+    if stmt.isconstraint:
+        return None
+    stmt.replace = True
+    return postgast.deparse(tree)
+
+
+def alter_function_statement(current: str, desired: str) -> str | None:
+    """Return the ``ALTER FUNCTION`` that turns function *current* into *desired*, if that is all it takes.
+
+    Both are ``CREATE FUNCTION`` statements of the same function.  The statement changes the
+    :data:`ALTERABLE_FUNCTION_ATTRIBUTES` that differ, sets those *desired* leaves out back to their defaults, and
+    resets configuration parameters *desired* no longer sets.  It is *None* when anything else differs — the body, the
+    language, the return type or the parameters — since only ``CREATE OR REPLACE`` can change those, and when no
+    attribute differs either.
+
+    Raises:
+        postgast.PgQueryError: If either statement is not valid SQL.
+    """
+    import postgast
+    from postgast import pg_query_pb2 as pb
+
+    current_stmt = _single_function(postgast.parse(current))
+    stmt = _single_function(postgast.parse(desired))
+    if current_stmt is None or stmt is None:
+        return None
+    current_attributes, current_settings, current_rest = _split_attributes(current_stmt)
+    desired_attributes, desired_settings, desired_rest = _split_attributes(stmt)
+    if current_rest != desired_rest:
+        return None
+    actions = [
+        *(value for name, value in desired_attributes.items() if current_attributes.get(name) != value),
+        *(_default_attribute(name, stmt) for name in current_attributes if name not in desired_attributes),
+    ]
+    # The definition lists settings in the order they were set, and ALTER changes a setting in place but adds a new one
+    # at the end, so any change sets them all afresh to keep the order.
+    if current_settings != desired_settings:
+        reset_all = pb.VariableSetStmt(kind=pb.VAR_RESET_ALL)
+        actions.append(pb.DefElem(defname="set", arg=pb.Node(variable_set_stmt=reset_all)))
+        actions.extend(desired_settings)
+    if not actions:
+        return None
+    alter = pb.AlterFunctionStmt(objtype=pb.OBJECT_PROCEDURE if stmt.is_procedure else pb.OBJECT_FUNCTION)
+    _add_signature(alter.func, stmt)
+    for action in actions:
+        alter.actions.add().def_elem.CopyFrom(action)
+    result = pb.ParseResult()
+    result.stmts.add().stmt.alter_function_stmt.CopyFrom(alter)
+    return postgast.deparse(result)
+
+
+def ensure_parsed(ddl: str | ParsedDDL, kind: DDLKind) -> ParsedDDL:
+    """Return *ddl* if it is already parsed, otherwise parse it as an object of *kind*."""
+    return ddl if isinstance(ddl, ParsedDDL) else parse_ddl(ddl, kind)
+
+
+def function_identity(ddl: str) -> tuple[str | None, str] | None:
+    """Return ``(schema, name)`` for a ``CREATE FUNCTION`` / ``CREATE PROCEDURE`` statement, or *None* if it is not one.
+
+    Raises:
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    return _function_identity(postgast.parse(ddl))
+
+
+def trigger_identity(ddl: str) -> tuple[str | None, str, str] | None:
+    """Return ``(schema, table_name, trigger_name)`` for a ``CREATE TRIGGER`` statement, or *None* if it is not one.
+
+    Raises:
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    return _trigger_identity(postgast.parse(ddl))
+
+
+def view_identity(ddl: str) -> tuple[str | None, str] | None:
+    """Return ``(schema, name)`` for a ``CREATE VIEW`` statement, or *None* if it is not one.
+
+    Raises:
+        postgast.PgQueryError: If *ddl* is not valid SQL.
+    """
+    import postgast
+
+    return _view_identity(postgast.parse(ddl))
+
+
+def _function_identity(tree: ParseResult) -> tuple[str | None, str] | None:
+    import postgast
+
+    identity = postgast.extract_function_identity(tree)
+    if identity is None:
+        return None
+    return identity.schema, identity.name
+
+
+def _trigger_identity(tree: ParseResult) -> tuple[str | None, str, str] | None:
+    import postgast
+
+    identity = postgast.extract_trigger_identity(tree)
+    if identity is None:
+        return None
+    return identity.schema, identity.table, identity.trigger
+
+
+def _view_identity(tree: ParseResult) -> tuple[str | None, str] | None:
+    import postgast
+    from postgast.pg_query_pb2 import ViewStmt
+
+    view = next((node.view for node in postgast.find_nodes(tree, ViewStmt)), None)
+    if view is None:
+        return None
+    # ``schemaname`` is the empty string, not None, when the DDL leaves the view unqualified.
+    return view.schemaname or None, view.relname
+
+
+_IDENTITIES: dict[str, Callable[[ParseResult], tuple[str | None, Unpack[tuple[str, ...]]] | None]] = {
+    "function": _function_identity,
+    "trigger": _trigger_identity,
+    "view": _view_identity,
+}
+
+
+def _drop_statement(tree: ParseResult, kind: DDLKind) -> str | None:
+    """Deparse the ``DROP`` for the single statement in *tree*, mirroring ``postgast.to_drop()`` without re-parsing."""
+    import postgast
+    from postgast.pg_query_pb2 import ParseResult
+
+    if len(tree.stmts) != 1:
+        return None
+    node = tree.stmts[0].stmt
+    which = node.WhichOneof("node")
+    if kind == "function" and which == "create_function_stmt":
+        drop = _drop_function(node.create_function_stmt)
+    elif kind == "trigger" and which == "create_trig_stmt":
+        drop = _drop_trigger(node.create_trig_stmt)
+    elif kind == "view" and which == "view_stmt":
+        drop = _drop_view(node.view_stmt)
+    else:
+        return None
+    result = ParseResult()
+    result.stmts.add().stmt.drop_stmt.CopyFrom(drop)
+    return postgast.deparse(result)
+
+
+def _drop_function(stmt: CreateFunctionStmt) -> DropStmt:
+    """Build the ``DROP FUNCTION`` / ``DROP PROCEDURE``."""
+    from postgast import pg_query_pb2 as pb
+
+    drop = pb.DropStmt(remove_type=pb.OBJECT_PROCEDURE if stmt.is_procedure else pb.OBJECT_FUNCTION)
+    _add_signature(drop.objects.add().object_with_args, stmt)
+    return drop
+
+
+def _add_signature(target: ObjectWithArgs, stmt: CreateFunctionStmt) -> None:
+    """Name the function *stmt* creates in *target*, with only the arguments that make up its signature."""
+    from postgast import pg_query_pb2 as pb
+
+    signature_modes = {pb.FUNC_PARAM_IN, pb.FUNC_PARAM_INOUT, pb.FUNC_PARAM_VARIADIC, pb.FUNC_PARAM_DEFAULT}
+    target.objname.extend(stmt.funcname)
+    for parameter in stmt.parameters:
+        if parameter.function_parameter.mode in signature_modes:
+            target.objargs.add().type_name.CopyFrom(parameter.function_parameter.arg_type)
+
+
+def _drop_trigger(stmt: CreateTrigStmt) -> DropStmt:
+    """Build the ``DROP TRIGGER``."""
+    from postgast import pg_query_pb2 as pb
+
+    drop = pb.DropStmt(remove_type=pb.OBJECT_TRIGGER)
+    _add_qualified_name(drop, stmt.relation.schemaname, stmt.relation.relname, stmt.trigname)
+    return drop
+
+
+def _drop_view(stmt: ViewStmt) -> DropStmt:
+    """Build the ``DROP VIEW``."""
+    from postgast import pg_query_pb2 as pb
+
+    drop = pb.DropStmt(remove_type=pb.OBJECT_VIEW)
+    _add_qualified_name(drop, stmt.view.schemaname, stmt.view.relname)
+    return drop
+
+
+def _add_qualified_name(drop: DropStmt, schema: str, *names: str) -> None:
+    """Append one dotted object name to *drop*, leaving out an empty *schema*."""
+    items = drop.objects.add().list.items
+    for part in (schema, *names) if schema else names:
+        items.add().string.sval = part
+
+
+def _single_function(tree: ParseResult) -> CreateFunctionStmt | None:
+    """The ``CREATE FUNCTION`` that is the one statement in *tree*, if it is one."""
+    if len(tree.stmts) != 1 or tree.stmts[0].stmt.WhichOneof("node") != "create_function_stmt":
+        return None
+    return tree.stmts[0].stmt.create_function_stmt
+
+
+def _split_attributes(stmt: CreateFunctionStmt) -> tuple[dict[str, DefElem], list[DefElem], CreateFunctionStmt]:
+    """Split *stmt* into its alterable attributes by option name, its ``SET`` clauses in order, and everything else.
+
+    All three have their source locations cleared, so that they compare equal however far into the statement they were
+    written.
+    """
+    from postgast import pg_query_pb2 as pb
+
+    rest = pb.CreateFunctionStmt()
+    rest.CopyFrom(stmt)
+    _clear_locations(rest)
+    rest.replace = False
+    attributes: dict[str, DefElem] = {}
+    settings: list[DefElem] = []
+    options: list[Node] = []
+    for option in rest.options:
+        name = option.def_elem.defname
+        if name == "set":
+            settings.append(option.def_elem)
+        elif name in ALTERABLE_FUNCTION_ATTRIBUTES:
+            attributes[name] = option.def_elem
+        else:
+            options.append(option)
+    del rest.options[:]
+    rest.options.extend(options)
+    return attributes, settings, rest
+
+
+def _default_attribute(name: str, stmt: CreateFunctionStmt) -> DefElem:
+    """The attribute *name*, other than ``set``, that ``CREATE FUNCTION`` implies for *stmt* when it leaves it out."""
+    from postgast import pg_query_pb2 as pb
+
+    if name in ("volatility", "parallel"):
+        return pb.DefElem(
+            defname=name, arg=pb.Node(string=pb.String(sval="volatile" if name == "volatility" else "unsafe"))
+        )
+    if name == "cost":
+        language = next(
+            (option.def_elem.arg.string.sval for option in stmt.options if option.def_elem.defname == "language"), ""
+        )
+        return pb.DefElem(
+            defname=name, arg=pb.Node(integer=pb.Integer(ival=1 if language in ("c", "internal") else 100))
+        )
+    if name == "rows":
+        return pb.DefElem(defname=name, arg=pb.Node(integer=pb.Integer(ival=1000)))
+    # STRICT, SECURITY DEFINER and LEAKPROOF all default to off.
+    return pb.DefElem(defname=name, arg=pb.Node(boolean=pb.Boolean(boolval=False)))
+
+
+def _clear_locations(message: Message) -> None:
+    """Clear every ``location`` field in *message*, recursively."""
+    from collections.abc import Sequence
+
+    from google.protobuf import message as protobuf
+
+    for field, value in message.ListFields():
+        if field.name == "location":
+            message.ClearField("location")
+        elif isinstance(value, protobuf.Message):
+            _clear_locations(value)
+        elif isinstance(value, Sequence) and not isinstance(value, str):
+            for child in value:
+                if isinstance(child, protobuf.Message):
+                    _clear_locations(child)
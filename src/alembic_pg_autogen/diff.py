@@ -7,10 +7,9 @@ import logging
 from typing import TYPE_CHECKING, NamedTuple, TypeVar
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Sequence
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
-    from alembic_pg_autogen.canonicalize import CanonicalState
-    from alembic_pg_autogen.inspect import FunctionInfo, TriggerInfo, ViewInfo
+    from alembic_pg_autogen.inspect import CanonicalState, FunctionInfo, TriggerInfo, ViewInfo
 
 log = logging.getLogger(__name__)
 
@@ -66,6 +65,9 @@ def diff(current: CanonicalState, desired: CanonicalState) -> DiffResult:
     views by ``(schema, name)``.  Objects present only in *desired* produce ``CREATE`` ops, objects only in *current*
     produce ``DROP`` ops, and objects in both with differing definitions produce ``REPLACE`` ops.
 
+    A collecting wrapper over :func:`iter_diff`.  Snapshots from :func:`~alembic_pg_autogen.inspect.inspect_catalog`
+    are already in identity order and are merged as they are; any other sequence is sorted first.
+
     Args:
         current: The current database state (from inspection).
         desired: The desired state (from canonicalization).
@@ -87,24 +89,73 @@ def diff(current: CanonicalState, desired: CanonicalState) -> DiffResult:
     return result
 
 
+def iter_diff(
+    current: Iterable[_InfoT],
+    desired: Iterable[_InfoT],
+    make_op: Callable[[Action, _InfoT | None, _InfoT | None], _OpT],
+) -> Iterator[_OpT]:
+    """Merge-join two identity-ordered streams of catalog records, yielding an op per difference as it is found.
+
+    The identity of a record is every field but the last, ``definition``.  Both inputs must be in ascending identity
+    order with no identity repeated — the order the ``iter_*`` inspection helpers and
+    :func:`~alembic_pg_autogen.inspect.inspect_catalog` produce — so only one record of each side is held at a time::
+
+        ops = iter_diff(iter_functions(conn, ["app"]), desired_functions, FunctionOp)
+
+    Args:
+        current: The current records, e.g. from :func:`~alembic_pg_autogen.inspect.iter_functions`.
+        desired: The desired records of the same type.
+        make_op: The op type to build: :class:`FunctionOp`, :class:`TriggerOp` or :class:`ViewOp`.
+
+    Yields:
+        Ops in identity order.
+
+    Raises:
+        ValueError: When an input turns out not to be in strictly ascending identity order.
+    """
+    current_items = _checked_order(current, "current")
+    desired_items = _checked_order(desired, "desired")
+    cur = next(current_items, None)
+    des = next(desired_items, None)
+    while cur is not None or des is not None:
+        if des is None or (cur is not None and cur[:-1] < des[:-1]):
+            yield make_op(Action.DROP, cur, None)
+            cur = next(current_items, None)
+        elif cur is None or des[:-1] < cur[:-1]:
+            yield make_op(Action.CREATE, None, des)
+            des = next(desired_items, None)
+        else:
+            if cur.definition != des.definition:
+                yield make_op(Action.REPLACE, cur, des)
+            cur = next(current_items, None)
+            des = next(desired_items, None)
+
+
 def _diff_items(
     current_items: Sequence[_InfoT],
     desired_items: Sequence[_InfoT],
     make_op: Callable[[Action, _InfoT | None, _InfoT | None], _OpT],
 ) -> list[_OpT]:
     """Diff two sequences of catalog items by identity key (all fields except the last ``definition`` field)."""
-    current_by_key = {item[:-1]: item for item in current_items}
-    desired_by_key = {item[:-1]: item for item in desired_items}
-
-    ops: list[_OpT] = []
-    for key in sorted(current_by_key.keys() | desired_by_key.keys()):
-        cur = current_by_key.get(key)
-        des = desired_by_key.get(key)
-        if cur is None:
-            ops.append(make_op(Action.CREATE, None, des))
-        elif des is None:
-            ops.append(make_op(Action.DROP, cur, None))
-        elif cur.definition != des.definition:
-            ops.append(make_op(Action.REPLACE, cur, des))
-
-    return ops
+    return list(iter_diff(_in_identity_order(current_items), _in_identity_order(desired_items), make_op))
+
+
+def _checked_order(items: Iterable[_InfoT], side: str) -> Iterator[_InfoT]:
+    """Pass *items* through, raising once one is not strictly after its predecessor in identity order."""
+    previous: tuple[str, ...] | None = None
+    for item in items:
+        key = item[:-1]
+        if previous is not None and key <= previous:
+            raise ValueError(f"The {side} records are not in ascending identity order at {key!r}")
+        previous = key
+        yield item
+
+
+def _in_identity_order(items: Sequence[_InfoT]) -> Sequence[_InfoT]:
+    """Return *items* if they are already in strictly ascending identity order, else a sorted copy without repeats.
+
+    A repeated identity keeps its last record, as a mapping keyed by identity would.
+    """
+    if all(items[index - 1][:-1] < items[index][:-1] for index in range(1, len(items))):
+        return items
+    return sorted({item[:-1]: item for item in items}.values())
@@ -2,18 +2,25 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import TYPE_CHECKING, NamedTuple
+import sys
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
 from sqlalchemy import text
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from typing import Final
 
-    from sqlalchemy import Connection
+    from sqlalchemy import Connection, TextClause
 
 log = logging.getLogger(__name__)
 
+STREAM_BATCH_SIZE: Final = 1000
+"""Rows the ``iter_*`` helpers fetch from the server-side cursor at a time, unless told otherwise."""
+
 
 class FunctionInfo(NamedTuple):
     """A PostgreSQL function or procedure as loaded from the system catalog."""
@@ -59,12 +66,272 @@ class CheckConstraintInfo(NamedTuple):
     expression: str
 
 
+class CanonicalState(NamedTuple):
+    """A catalog snapshot of functions, triggers, and views.
+
+    Returned by :func:`inspect_catalog` for the live database and by :func:`canonicalize
+    <alembic_pg_autogen.canonicalize.canonicalize>` for the desired state, so the two sides of :func:`diff
+    <alembic_pg_autogen.diff.diff>` always have the same shape.
+    """
+
+    functions: Sequence[FunctionInfo]
+    triggers: Sequence[TriggerInfo]
+    views: Sequence[ViewInfo] = ()
+
+
+def inspect_catalog(
+    conn: Connection,
+    schemas: Sequence[str] | None = None,
+    *,
+    functions: bool = True,
+    triggers: bool = True,
+    views: bool = True,
+    function_identities: Sequence[tuple[str | None, str]] | None = None,
+    trigger_identities: Sequence[tuple[str | None, str, str]] | None = None,
+    view_identities: Sequence[tuple[str | None, str]] | None = None,
+    digests: bool = False,
+    baseline: CanonicalState | None = None,
+    shard: tuple[int, int] | None = None,
+) -> CanonicalState:
+    """Load functions, triggers, and views from PostgreSQL system catalogs in a single round trip.
+
+    Runs one statement whose columns are the per-type catalog queries aggregated into JSON arrays, so a full snapshot
+    costs one network round trip and one query plan instead of one per object type.  Each array is ordered by the
+    object's identity, exactly as the corresponding ``inspect_*`` helper orders its results.
+
+    Definitions are the bulk of a snapshot, and most of them are only ever compared, never rendered.  With *digests*,
+    each record's ``definition`` holds the server-computed :func:`definition_digest` of the definition instead, so only
+    identities and fixed-size digests cross the wire.  With *baseline* — a digest snapshot from an earlier call — a
+    record whose definition digest equals its baseline counterpart's carries that digest, and every other record
+    carries its full definition.  Comparing the result against the baseline therefore finds exactly the changed
+    objects, with their new definitions already loaded.
+
+    Args:
+        conn: An open SQLAlchemy connection.
+        schemas: Optional list of schema names to inspect.  When *None*, all schemas except ``pg_catalog`` and
+            ``information_schema`` are included.
+        functions: Whether to load functions and procedures.  When false, :attr:`CanonicalState.functions` is empty.
+        triggers: Whether to load triggers.  When false, :attr:`CanonicalState.triggers` is empty.
+        views: Whether to load views.  When false, :attr:`CanonicalState.views` is empty.
+        function_identities: ``(schema, name)`` pairs to restrict functions to; every overload of a listed name is
+            loaded.  A *None* schema means the connection's ``current_schema()``.  When *None*, no restriction applies.
+        trigger_identities: ``(schema, table_name, trigger_name)`` triples to restrict triggers to, resolved the same
+            way.
+        view_identities: ``(schema, name)`` pairs to restrict views to, resolved the same way.
+        digests: Return definition digests instead of definitions.
+        baseline: A snapshot loaded with *digests*; definitions unchanged since it are returned as their digest.
+        shard: ``(index, count)`` to load only the objects whose OID modulo *count* is *index*.  The *count* shards of
+            a catalog are disjoint and together hold every object; :func:`inspect_catalog_parallel
+            <alembic_pg_autogen.parallel.inspect_catalog_parallel>` loads them on separate connections.
+
+    Returns:
+        A :class:`CanonicalState` holding the requested object types.
+
+    Raises:
+        ValueError: If both *digests* and *baseline* are given, or if *shard* is out of range.
+    """
+    if digests and baseline is not None:
+        raise ValueError("digests and baseline are mutually exclusive")
+    if shard is not None and not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"shard index must be in [0, count), got {shard}")
+    requested = zip(
+        _CATALOG_SECTIONS,
+        (functions, triggers, views),
+        (function_identities, trigger_identities, view_identities),
+        baseline or (None, None, None),
+        strict=True,
+    )
+    sections = [(section, identities, known) for section, wanted, identities, known in requested if wanted]
+    if not sections:
+        return CanonicalState(functions=(), triggers=(), views=())
+
+    schema_filter, params = _build_schema_filter(schemas)
+    if shard is not None:
+        params.update(shard_index=shard[0], shard_count=shard[1])
+    columns: list[str] = []
+    for section, identities, known in sections:
+        identity_filter, identity_params = _build_identity_filter(section, identities)
+        if shard is not None:
+            identity_filter = f"({identity_filter}) AND {section.oid_column}::bigint % :shard_count = :shard_index"
+        params.update(identity_params)
+        definition, join, baseline_params = _build_definition(section, digests=digests, known=known)
+        params.update(baseline_params)
+        columns.append(
+            _CATALOG_COLUMN.format(
+                name=section.name,
+                fields=", ".join(definition if field == "definition" else f"q.{field}" for field in section.fields),
+                order=_identity_order(section),
+                query=section.query.format(schema_filter=schema_filter, identity_filter=identity_filter),
+                join=join,
+            )
+        )
+    row = conn.execute(text("SELECT\n" + ",\n".join(columns)), params).one()
+    state = CanonicalState(
+        functions=[catalog_record(FunctionInfo, r) for r in json.loads(row.functions)] if functions else (),
+        triggers=[catalog_record(TriggerInfo, r) for r in json.loads(row.triggers)] if triggers else (),
+        views=[catalog_record(ViewInfo, r) for r in json.loads(row.views)] if views else (),
+    )
+    log.debug(
+        "Inspected %d functions, %d triggers, and %d views (schemas=%s)",
+        len(state.functions),
+        len(state.triggers),
+        len(state.views),
+        schemas,
+    )
+    return state
+
+
+def iter_functions(
+    conn: Connection, schemas: Sequence[str] | None = None, *, batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[FunctionInfo]:
+    """Stream function definitions from PostgreSQL system catalogs, ordered by ``(schema, name, identity_args)``.
+
+    Rows come from a server-side cursor *batch_size* at a time, so memory stays bounded however many functions the
+    database holds.  The cursor lives until the iterator is exhausted or discarded; the connection stays usable
+    meanwhile.
+
+    Args:
+        conn: An open SQLAlchemy connection.  Server-side cursors need a transaction, which SQLAlchemy begins on first
+            use.
+        schemas: Optional list of schema names to inspect.  When *None*, all schemas except ``pg_catalog`` and
+            ``information_schema`` are included.
+        batch_size: Rows fetched per round trip.
+
+    Raises:
+        ValueError: If *batch_size* is not positive.
+    """
+    return _stream(conn, _section_query(_CATALOG_SECTIONS[0], schemas), FunctionInfo, batch_size)
+
+
+def iter_triggers(
+    conn: Connection, schemas: Sequence[str] | None = None, *, batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[TriggerInfo]:
+    """Stream trigger definitions, ordered by ``(schema, table_name, trigger_name)``, as :func:`iter_functions` does.
+
+    Raises:
+        ValueError: If *batch_size* is not positive.
+    """
+    return _stream(conn, _section_query(_CATALOG_SECTIONS[1], schemas), TriggerInfo, batch_size)
+
+
+def iter_views(
+    conn: Connection, schemas: Sequence[str] | None = None, *, batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[ViewInfo]:
+    """Stream view definitions, ordered by ``(schema, name)``, as :func:`iter_functions` does.
+
+    Raises:
+        ValueError: If *batch_size* is not positive.
+    """
+    return _stream(conn, _section_query(_CATALOG_SECTIONS[2], schemas), ViewInfo, batch_size)
+
+
+def iter_check_constraints(
+    conn: Connection,
+    schemas: Sequence[str] | None = None,
+    table_names: Sequence[str] | None = None,
+    *,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> Iterator[CheckConstraintInfo]:
+    """Stream check constraints, ordered by ``(schema, table_name, name)``, as :func:`iter_functions` does.
+
+    See :func:`inspect_check_constraints` for what is loaded.
+
+    Raises:
+        ValueError: If *batch_size* is not positive.
+    """
+    schema_filter, params = _build_schema_filter(schemas)
+    if table_names is not None:
+        table_filter = "c.relname = ANY(:table_names)"
+        params["table_names"] = list(table_names)
+    else:
+        table_filter = "true"
+    query = _CHECK_CONSTRAINTS_QUERY.format(schema_filter=schema_filter, table_filter=table_filter)
+    return _stream(conn, (query, params), CheckConstraintInfo, batch_size)
+
+
+def copy_functions(
+    conn: Connection, schemas: Sequence[str] | None = None, *, binary: bool = True
+) -> Iterator[FunctionInfo]:
+    """Stream functions as :func:`iter_functions` does, over ``COPY (SELECT ...) TO STDOUT`` instead of a cursor.
+
+    The rows arrive as one continuous stream that the driver parses as it reads, with no fetch round trip per batch
+    and, in *binary* format, no text escaping to undo.  The copy runs in a savepoint: abandoning the iterator midway
+    cancels the copy, and the savepoint keeps that from aborting the transaction.  Until the iterator is exhausted or
+    closed, the connection can run nothing else.
+
+    Args:
+        conn: An open SQLAlchemy connection whose driver is psycopg 3, the one driver with ``COPY`` streaming.
+        schemas: Optional list of schema names to inspect.  When *None*, all schemas except ``pg_catalog`` and
+            ``information_schema`` are included.
+        binary: Use ``COPY``'s binary format rather than its text format.
+
+    Raises:
+        ValueError: If the driver is not psycopg 3, the one that streams ``COPY`` output.
+    """
+    return _copy(conn, _section_query(_CATALOG_SECTIONS[0], schemas), FunctionInfo, binary=binary)
+
+
+def copy_triggers(
+    conn: Connection, schemas: Sequence[str] | None = None, *, binary: bool = True
+) -> Iterator[TriggerInfo]:
+    """Stream triggers as :func:`iter_triggers` does, over ``COPY`` as :func:`copy_functions` does.
+
+    Raises:
+        ValueError: If the driver is not psycopg 3, the one that streams ``COPY`` output.
+    """
+    return _copy(conn, _section_query(_CATALOG_SECTIONS[1], schemas), TriggerInfo, binary=binary)
+
+
+def copy_views(conn: Connection, schemas: Sequence[str] | None = None, *, binary: bool = True) -> Iterator[ViewInfo]:
+    """Stream views as :func:`iter_views` does, over ``COPY`` as :func:`copy_functions` does.
+
+    Raises:
+        ValueError: If the driver is not psycopg 3, the one that streams ``COPY`` output.
+    """
+    return _copy(conn, _section_query(_CATALOG_SECTIONS[2], schemas), ViewInfo, binary=binary)
+
+
+def copy_catalog(
+    conn: Connection,
+    schemas: Sequence[str] | None = None,
+    *,
+    functions: bool = True,
+    triggers: bool = True,
+    views: bool = True,
+    binary: bool = True,
+) -> CanonicalState:
+    """Load what :func:`inspect_catalog` loads with full definitions, over one ``COPY`` per object type.
+
+    :func:`inspect_catalog` aggregates every definition into JSON on the server and decodes it again on the client;
+    ``COPY`` skips both, at the cost of one statement per object type.  Which is faster depends on the catalog and
+    the network, and deparsing usually dominates either way: ``python -m alembic_pg_autogen.benchmark --extraction``
+    times this, the JSON path, and the ``iter_*`` cursors against a generated catalog.
+
+    Raises:
+        ValueError: If the driver is not psycopg 3, the one that streams ``COPY`` output.
+    """
+    state = CanonicalState(
+        functions=list(copy_functions(conn, schemas, binary=binary)) if functions else (),
+        triggers=list(copy_triggers(conn, schemas, binary=binary)) if triggers else (),
+        views=list(copy_views(conn, schemas, binary=binary)) if views else (),
+    )
+    log.debug(
+        "Copied %d functions, %d triggers, and %d views (schemas=%s)",
+        len(state.functions),
+        len(state.triggers),
+        len(state.views),
+        schemas,
+    )
+    return state
+
+
 def inspect_functions(conn: Connection, schemas: Sequence[str] | None = None) -> Sequence[FunctionInfo]:
     """Bulk-load function definitions from PostgreSQL system catalogs.
 
     Queries ``pg_proc`` joined with ``pg_namespace`` to retrieve all user-defined functions and procedures.  Uses
     ``pg_get_functiondef()`` for canonical DDL and ``pg_get_function_identity_arguments()`` for the
-    overload-distinguishing argument signature.
+    overload-distinguishing argument signature.  Collects :func:`iter_functions`; the result is what
+    :func:`inspect_catalog` loads with only *functions* requested.
 
     Args:
         conn: An open SQLAlchemy connection.
@@ -74,12 +341,7 @@ def inspect_functions(conn: Connection, schemas: Sequence[str] | None = None) ->
     Returns:
         A sequence of :class:`FunctionInfo` instances, one per function/procedure.
     """
-    schema_filter, params = _build_schema_filter(schemas)
-    query = text(_FUNCTIONS_QUERY.format(schema_filter=schema_filter))
-    rows = conn.execute(query, params)
-    result = [
-        FunctionInfo(schema=r.schema, name=r.name, identity_args=r.identity_args, definition=r.definition) for r in rows
-    ]
+    result = list(iter_functions(conn, schemas))
     log.debug("Inspected %d functions (schemas=%s)", len(result), schemas)
     return result
 
@@ -88,7 +350,8 @@ def inspect_triggers(conn: Connection, schemas: Sequence[str] | None = None) ->
     """Bulk-load trigger definitions from PostgreSQL system catalogs.
 
     Queries ``pg_trigger`` joined with ``pg_class`` and ``pg_namespace`` to retrieve all user-defined (non-internal)
-    triggers.  Uses ``pg_get_triggerdef()`` for canonical DDL.
+    triggers.  Uses ``pg_get_triggerdef()`` for canonical DDL.  Collects :func:`iter_triggers`; the result is what
+    :func:`inspect_catalog` loads with only *triggers* requested.
 
     Args:
         conn: An open SQLAlchemy connection.
@@ -98,13 +361,7 @@ def inspect_triggers(conn: Connection, schemas: Sequence[str] | None = None) ->
     Returns:
         A sequence of :class:`TriggerInfo` instances, one per trigger.
     """
-    schema_filter, params = _build_schema_filter(schemas)
-    query = text(_TRIGGERS_QUERY.format(schema_filter=schema_filter))
-    rows = conn.execute(query, params)
-    result = [
-        TriggerInfo(schema=r.schema, table_name=r.table_name, trigger_name=r.trigger_name, definition=r.definition)
-        for r in rows
-    ]
+    result = list(iter_triggers(conn, schemas))
     log.debug("Inspected %d triggers (schemas=%s)", len(result), schemas)
     return result
 
@@ -114,7 +371,8 @@ def inspect_views(conn: Connection, schemas: Sequence[str] | None = None) -> Seq
 
     Queries ``pg_class`` joined with ``pg_namespace`` to retrieve all user-defined regular views (``relkind = 'v'``).
     Reconstructs the full ``CREATE OR REPLACE VIEW schema.name AS`` DDL by combining ``quote_ident()`` and
-    ``pg_get_viewdef(oid, true)`` in the SQL query so that ``ViewInfo.definition`` contains complete DDL.
+    ``pg_get_viewdef(oid, true)`` in the SQL query so that ``ViewInfo.definition`` contains complete DDL.  Collects
+    :func:`iter_views`; the result is what :func:`inspect_catalog` loads with only *views* requested.
 
     Args:
         conn: An open SQLAlchemy connection.
@@ -124,10 +382,7 @@ def inspect_views(conn: Connection, schemas: Sequence[str] | None = None) -> Seq
     Returns:
         A sequence of :class:`ViewInfo` instances, one per view.
     """
-    schema_filter, params = _build_schema_filter(schemas)
-    query = text(_VIEWS_QUERY.format(schema_filter=schema_filter))
-    rows = conn.execute(query, params)
-    result = [ViewInfo(schema=r.schema, name=r.name, definition=r.definition) for r in rows]
+    result = list(iter_views(conn, schemas))
     log.debug("Inspected %d views (schemas=%s)", len(result), schemas)
     return result
 
@@ -146,7 +401,7 @@ def inspect_check_constraints(
     two are directly comparable as strings.
 
     Constraints owned by an extension are excluded, as are domain constraints (they have no ``conrelid``) and — on
-    PostgreSQL 18+ — ``NOT NULL`` constraints, which use ``contype = 'n'``.
+    PostgreSQL 18+ — ``NOT NULL`` constraints, which use ``contype = 'n'``.  Collects :func:`iter_check_constraints`.
 
     Args:
         conn: An open SQLAlchemy connection.
@@ -156,22 +411,32 @@ def inspect_check_constraints(
     Returns:
         A sequence of :class:`CheckConstraintInfo` instances, one per check constraint.
     """
-    schema_filter, params = _build_schema_filter(schemas)
-    if table_names is not None:
-        table_filter = "c.relname = ANY(:table_names)"
-        params["table_names"] = list(table_names)
-    else:
-        table_filter = "true"
-    query = text(_CHECK_CONSTRAINTS_QUERY.format(schema_filter=schema_filter, table_filter=table_filter))
-    rows = conn.execute(query, params)
-    result = [
-        CheckConstraintInfo(schema=r.schema, table_name=r.table_name, name=r.name, expression=r.expression)
-        for r in rows
-    ]
+    result = list(iter_check_constraints(conn, schemas, table_names))
     log.debug("Inspected %d check constraints (schemas=%s, tables=%s)", len(result), schemas, table_names)
     return result
 
 
+def definition_digest(definition: str) -> str:
+    """Return the digest :func:`inspect_catalog` computes server-side for *definition* when asked for digests.
+
+    The digest is the hex MD5 of the UTF-8 encoded text, matching PostgreSQL's ``md5()`` in a ``UTF8`` database.  It
+    is a change detector, not a security measure.
+    """
+    return hashlib.md5(definition.encode(), usedforsecurity=False).hexdigest()
+
+
+def catalog_record(record_type: type[_Record], values: Iterable[str]) -> _Record:
+    """Build a *record_type* from *values*, interning every field but the trailing definition or expression.
+
+    A snapshot repeats the same schema and table names across thousands of records, and the current and desired
+    states repeat each other's identities.  Interned, each distinct identifier is one string object however many
+    records hold it, and comparing two identities mostly compares pointers.  Every record the inspection and
+    canonicalization helpers return is built this way.
+    """
+    *identity, payload = values
+    return record_type._make([*map(sys.intern, identity), payload])
+
+
 def current_schema(conn: Connection) -> str:
     """Return the connection's current schema, i.e. the first entry of its ``search_path``."""
     schema = conn.execute(text("SELECT current_schema()")).scalar()
@@ -191,7 +456,7 @@ FROM pg_catalog.pg_class c
 JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
 WHERE c.relkind = 'v'
   AND ({schema_filter})
-ORDER BY n.nspname, c.relname
+  AND ({identity_filter})
 """
 
 _CHECK_CONSTRAINTS_QUERY = """\
@@ -212,7 +477,7 @@ WHERE con.contype = 'c'
         AND d.objid = con.oid
         AND d.deptype = 'e'
   )
-ORDER BY n.nspname, c.relname, con.conname
+ORDER BY n.nspname COLLATE "C", c.relname COLLATE "C", con.conname COLLATE "C"
 """
 
 _FUNCTIONS_QUERY = """\
@@ -225,13 +490,13 @@ FROM pg_catalog.pg_proc p
 JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
 WHERE p.prokind IN ('f', 'p')
   AND ({schema_filter})
+  AND ({identity_filter})
   AND NOT EXISTS (
       SELECT 1 FROM pg_catalog.pg_depend d
       WHERE d.classid = 'pg_catalog.pg_proc'::regclass
         AND d.objid = p.oid
         AND d.deptype = 'e'
   )
-ORDER BY n.nspname, p.proname, identity_args
 """
 
 _TRIGGERS_QUERY = """\
@@ -245,19 +510,202 @@ JOIN pg_catalog.pg_class c ON c.oid = t.tgrelid
 JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
 WHERE NOT t.tgisinternal
   AND ({schema_filter})
+  AND ({identity_filter})
   AND NOT EXISTS (
       SELECT 1 FROM pg_catalog.pg_depend d
       WHERE d.classid = 'pg_catalog.pg_trigger'::regclass
         AND d.objid = t.oid
         AND d.deptype = 'e'
   )
-ORDER BY n.nspname, c.relname, t.tgname
 """
 
 
+class _CatalogSection(NamedTuple):
+    """One object type's share of the :func:`inspect_catalog` statement."""
+
+    name: str
+    fields: tuple[str, ...]
+    """Output columns of *query*, in the field order of the matching catalog record type."""
+    order: tuple[str, ...]
+    """Identity columns the aggregated rows are sorted by."""
+    identity_columns: tuple[str, ...]
+    """Catalog columns an identity filter matches against, schema first."""
+    oid_column: str
+    """The catalog column holding each object's OID, which shards are cut by."""
+    query: str
+
+
+_CATALOG_SECTIONS = (
+    _CatalogSection(
+        "functions",
+        ("schema", "name", "identity_args", "definition"),
+        ("schema", "name", "identity_args"),
+        ("n.nspname", "p.proname"),
+        "p.oid",
+        _FUNCTIONS_QUERY,
+    ),
+    _CatalogSection(
+        "triggers",
+        ("schema", "table_name", "trigger_name", "definition"),
+        ("schema", "table_name", "trigger_name"),
+        ("n.nspname", "c.relname", "t.tgname"),
+        "t.oid",
+        _TRIGGERS_QUERY,
+    ),
+    _CatalogSection(
+        "views", ("schema", "name", "definition"), ("schema", "name"), ("n.nspname", "c.relname"), "c.oid", _VIEWS_QUERY
+    ),
+)
+
+# Each section aggregates its rows into a single JSON array so the whole snapshot comes back as one row.  The array is
+# cast to text and decoded client-side, which keeps the result independent of how the driver maps ``json`` values.
+_CATALOG_COLUMN = """\
+    (
+        SELECT coalesce(json_agg(json_build_array({fields}) ORDER BY {order}), '[]')::text
+        FROM (
+{query}        ) q{join}
+    ) AS {name}"""
+
+
+def _identity_order(section: _CatalogSection) -> str:
+    """Build the ``ORDER BY`` list of a catalog section.
+
+    Byte order (``COLLATE "C"``) is code point order, so records come back in the order Python sorts their identity
+    tuples in, whatever the database's collation.  That is what lets :func:`~alembic_pg_autogen.diff.iter_diff`
+    merge-join them without sorting.
+    """
+    return ", ".join(f'q.{field} COLLATE "C"' for field in section.order)
+
+
+def _build_definition(
+    section: _CatalogSection, *, digests: bool, known: Sequence[tuple[str, ...]] | None
+) -> tuple[str, str, dict[str, object]]:
+    """Build the ``definition`` output expression of a catalog section, plus the join and bind params it needs.
+
+    With a *known* baseline, the baseline's identities and digests are joined in as ``text[]`` parameters and a row
+    whose digest matches keeps the digest, so an unchanged definition never leaves the server.
+    """
+    if digests:
+        return "md5(q.definition)", "", {}
+    if known is None:
+        return "q.definition", "", {}
+    keys = [f"{section.name}_baseline_{index}" for index in range(len(section.order))]
+    params: dict[str, object] = {key: [item[index] for item in known] for index, key in enumerate(keys)}
+    params[f"{section.name}_baseline_digest"] = [item[-1] for item in known]
+    arrays = ", ".join(f"CAST(:{key} AS text[])" for key in (*keys, f"{section.name}_baseline_digest"))
+    aliases = ", ".join(f"c{index}" for index in range(len(keys)))
+    conditions = " AND ".join(f"b.c{index} = q.{field}" for index, field in enumerate(section.order))
+    join = f"\n        LEFT JOIN unnest({arrays}) AS b({aliases}, digest) ON {conditions}"
+    return "CASE WHEN b.digest = md5(q.definition) THEN b.digest ELSE q.definition END", join, params
+
+
+def _build_identity_filter(
+    section: _CatalogSection, identities: Sequence[tuple[str | None, ...]] | None
+) -> tuple[str, dict[str, object]]:
+    """Build the SQL WHERE clause fragment and bind params restricting a catalog section to *identities*.
+
+    Each identity component travels as its own ``text[]`` parameter and the arrays are zipped back together with
+    ``unnest()``, so the names are never interpolated into the SQL.  A *None* schema resolves to ``current_schema()``
+    on the server, the same resolution PostgreSQL applied when it created the unqualified object.
+    """
+    if identities is None:
+        return "true", {}
+    keys = [f"{section.name}_identity_{index}" for index in range(len(section.identity_columns))]
+    params: dict[str, object] = {key: [identity[index] for identity in identities] for index, key in enumerate(keys)}
+    arrays = ", ".join(f"CAST(:{key} AS text[])" for key in keys)
+    aliases = ", ".join(f"c{index}" for index in range(len(keys)))
+    schema_column, *name_columns = section.identity_columns
+    conditions = [f"{schema_column} = coalesce(i.c0, current_schema())"]
+    conditions += [f"{column} = i.c{index}" for index, column in enumerate(name_columns, start=1)]
+    return f"EXISTS (SELECT 1 FROM unnest({arrays}) AS i({aliases}) WHERE {' AND '.join(conditions)})", params
+
+
 def _build_schema_filter(schemas: Sequence[str] | None) -> tuple[str, dict[str, object]]:
     """Build the SQL WHERE clause fragment and bind params for schema filtering."""
     if schemas is not None:
         return "n.nspname = ANY(:schemas)", {"schemas": list(schemas)}
     excluded = list(_EXCLUDED_SCHEMAS)
     return "n.nspname != ALL(:excluded_schemas)", {"excluded_schemas": excluded}
+
+
+_Record = TypeVar("_Record", FunctionInfo, TriggerInfo, ViewInfo, CheckConstraintInfo)
+
+# One section of the catalog, sorted by identity, with its columns in the field order of its record type.
+_SECTION_STREAM = """\
+SELECT {fields}
+FROM (
+{query}) q
+ORDER BY {order}"""
+
+
+def _section_query(section: _CatalogSection, schemas: Sequence[str] | None) -> tuple[str, dict[str, object]]:
+    """Build the statement and bind params streaming one catalog section on its own."""
+    schema_filter, params = _build_schema_filter(schemas)
+    query = _SECTION_STREAM.format(
+        fields=", ".join(f"q.{field}" for field in section.fields),
+        query=section.query.format(schema_filter=schema_filter, identity_filter="true"),
+        order=_identity_order(section),
+    )
+    return query, params
+
+
+def _stream(
+    conn: Connection, statement: tuple[str, dict[str, object]], record: type[_Record], batch_size: int
+) -> Iterator[_Record]:
+    """Execute *statement* on a server-side cursor and yield each row as a *record*.
+
+    Validates eagerly, so a bad *batch_size* raises at the call rather than at the first ``next()``.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    query, params = statement
+    # Per statement: ``Connection.execution_options()`` would switch every later statement to server-side cursors too.
+    return _fetch(conn, text(query).execution_options(stream_results=True, yield_per=batch_size), params, record)
+
+
+def _fetch(conn: Connection, query: TextClause, params: dict[str, object], record: type[_Record]) -> Iterator[_Record]:
+    with conn.execute(query, params) as result:
+        for row in result:
+            yield catalog_record(record, row)
+
+
+def _copy(
+    conn: Connection, statement: tuple[str, dict[str, object]], record: type[_Record], *, binary: bool
+) -> Iterator[_Record]:
+    """Run *statement* as ``COPY ... TO STDOUT`` and yield each row as a *record*.
+
+    Checks the driver eagerly, so an unsupported one raises at the call rather than at the first ``next()``.  The
+    cursor itself is only opened by the first ``next()``, so an iterator that is never advanced leaves the connection
+    untouched.
+    """
+    if conn.dialect.driver != "psycopg":
+        raise ValueError(f"COPY streaming needs the psycopg driver, not {conn.dialect.driver}")
+    query, params = statement
+    # COPY cannot take bind parameters, so the driver interpolates them client-side, in its own placeholder style.
+    compiled = text(query).compile(dialect=conn.dialect)
+    copy = f"COPY ({compiled}) TO STDOUT" + (" (FORMAT binary)" if binary else "")
+    return _copy_rows(conn, (copy, compiled.construct_params(params)), record, binary=binary)
+
+
+def _copy_rows(
+    conn: Connection, statement: tuple[str, Mapping[str, object]], record: type[_Record], *, binary: bool
+) -> Iterator[_Record]:
+    savepoint = conn.begin_nested()
+    finished = False
+    try:
+        cursor: Any = conn.connection.cursor()
+        try:
+            with cursor.copy(*statement) as copy:
+                if binary:
+                    # Catalog names and definitions are all text on the wire; binary rows carry no type information.
+                    copy.set_types(["text"] * len(record._fields))
+                for row in copy.rows():
+                    yield catalog_record(record, row)
+        finally:
+            cursor.close()
+        finished = True
+    finally:
+        if finished:
+            savepoint.commit()
+        else:
+            savepoint.rollback()
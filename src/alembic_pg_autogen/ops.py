@@ -9,6 +9,8 @@ from typing import TYPE_CHECKING
 from alembic.operations.ops import MigrateOperation
 from typing_extensions import override
 
+from alembic_pg_autogen.ddl import alter_function_statement
+
 if TYPE_CHECKING:
     from alembic_pg_autogen.inspect import FunctionInfo, TriggerInfo, ViewInfo
 
@@ -53,6 +55,36 @@ class ReplaceFunctionOp(MigrateOperation):
         return ("replace_function", self.desired.schema, self.desired.name, self.desired.identity_args)
 
 
+class AlterFunctionOp(MigrateOperation):
+    """Change attributes of an existing PostgreSQL function, such as its volatility or cost, but not its body.
+
+    *statement* is the ``ALTER FUNCTION`` that turns *current* into *desired*, computed once by the comparator from
+    :func:`~alembic_pg_autogen.ddl.alter_function_statement` so the renderer need not parse either definition again.
+    """
+
+    current: FunctionInfo
+    desired: FunctionInfo
+    statement: str
+
+    def __init__(self, current: FunctionInfo, desired: FunctionInfo, statement: str) -> None:
+        self.current = current
+        self.desired = desired
+        self.statement = statement
+
+    @override
+    def reverse(self) -> AlterFunctionOp | ReplaceFunctionOp:
+        """Reverse is altering back to the old attributes, or replacing with the old definition if no ALTER can."""
+        statement = alter_function_statement(self.desired.definition, self.current.definition)
+        if statement is None:
+            return ReplaceFunctionOp(self.desired, self.current)
+        return AlterFunctionOp(self.desired, self.current, statement)
+
+    @override
+    def to_diff_tuple(self) -> tuple[str, str, str, str]:
+        """Return a hashable tuple for debugging and comparison."""
+        return ("alter_function", self.desired.schema, self.desired.name, self.desired.identity_args)
+
+
 class DropFunctionOp(MigrateOperation):
     """Drop an existing PostgreSQL function."""
 
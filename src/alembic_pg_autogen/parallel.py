@@ -0,0 +1,215 @@
+"""Catalog work spread over several connections that all read the same snapshot of the catalog.
+
+Deparsing definitions with ``pg_get_functiondef()`` and its siblings is CPU-bound, and one statement runs on one
+backend.  :func:`inspect_catalog_parallel` exports the snapshot of the caller's transaction, has each of several worker
+connections import it and load one OID shard of the catalog, and merges the shards back in identity order.  Every
+worker sees exactly the catalog the caller's transaction sees, so the result equals :func:`inspect_catalog
+<alembic_pg_autogen.inspect.inspect_catalog>` on the caller's connection.  :func:`sibling_connection` opens one such
+connection for other work, such as canonicalizing while the caller inspects.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+
+from alembic_pg_autogen.inspect import CanonicalState, inspect_catalog
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping, Sequence
+    from typing import Final
+
+    from sqlalchemy import Connection
+
+log = logging.getLogger(__name__)
+
+DEPARSE_SETTINGS: Final = (
+    "search_path",
+    "DateStyle",
+    "IntervalStyle",
+    "TimeZone",
+    "extra_float_digits",
+    "bytea_output",
+    "quote_all_identifiers",
+)
+"""Settings that change how the server deparses definitions, copied from the caller's connection to every worker.
+
+``search_path`` decides which names ``pg_get_viewdef()`` and ``pg_get_triggerdef()`` schema-qualify, and the rest
+decide how constants in view definitions are printed.
+"""
+
+_SNAPSHOT_ID: Final = re.compile(r"[0-9A-F]+-[0-9A-F]+-[0-9]+")
+
+_IDENTITY: Final = itemgetter(slice(0, -1))
+
+_SETTING_COLUMNS: Final = ", ".join(
+    f"current_setting('{name}') AS s{index}" for index, name in enumerate(DEPARSE_SETTINGS)
+)
+
+_APPLY_SETTINGS: Final = """\
+SELECT set_config(name, value, true)
+FROM unnest(CAST(:names AS text[]), CAST(:values AS text[])) AS s(name, value)"""
+
+
+def inspect_catalog_parallel(
+    conn: Connection,
+    schemas: Sequence[str] | None = None,
+    *,
+    workers: int,
+    functions: bool = True,
+    triggers: bool = True,
+    views: bool = True,
+    function_identities: Sequence[tuple[str | None, str]] | None = None,
+    trigger_identities: Sequence[tuple[str | None, str, str]] | None = None,
+    view_identities: Sequence[tuple[str | None, str]] | None = None,
+    digests: bool = False,
+    baseline: CanonicalState | None = None,
+) -> CanonicalState:
+    """Load what :func:`~alembic_pg_autogen.inspect.inspect_catalog` loads, on *workers* connections at once.
+
+    The caller's transaction exports its snapshot with ``pg_export_snapshot()``.  Each worker is a new connection
+    from ``conn.engine`` that imports it with ``SET TRANSACTION SNAPSHOT`` in a ``REPEATABLE READ`` transaction, takes
+    the caller's :data:`DEPARSE_SETTINGS`, and inspects one shard of the catalog.  The caller's transaction stays open
+    and idle until every worker is done, so the snapshot outlives them.
+
+    Other transactions' changes are invisible to the workers, but so are the caller's own: a transaction that has
+    already written cannot share what it wrote.  Such a transaction, a connection inside a savepoint, and a single
+    worker are all inspected on *conn* alone.  As with ``pg_dump --jobs``, the deparsing functions read the latest
+    committed catalog, so DDL committed while the workers run may show in a definition whose object the snapshot holds.
+
+    Args:
+        conn: An open SQLAlchemy connection in a transaction.
+        schemas: As for :func:`~alembic_pg_autogen.inspect.inspect_catalog`, like the remaining arguments.
+        workers: The number of worker connections, each of which loads one shard.
+        functions: Whether to load functions and procedures.
+        triggers: Whether to load triggers.
+        views: Whether to load views.
+        function_identities: ``(schema, name)`` pairs to restrict functions to.  A *None* schema means the caller's
+            ``current_schema()``.
+        trigger_identities: ``(schema, table_name, trigger_name)`` triples to restrict triggers to.
+        view_identities: ``(schema, name)`` pairs to restrict views to.
+        digests: Return definition digests instead of definitions.
+        baseline: A snapshot loaded with *digests*; definitions unchanged since it are returned as their digest.
+
+    Returns:
+        A :class:`~alembic_pg_autogen.inspect.CanonicalState` equal to what ``inspect_catalog`` returns on *conn*.
+
+    Raises:
+        ValueError: If *workers* is not positive, or if both *digests* and *baseline* are given.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+
+    def inspect(worker: Connection, shard: tuple[int, int] | None = None) -> CanonicalState:
+        return inspect_catalog(
+            worker,
+            schemas,
+            functions=functions,
+            triggers=triggers,
+            views=views,
+            function_identities=function_identities,
+            trigger_identities=trigger_identities,
+            view_identities=view_identities,
+            digests=digests,
+            baseline=baseline,
+            shard=shard,
+        )
+
+    if workers == 1 or conn.in_nested_transaction():
+        return inspect(conn)
+    snapshot, settings = _export_snapshot(conn)
+    if snapshot is None:
+        log.debug("The transaction has written to the database; inspecting on its own connection")
+        return inspect(conn)
+
+    def inspect_shard(index: int) -> CanonicalState:
+        with conn.engine.connect() as worker:
+            _import_snapshot(worker, snapshot, settings)
+            return inspect(worker, (index, workers))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alembic-pg-autogen-inspect") as pool:
+        shards = list(pool.map(inspect_shard, range(workers)))
+    # Each shard comes back in identity order, so merging them restores the order of a single-connection inspection.
+    state = CanonicalState(
+        functions=list(heapq.merge(*(shard.functions for shard in shards), key=_IDENTITY)) if functions else (),
+        triggers=list(heapq.merge(*(shard.triggers for shard in shards), key=_IDENTITY)) if triggers else (),
+        views=list(heapq.merge(*(shard.views for shard in shards), key=_IDENTITY)) if views else (),
+    )
+    log.debug(
+        "Inspected %d functions, %d triggers, and %d views on %d connections (schemas=%s)",
+        len(state.functions),
+        len(state.triggers),
+        len(state.views),
+        workers,
+        schemas,
+    )
+    return state
+
+
+@contextmanager
+def sibling_connection(conn: Connection, *, lock_timeout: str | None = None) -> Generator[Connection | None]:
+    """Open a connection from ``conn.engine`` that reads the catalog exactly as *conn*'s transaction does.
+
+    The new connection imports *conn*'s snapshot and :data:`DEPARSE_SETTINGS` as the workers of
+    :func:`inspect_catalog_parallel` do.  Its transaction is rolled back when the block exits.  Yields *None* instead
+    when *conn* is inside a savepoint or its transaction has written, since no other connection can see those writes.
+
+    Args:
+        conn: An open SQLAlchemy connection in a transaction, which must stay open for the whole block.
+        lock_timeout: A ``lock_timeout`` for the new connection's transaction, such as ``"1s"``.  Locks *conn*'s
+            transaction holds are not released before the block exits, so waiting for them would never end.
+    """
+    snapshot, settings = (None, {}) if conn.in_nested_transaction() else _export_snapshot(conn)
+    if snapshot is None:
+        yield None
+        return
+    if lock_timeout is not None:
+        settings["lock_timeout"] = lock_timeout
+    with conn.engine.connect() as sibling:
+        _import_snapshot(sibling, snapshot, settings)
+        yield sibling
+
+
+def deparse_settings(conn: Connection) -> dict[str, str]:
+    """Return *conn*'s current values of :data:`DEPARSE_SETTINGS`."""
+    row = conn.execute(text(f"SELECT {_SETTING_COLUMNS}")).one()
+    return dict(zip(DEPARSE_SETTINGS, row, strict=True))
+
+
+def apply_deparse_settings(conn: Connection, settings: Mapping[str, str]) -> None:
+    """Apply *settings*, as :func:`deparse_settings` returns them, to *conn* until its transaction ends."""
+    conn.execute(text(_APPLY_SETTINGS), {"names": list(settings), "values": list(settings.values())})
+
+
+def _export_snapshot(conn: Connection) -> tuple[str | None, dict[str, str]]:
+    """Export the snapshot of *conn*'s transaction, with its :data:`DEPARSE_SETTINGS`, in one round trip.
+
+    The snapshot is *None* when the transaction has written, since importers would not see what it wrote.
+    """
+    row = conn.execute(
+        text(
+            "SELECT CASE WHEN txid_current_if_assigned() IS NULL THEN pg_export_snapshot() END AS snapshot, "
+            + _SETTING_COLUMNS
+        )
+    ).one()
+    return row.snapshot, dict(zip(DEPARSE_SETTINGS, row[1:], strict=True))
+
+
+def _import_snapshot(worker: Connection, snapshot: str, settings: Mapping[str, str]) -> None:
+    """Make *worker*'s transaction read *snapshot*, with *settings* applied for the rest of the transaction.
+
+    Uses ``SET TRANSACTION`` rather than SQLAlchemy's ``isolation_level`` option, which some drivers refuse to change
+    once a pool event has already begun the transaction.  Both must precede the first query that takes a snapshot.
+    """
+    if not _SNAPSHOT_ID.fullmatch(snapshot):
+        raise ValueError(f"Unexpected snapshot identifier {snapshot!r}")
+    worker.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+    worker.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+    apply_deparse_settings(worker, settings)
@@ -0,0 +1,32 @@
+"""Pytest plugin providing the ``pg_query_budget`` fixture.
+
+Installed as a ``pytest11`` entry point, so the fixture is available in any project that has this package installed.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
+
+    from alembic_pg_autogen.queries import QueryRecorder
+
+
+@pytest.fixture
+def pg_query_budget() -> Callable[..., AbstractContextManager[QueryRecorder]]:
+    """Return :func:`~alembic_pg_autogen.queries.query_budget`, to assert how many statements a block may send.
+
+    .. code-block:: python
+
+        def test_autogenerate_is_constant_in_tables(pg_query_budget, config):
+            with pg_query_budget(QueryBudget(12), tables=50):
+                command.revision(config, autogenerate=True)
+    """
+    # Imported on use rather than when pytest loads the plugin.
+    from alembic_pg_autogen.queries import query_budget
+
+    return query_budget
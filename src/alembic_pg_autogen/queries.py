@@ -0,0 +1,281 @@
+"""Recording of the SQL statements an autogenerate run sends to the server, and budgets on how many it may send."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
+
+from sqlalchemy import Engine, event
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Generator, Iterable, Sequence
+    from types import FrameType
+    from typing import Final
+
+    from sqlalchemy import Connection
+
+log = logging.getLogger(__name__)
+
+_FORMAT_VERSION: Final = 1
+"""Written to every JSON artifact."""
+
+_PACKAGE: Final = "alembic_pg_autogen"
+
+_SKIPPED_MODULES: Final = ("sqlalchemy.", "contextlib", __name__)
+"""Modules that are never a statement's call site: the machinery between the caller and the cursor."""
+
+
+class QueryRecord(NamedTuple):
+    """One statement as it was sent to the server."""
+
+    sql: str
+    """The statement with its bind placeholders, as handed to the driver."""
+    call_site: str
+    """``module:function`` of the innermost frame in this package, or of the first caller outside SQLAlchemy."""
+    bind_sizes: tuple[int, ...]
+    """The approximate size in bytes of each bound value, summed over the parameter sets of an ``executemany``."""
+    seconds: float
+    rows: int | None
+    """The rows the statement returned or affected, or *None* when the driver does not say."""
+    bytes_sent: int
+    """The statement text plus its bound values, in bytes."""
+    bytes_received: int | None
+    """The size of the returned values in bytes, when the driver exposes them (psycopg 3 does)."""
+
+
+class CallSiteSummary(NamedTuple):
+    """The statements sent from one call site, aggregated."""
+
+    call_site: str
+    statements: int
+    seconds: float
+    max_seconds: float
+    rows: int
+    bytes_sent: int
+    bytes_received: int
+
+
+class QueryRecorder:
+    """Records every statement executed on a connection or engine while :meth:`recording` is active.
+
+    Wrap the part of ``env.py`` that runs autogenerate to see how many round trips it makes and where they come from::
+
+        recorder = QueryRecorder()
+        with recorder.recording(connection):
+            context.configure(connection=connection, ...)
+            with context.begin_transaction():
+                context.run_migrations()
+        recorder.write_json("autogenerate-queries.json")
+    """
+
+    def __init__(self) -> None:
+        """Create a recorder with nothing recorded."""
+        self.records: Final[list[QueryRecord]] = []
+
+    @contextmanager
+    def recording(self, target: Connection | Engine | type[Engine]) -> Generator[QueryRecorder]:
+        """Record the statements executed on *target*, or on any connection of it if it is an engine, in the block.
+
+        Pass the :class:`~sqlalchemy.engine.Engine` class itself to record every engine in the process.  Statements
+        the server rejects are not recorded.
+        """
+        event.listen(target, "before_cursor_execute", self._before)
+        event.listen(target, "after_cursor_execute", self._after)
+        try:
+            yield self
+        finally:
+            event.remove(target, "before_cursor_execute", self._before)
+            event.remove(target, "after_cursor_execute", self._after)
+
+    def summary(self) -> list[CallSiteSummary]:
+        """Aggregate the records by call site, the most time-consuming first."""
+        by_site: dict[str, list[QueryRecord]] = {}
+        for record in self.records:
+            by_site.setdefault(record.call_site, []).append(record)
+        summaries = [
+            CallSiteSummary(
+                call_site=site,
+                statements=len(records),
+                seconds=sum(record.seconds for record in records),
+                max_seconds=max(record.seconds for record in records),
+                rows=sum(record.rows or 0 for record in records),
+                bytes_sent=sum(record.bytes_sent for record in records),
+                bytes_received=sum(record.bytes_received or 0 for record in records),
+            )
+            for site, records in by_site.items()
+        ]
+        return sorted(summaries, key=lambda summary: (-summary.seconds, summary.call_site))
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the records and their summary as a JSON-serializable mapping."""
+        return {
+            "format": _FORMAT_VERSION,
+            "statements": len(self.records),
+            "seconds": sum(record.seconds for record in self.records),
+            "summary": [summary._asdict() for summary in self.summary()],
+            "records": [record._asdict() for record in self.records],
+        }
+
+    def write_json(self, path: str | os.PathLike[str]) -> None:
+        """Write :meth:`to_json` to *path*."""
+        with open(path, "w") as file:
+            json.dump(self.to_json(), file, indent=2)
+            file.write("\n")
+
+    def format_table(self) -> str:
+        """Return :meth:`summary` as a plain-text table."""
+        lines = [f"{'call site':<64} {'stmts':>6} {'seconds':>9} {'max':>9} {'rows':>8} {'sent':>10} {'received':>10}"]
+        for summary in self.summary():
+            lines.append(
+                f"{summary.call_site:<64} {summary.statements:>6} {summary.seconds:>9.4f} {summary.max_seconds:>9.4f} "
+                f"{summary.rows:>8} {summary.bytes_sent:>10} {summary.bytes_received:>10}"
+            )
+        return "\n".join(lines)
+
+    def _before(self, conn: Connection, *_args: object) -> None:
+        # Kept with the connection, which runs one statement at a time, rather than on the recorder: an engine's
+        # connections may execute concurrently in other threads.
+        conn.info[self] = time.perf_counter()
+
+    def _after(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: object,
+        executemany: bool,
+    ) -> None:
+        seconds = time.perf_counter() - conn.info.pop(self)
+        bind_sizes = _bind_sizes(parameters if executemany else [parameters])
+        self.records.append(
+            QueryRecord(
+                sql=statement,
+                call_site=_call_site(sys._getframe(1)),  # pyright: ignore[reportPrivateUsage]
+                bind_sizes=bind_sizes,
+                seconds=seconds,
+                rows=cursor.rowcount if cursor.rowcount >= 0 else None,
+                bytes_sent=len(statement.encode()) + sum(bind_sizes),
+                bytes_received=_received_bytes(cursor),
+            )
+        )
+
+
+class QueryBudget(NamedTuple):
+    """How many statements a block may send, as a function of how many objects it handles.
+
+    ``QueryBudget(8)`` allows eight statements however many tables there are, i.e. O(1) round trips;
+    ``QueryBudget(2, {"tables": 1})`` allows two plus one per table.
+    """
+
+    base: int
+    per_object: Mapping[str, int] = {}
+    """Statements allowed per object of each kind, on top of *base*."""
+
+    def limit(self, counts: Mapping[str, int]) -> int:
+        """Return the number of statements allowed for *counts* objects of each kind.
+
+        Raises:
+            ValueError: If *counts* lacks a kind that :attr:`per_object` charges for.
+        """
+        missing = self.per_object.keys() - counts.keys()
+        if missing:
+            raise ValueError(f"The budget charges per {', '.join(sorted(missing))} but no count was given")
+        return self.base + sum(cost * counts[kind] for kind, cost in self.per_object.items())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by :func:`query_budget` when a block sends more statements than its budget allows."""
+
+    def __init__(self, recorder: QueryRecorder, limit: int) -> None:
+        """Describe the overrun, listing the statements *recorder* saw by call site."""
+        super().__init__(
+            f"{len(recorder.records)} statements sent, but the budget allows {limit}:\n{recorder.format_table()}"
+        )
+        self.recorder: Final = recorder
+        self.limit: Final = limit
+
+
+@contextmanager
+def query_budget(budget: QueryBudget | int, /, **counts: int) -> Generator[QueryRecorder]:
+    """Fail if the block sends more statements than *budget* allows for *counts*.
+
+    Catches N+1 regressions: a comparator that starts querying once per table fails a budget that does not charge per
+    table as soon as a test runs it against a few tables::
+
+        with query_budget(QueryBudget(12), tables=len(metadata.tables)):
+            command.revision(config, autogenerate=True)
+
+    Every statement sent in the block counts, on whichever engine: the migration connection's, the worker and sibling
+    connections :mod:`alembic_pg_autogen.parallel` opens from it, a hot standby's and a shadow database's.  So does any
+    statement another thread of the process sends meanwhile.
+
+    Raises:
+        QueryBudgetExceeded: If the block completes having sent more statements than allowed.
+        ValueError: If *counts* lacks a kind *budget* charges for.
+    """
+    if isinstance(budget, int):
+        budget = QueryBudget(budget)
+    limit = budget.limit(counts)
+    recorder = QueryRecorder()
+    with recorder.recording(Engine):
+        yield recorder
+    if len(recorder.records) > limit:
+        raise QueryBudgetExceeded(recorder, limit)
+    log.debug("%d statements sent, within the budget of %d", len(recorder.records), limit)
+
+
+def _call_site(frame: FrameType | None) -> str:
+    """Name the frame that caused the statement: the innermost one in this package, else the first outside SQLAlchemy."""
+    outside: str | None = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        if not module.startswith(_SKIPPED_MODULES):
+            if module == _PACKAGE or module.startswith(f"{_PACKAGE}."):
+                return f"{module}:{frame.f_code.co_name}"
+            outside = outside or f"{module}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return outside or "?"
+
+
+def _bind_sizes(parameter_sets: Iterable[Any]) -> tuple[int, ...]:
+    sizes: list[int] = []
+    for parameters in parameter_sets:
+        values = list(
+            cast("Mapping[str, object]", parameters).values()
+            if isinstance(parameters, Mapping)
+            else cast("Sequence[object]", parameters or ())
+        )
+        if len(sizes) < len(values):
+            sizes.extend([0] * (len(values) - len(sizes)))
+        for index, value in enumerate(values):
+            sizes[index] += _size(value)
+    return tuple(sizes)
+
+
+def _size(value: object) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in cast("Sequence[object]", value))
+    return len(str(value).encode())
+
+
+def _received_bytes(cursor: Any) -> int | None:
+    """Sum the lengths of the values in psycopg 3's result; other drivers do not expose the raw result."""
+    result = getattr(cursor, "pgresult", None)
+    if result is None:
+        return None
+    return sum(
+        len(result.get_value(row, column) or b"") for row in range(result.ntuples) for column in range(result.nfields)
+    )
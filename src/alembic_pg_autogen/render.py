@@ -4,11 +4,16 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import functools
+from typing import TYPE_CHECKING, TypeVar
 
 from alembic.autogenerate.render import renderers
 
+from alembic_pg_autogen.context import run_context
+from alembic_pg_autogen.ddl import drop_statement, replace_trigger_statement
+from alembic_pg_autogen.observe import observing, phase, run_observers
 from alembic_pg_autogen.ops import (
+    AlterFunctionOp,
     CreateFunctionOp,
     CreateTriggerOp,
     CreateViewOp,
@@ -21,66 +26,112 @@ from alembic_pg_autogen.ops import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Final
+
     from alembic.autogenerate.api import AutogenContext
 
+REPLACE_TRIGGER_VERSION: Final = (14,)
+"""The first PostgreSQL release with ``CREATE OR REPLACE TRIGGER``."""
+
+_Op = TypeVar("_Op")
+_Rendered = TypeVar("_Rendered")
+
+
+def _observed(
+    render: Callable[[AutogenContext, _Op], _Rendered],
+) -> Callable[[AutogenContext, _Op], _Rendered]:
+    """Report each call of *render* to the run's observers as a ``render`` phase."""
+
+    @functools.wraps(render)
+    def wrapper(autogen_context: AutogenContext, op: _Op) -> _Rendered:
+        with observing(run_observers(autogen_context)), phase("render") as counts:
+            counts["ops"] = 1
+            return render(autogen_context, op)
+
+    return wrapper
+
 
 @renderers.dispatch_for(CreateFunctionOp)
+@_observed
 def _render_create_function(_autogen_context: AutogenContext, op: CreateFunctionOp) -> str:
     """Render a CREATE OR REPLACE FUNCTION via op.execute()."""
     return _render_execute(op.desired.definition)
 
 
 @renderers.dispatch_for(ReplaceFunctionOp)
+@_observed
 def _render_replace_function(_autogen_context: AutogenContext, op: ReplaceFunctionOp) -> str:
     """Render a CREATE OR REPLACE FUNCTION (replace) via op.execute()."""
     return _render_execute(op.desired.definition)
 
 
+@renderers.dispatch_for(AlterFunctionOp)
+@_observed
+def _render_alter_function(_autogen_context: AutogenContext, op: AlterFunctionOp) -> str:
+    """Render the ALTER FUNCTION of the changed attributes via op.execute()."""
+    return _render_execute(op.statement)
+
+
 @renderers.dispatch_for(DropFunctionOp)
+@_observed
 def _render_drop_function(_autogen_context: AutogenContext, op: DropFunctionOp) -> str:
     """Render a DROP FUNCTION via op.execute()."""
-    import postgast
-
-    return _render_execute(postgast.to_drop(op.current.definition))
+    return _render_execute(drop_statement(op.current.definition, "function"))
 
 
 @renderers.dispatch_for(CreateTriggerOp)
+@_observed
 def _render_create_trigger(_autogen_context: AutogenContext, op: CreateTriggerOp) -> str:
     """Render a CREATE TRIGGER via op.execute()."""
     return _render_execute(op.desired.definition)
 
 
 @renderers.dispatch_for(ReplaceTriggerOp)
-def _render_replace_trigger(_autogen_context: AutogenContext, op: ReplaceTriggerOp) -> list[str]:
-    """Render DROP TRIGGER + CREATE TRIGGER via two op.execute() calls."""
-    import postgast
+@_observed
+def _render_replace_trigger(autogen_context: AutogenContext, op: ReplaceTriggerOp) -> str | list[str]:
+    """Render a CREATE OR REPLACE TRIGGER, or DROP TRIGGER + CREATE TRIGGER via two op.execute() calls.
 
-    drop = _render_execute(postgast.to_drop(op.current.definition))
+    The single statement swaps the definition atomically, with no moment at which the table has no trigger.  It needs
+    PostgreSQL 14, as the autogenerate connection reports it, and cannot replace a constraint trigger or turn one into a
+    plain trigger, so older servers and constraint triggers keep the pair.
+    """
+    if (
+        autogen_context.connection is not None
+        and run_context(autogen_context).server_version >= REPLACE_TRIGGER_VERSION
+    ):
+        replace = replace_trigger_statement(op.desired.definition)
+        # The current trigger must be replaceable too: neither side of the swap may be a constraint trigger.
+        if replace is not None and replace_trigger_statement(op.current.definition) is not None:
+            return _render_execute(replace)
+    drop = _render_execute(drop_statement(op.current.definition, "trigger"))
     create = _render_execute(op.desired.definition)
     return [drop, create]
 
 
 @renderers.dispatch_for(DropTriggerOp)
+@_observed
 def _render_drop_trigger(_autogen_context: AutogenContext, op: DropTriggerOp) -> str:
     """Render a DROP TRIGGER via op.execute()."""
-    import postgast
-
-    return _render_execute(postgast.to_drop(op.current.definition))
+    return _render_execute(drop_statement(op.current.definition, "trigger"))
 
 
 @renderers.dispatch_for(CreateViewOp)
+@_observed
 def _render_create_view(_autogen_context: AutogenContext, op: CreateViewOp) -> str:
     """Render a CREATE OR REPLACE VIEW via op.execute()."""
     return _render_execute(op.desired.definition)
 
 
 @renderers.dispatch_for(ReplaceViewOp)
+@_observed
 def _render_replace_view(_autogen_context: AutogenContext, op: ReplaceViewOp) -> str:
     """Render a CREATE OR REPLACE VIEW (replace) via op.execute()."""
     return _render_execute(op.desired.definition)
 
 
 @renderers.dispatch_for(DropViewOp)
+@_observed
 def _render_drop_view(_autogen_context: AutogenContext, op: DropViewOp) -> str:
     """Render a DROP VIEW via op.execute()."""
     return _render_execute(f"DROP VIEW {op.current.schema}.{op.current.name}")
@@ -0,0 +1,156 @@
+"""Catalog inspection on a hot standby, so that autogenerate adds no deparsing load to a busy primary.
+
+Inspecting the current state reads and deparses every managed definition, which competes with production traffic for
+the primary's CPU and catalog caches.  A :class:`HotStandby` moves that work to a streaming replica::
+
+    context.configure(
+        ...,
+        pg_replica_url="postgresql+psycopg://replica.internal/myapp",
+        pg_replica_max_lag=5,
+    )
+
+A replica only sees what the primary has committed and it has replayed.  Inspection falls back to the migration
+connection when the replica is further behind than *max_lag* seconds, and whenever the migration transaction has
+written, since no other session can see those writes.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from sqlalchemy import URL, Engine, create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from alembic_pg_autogen.parallel import apply_deparse_settings, deparse_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from typing import Final
+
+    from sqlalchemy import Connection
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_LAG: Final = 10.0
+"""Seconds of replay lag beyond which :meth:`HotStandby.inspecting` falls back to the primary, unless told otherwise."""
+
+_PRIMARY_POSITION: Final = """\
+SELECT txid_current_if_assigned() IS NOT NULL AS written,
+    CASE WHEN NOT pg_is_in_recovery() THEN pg_current_wal_lsn()::text END AS lsn"""
+
+_STANDBY_POSITION: Final = """\
+SELECT pg_is_in_recovery() AS standby,
+    pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn) AS caught_up,
+    extract(epoch FROM clock_timestamp() - pg_last_xact_replay_timestamp())::float8 AS seconds"""
+
+
+def replay_lag(primary: Connection, standby: Connection) -> float | None:
+    """Return how many seconds of the primary's commits *standby* has yet to replay, or *None* if it is no standby.
+
+    A standby that has replayed the primary's current WAL position is not behind at all, however long ago it last
+    replayed a transaction.  Otherwise the lag is the time since the commit it last replayed, which is infinite when it
+    has replayed none since it started.
+    """
+    return _lag_behind(standby, primary.execute(text(_PRIMARY_POSITION)).one().lsn)
+
+
+def _lag_behind(standby: Connection, lsn: str | None) -> float | None:
+    """:func:`replay_lag`, given the primary's current WAL position *lsn*."""
+    if lsn is None:
+        return None
+    row = standby.execute(text(_STANDBY_POSITION), {"lsn": lsn}).one()
+    if not row.standby:
+        return None
+    if row.caught_up:
+        return 0.0
+    return math.inf if row.seconds is None else max(row.seconds, 0.0)
+
+
+class HotStandby:
+    """A streaming replica of the migration database to inspect the current state on.
+
+    :meth:`inspecting` yields a connection to the standby, or the migration connection itself when the standby cannot
+    stand in for it.  The standby connection takes over the migration connection's ``search_path`` and the other
+    settings that change how definitions are deparsed, so both print the same definitions.
+    """
+
+    def __init__(self, standby: Engine | URL | str, *, max_lag: float = DEFAULT_MAX_LAG) -> None:
+        """Describe the standby; nothing connects to it yet.
+
+        Args:
+            standby: The standby, as an engine or a URL.  An engine made from a URL keeps no pooled connections.
+            max_lag: The replay lag, in seconds, beyond which the primary is inspected instead.  DDL committed on the
+                primary within that time may not show yet.
+
+        Raises:
+            ValueError: If *max_lag* is negative.
+        """
+        if max_lag < 0:
+            raise ValueError(f"max_lag must not be negative, got {max_lag}")
+        self.engine: Final = standby if isinstance(standby, Engine) else create_engine(standby, poolclass=NullPool)
+        self.max_lag: Final = max_lag
+
+    @contextmanager
+    def inspecting(self, conn: Connection) -> Generator[Connection]:
+        """Yield the connection to inspect *conn*'s database on: the standby if it is close enough behind, else *conn*.
+
+        The standby connection reads in a single ``REPEATABLE READ`` transaction, so every statement in the block sees
+        the catalog as of one replayed position, and the transaction is rolled back when the block exits.  An
+        unreachable standby is reported as a warning, not an error, and *conn* is yielded instead.
+
+        Args:
+            conn: The migration connection, to the primary.
+        """
+        standby = self._connect(conn)
+        if standby is None:
+            yield conn
+            return
+        with standby:
+            yield standby
+
+    def _connect(self, conn: Connection) -> Connection | None:
+        """Open a standby connection set up like *conn*, or return *None* if *conn* has to be inspected itself."""
+        primary = None if conn.in_nested_transaction() else conn.execute(text(_PRIMARY_POSITION)).one()
+        if primary is None or primary.written:
+            log.info("Inspecting the primary: the migration transaction is in a savepoint or has written")
+            return None
+        settings = deparse_settings(conn)
+        try:
+            standby = self.engine.connect()
+        except DBAPIError as exc:
+            log.warning("Inspecting the primary: cannot connect to the standby: %s", exc)
+            return None
+        try:
+            # Replay continues underneath the session; the snapshot taken by the lag check below is the one it then
+            # reads.  ``SET TRANSACTION`` rather than the ``isolation_level`` option, as for parallel inspection.
+            standby.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+            lag = _lag_behind(standby, primary.lsn)
+            if lag is None or lag > self.max_lag:
+                standby.close()
+                if lag is None:
+                    log.warning("Inspecting the primary: %s is not a hot standby", self.engine.url.database)
+                else:
+                    log.info("Inspecting the primary: the standby is %.1fs behind, over %.1fs", lag, self.max_lag)
+                return None
+            apply_deparse_settings(standby, settings)
+        except DBAPIError as exc:
+            # A recovery conflict or a canceled statement, say: the standby is given up on like an unreachable one.
+            standby.close()
+            log.warning("Inspecting the primary: cannot set up the standby session: %s", exc)
+            return None
+        log.debug("Inspecting the standby, %.1fs behind", lag)
+        return standby
+
+
+def resolve_hot_standby(option: str | URL | Engine | HotStandby | None, max_lag: float | None) -> HotStandby | None:
+    """Turn the ``pg_replica_url`` and ``pg_replica_max_lag`` options into a :class:`HotStandby`.
+
+    ``pg_replica_max_lag`` applies only when ``pg_replica_url`` is not already a :class:`HotStandby`.
+    """
+    if option is None or isinstance(option, HotStandby):
+        return option
+    return HotStandby(option, max_lag=DEFAULT_MAX_LAG if max_lag is None else max_lag)
@@ -0,0 +1,169 @@
+"""A scratch database that declared DDL is canonicalized in, so the migration connection is only ever read from.
+
+:func:`~alembic_pg_autogen.canonicalize.canonicalize` executes every declared statement inside a savepoint.  On the
+migration connection that takes locks on the production catalog, leaves dead ``pg_proc`` and ``pg_trigger`` rows
+behind, and fails for a trigger whose table only the revision being generated creates.  A :class:`ShadowDatabase`
+moves that work to a separate, disposable database, which each run prepares from the target metadata::
+
+    context.configure(
+        ...,
+        pg_shadow_url="postgresql+psycopg://localhost/myapp_shadow",
+        pg_shadow_template="myapp_shadow_template",
+    )
+
+Objects the declared DDL depends on but the metadata does not describe, such as extensions, domains, or tables
+managed outside SQLAlchemy, belong in the template database.
+"""
+
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from sqlalchemy import URL, Engine, create_engine, text
+from sqlalchemy.pool import NullPool
+
+from alembic_pg_autogen.parallel import apply_deparse_settings, deparse_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Sequence
+    from typing import Final
+
+    from sqlalchemy import Connection, MetaData
+
+log = logging.getLogger(__name__)
+
+MAINTENANCE_DATABASE: Final = "postgres"
+"""The database :meth:`ShadowDatabase.reset` connects to while it drops and recreates the shadow database."""
+
+_IDENTITY: Final = """\
+SELECT (SELECT system_identifier FROM pg_control_system()) AS system_identifier, current_database() AS database"""
+"""Identifies a database however the URL reaching it is spelled: the cluster's unique identifier and the real name."""
+
+_SERVER_FACTS: Final = """\
+SELECT (SELECT system_identifier FROM pg_control_system()) AS system_identifier,
+    current_database() AS database,
+    current_setting('server_encoding') AS encoding,
+    current_setting('server_version_num')::integer / 10000 AS major_version,
+    ARRAY(
+        SELECT nspname FROM pg_namespace
+        WHERE nspname !~ '^pg_' AND nspname <> 'information_schema'
+        ORDER BY nspname
+    ) AS schemas"""
+
+
+class ShadowDatabase:
+    """A scratch PostgreSQL database to canonicalize declared DDL in instead of the migration database.
+
+    :meth:`prepared` yields a connection to it on which the schemas of the migration database and the tables of the
+    target metadata exist, and rolls everything back afterwards, so the shadow database is left as it was found.  With a
+    *template*, the shadow database is first dropped and recreated from it with ``CREATE DATABASE ... TEMPLATE``.
+
+    The shadow database must use the migration database's encoding, so that definition digests compare equal, and
+    should run the same major version, since that decides how definitions are deparsed.
+    """
+
+    def __init__(self, shadow: Engine | URL | str, *, template: str | None = None) -> None:
+        """Describe the shadow database; nothing connects to it yet.
+
+        Args:
+            shadow: The shadow database, as an engine or a URL.  An engine made from a URL keeps no pooled connections.
+            template: A database to recreate the shadow database from before each use.  Recreating it needs the
+                ``CREATEDB`` privilege, and drops every other session connected to the shadow database.
+        """
+        self.engine: Final = shadow if isinstance(shadow, Engine) else create_engine(shadow, poolclass=NullPool)
+        self.template: Final = template
+
+    def reset(self, conn: Connection) -> None:
+        """Drop the shadow database and create it afresh from :attr:`template`.
+
+        Before anything is dropped, the server the maintenance connection reaches is compared with *conn*'s by its
+        ``system_identifier``, so no spelling of the URL — ``localhost`` for ``127.0.0.1``, a default port left out, a
+        DNS alias — can make the shadow database name the migration database.
+
+        Args:
+            conn: A connection to the migration database, which must not be dropped.
+
+        Raises:
+            ValueError: If no template was given, or if the shadow database is the migration database.
+        """
+        if self.template is None:
+            raise ValueError("A shadow database without a template cannot be reset")
+        database = self.engine.url.database
+        if database is None:
+            raise ValueError("The shadow database URL names no database")
+        live = conn.execute(text(_IDENTITY)).one()
+        # Connections pooled by a caller's engine would keep the database from being dropped.
+        self.engine.dispose()
+        maintenance = create_engine(
+            self.engine.url.set(database=MAINTENANCE_DATABASE), isolation_level="AUTOCOMMIT", poolclass=NullPool
+        )
+        with maintenance.connect() as server:
+            if (server.execute(text(_IDENTITY)).one().system_identifier, database) == tuple(live):
+                raise ValueError(f"Refusing to drop the shadow database {database}: it is the migration database")
+            preparer = server.dialect.identifier_preparer
+            server.execute(text(f"DROP DATABASE IF EXISTS {preparer.quote(database)} WITH (FORCE)"))
+            server.execute(text(f"CREATE DATABASE {preparer.quote(database)} TEMPLATE {preparer.quote(self.template)}"))
+        log.info("Recreated the shadow database %s from %s", database, self.template)
+
+    @contextmanager
+    def prepared(
+        self, conn: Connection, metadata: MetaData | Sequence[MetaData] | None = None
+    ) -> Generator[Connection]:
+        """Yield a connection to the shadow database, set up to deparse definitions as *conn* would.
+
+        *conn* is only read from: the schemas it holds, its server encoding, and the settings that change how
+        definitions are deparsed, which the shadow connection takes over.  The shadow connection then creates the
+        missing schemas and the tables of *metadata* in a transaction that is rolled back when the block exits.
+
+        Args:
+            conn: A connection to the migration database.
+            metadata: The target metadata, as Alembic's ``target_metadata`` accepts it.
+
+        Raises:
+            ValueError: If the shadow database is the migration database itself, or uses another encoding.
+        """
+        live = conn.execute(text(_SERVER_FACTS)).one()
+        settings = deparse_settings(conn)
+        url = self.engine.url
+        if self.template is not None:
+            self.reset(conn)
+
+        with self.engine.connect() as shadow:
+            scratch = shadow.execute(text(_SERVER_FACTS)).one()
+            # Compared by what the server reports, since a pooler or an alias can route any URL to the live database.
+            if (scratch.system_identifier, scratch.database) == (live.system_identifier, live.database):
+                raise ValueError(f"The shadow database {live.database} is the migration database")
+            if scratch.encoding != live.encoding:
+                raise ValueError(
+                    f"The shadow database's encoding {scratch.encoding} differs from the migration database's"
+                    f" {live.encoding}, so their definition digests would never match"
+                )
+            if scratch.major_version != live.major_version:
+                log.warning(
+                    "The shadow database runs PostgreSQL %d but the migration database %d; definitions may deparse "
+                    "differently and show up as changes",
+                    scratch.major_version,
+                    live.major_version,
+                )
+            apply_deparse_settings(shadow, settings)
+            preparer = shadow.dialect.identifier_preparer
+            for schema in sorted(set(live.schemas) - set(scratch.schemas)):
+                shadow.execute(text(f"CREATE SCHEMA {preparer.quote_schema(schema)}"))
+            for target in _metadata_list(metadata):
+                for schema in {table.schema for table in target.tables.values() if table.schema} - set(live.schemas):
+                    shadow.execute(text(f"CREATE SCHEMA IF NOT EXISTS {preparer.quote_schema(schema)}"))
+                target.create_all(shadow)
+            log.debug("Prepared the shadow database %s", url.database)
+            # Leaving the block without committing rolls back everything created above.
+            yield shadow
+
+
+def _metadata_list(metadata: MetaData | Sequence[MetaData] | None) -> Sequence[MetaData]:
+    """Normalize Alembic's ``target_metadata``, which may be one collection, several, or none."""
+    if metadata is None:
+        return ()
+    if isinstance(metadata, (list, tuple)):
+        return metadata
+    return (metadata,)  # pyright: ignore[reportReturnType]
@@ -0,0 +1,128 @@
+"""Tests for the asyncio counterparts of inspection, canonicalization and diffing."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic_pg_autogen import Action, aio, inspect_catalog
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Generator
+    from typing import TypeVar
+
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    _T = TypeVar("_T")
+
+SCHEMA = "aio_test"
+
+
+@pytest.fixture
+def aio_schema(pg_engine: Engine) -> Generator[str]:
+    """A committed schema with two functions and a view, so that every connection sees them; dropped afterwards."""
+    with pg_engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"CREATE FUNCTION {SCHEMA}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 41 $$"))
+        conn.execute(text(f"CREATE FUNCTION {SCHEMA}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$"))
+        conn.execute(text(f"CREATE VIEW {SCHEMA}.one AS SELECT 1 AS one"))
+    yield SCHEMA
+    with pg_engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+def _run(pg_engine: Engine, test: Callable[[AsyncEngine], Awaitable[_T]]) -> _T:
+    """Run *test* against an async engine on the same database as *pg_engine*."""
+
+    async def run() -> _T:
+        engine = create_async_engine(pg_engine.url.set(drivername="postgresql+psycopg_async"))
+        try:
+            return await test(engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.integration
+class TestAioIntegration:
+    def test_inspect_catalog_matches_sync(self, pg_engine: Engine, aio_schema: str):
+        async def test(engine: AsyncEngine):
+            async with engine.connect() as conn:
+                return await aio.inspect_catalog(conn, [aio_schema])
+
+        with pg_engine.connect() as conn:
+            expected = inspect_catalog(conn, [aio_schema])
+
+        assert _run(pg_engine, test) == expected
+
+    def test_inspect_catalog_shards_match_sync(self, pg_engine: Engine, aio_schema: str):
+        async def test(engine: AsyncEngine):
+            async with engine.connect() as conn:
+                return [await aio.inspect_catalog(conn, [aio_schema], shard=(index, 2)) for index in range(2)]
+
+        with pg_engine.connect() as conn:
+            expected = [inspect_catalog(conn, [aio_schema], shard=(index, 2)) for index in range(2)]
+
+        assert _run(pg_engine, test) == expected
+
+    def test_inspection_does_not_block_other_connections(self, pg_engine: Engine, aio_schema: str):
+        async def test(engine: AsyncEngine):
+            async with engine.connect() as sleeper, engine.connect() as inspector:
+                started = time.perf_counter()
+                sleep = asyncio.ensure_future(sleeper.execute(text("SELECT pg_sleep(0.5)")))
+                await asyncio.sleep(0.05)
+                state = await aio.inspect_catalog(inspector, [aio_schema])
+                inspected = time.perf_counter() - started
+                await sleep
+                return state, inspected
+
+        state, inspected = _run(pg_engine, test)
+
+        assert len(state.functions) == 2
+        assert inspected < 0.5, "inspection waited for the other connection's statement"
+
+    @pytest.mark.parametrize("second_connection", [False, True], ids=["one_connection", "two_connections"])
+    def test_diff_database(self, pg_engine: Engine, aio_schema: str, second_connection: bool):
+        async def test(engine: AsyncEngine):
+            async with engine.connect() as conn, engine.connect() as scratch:
+                return await aio.diff_database(
+                    conn,
+                    function_ddl=[
+                        f"CREATE FUNCTION {aio_schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 42 $$"
+                    ],
+                    view_ddl=[f"CREATE VIEW {aio_schema}.one AS SELECT 1 AS one"],
+                    schemas=[aio_schema],
+                    canonicalize_conn=scratch if second_connection else None,
+                )
+
+        result = _run(pg_engine, test)
+
+        functions = {(op.action, op.current.name if op.current else None) for op in result.function_ops}
+        assert functions == {(Action.REPLACE, "answer"), (Action.DROP, "stale")}
+        assert not result.view_ops
+        assert not result.trigger_ops
+
+    def test_canonicalize_leaves_the_database_unchanged(self, pg_engine: Engine, aio_schema: str):
+        async def test(engine: AsyncEngine):
+            async with engine.connect() as conn:
+                state = await aio.canonicalize(
+                    conn,
+                    function_ddl=[
+                        f"CREATE FUNCTION {aio_schema}.added() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$"
+                    ],
+                    schemas=[aio_schema],
+                    declared_only=True,
+                )
+                return state, await aio.inspect_functions(conn, [aio_schema])
+
+        state, functions = _run(pg_engine, test)
+
+        assert [function.name for function in state.functions] == ["added"]
+        assert sorted(function.name for function in functions) == ["answer", "stale"]
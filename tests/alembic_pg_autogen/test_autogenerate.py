@@ -7,12 +7,25 @@ import re
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import postgast
 import pytest
 from alembic.command import revision
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 
-from alembic_pg_autogen import IGNORED
+from alembic_pg_autogen import (
+    IGNORED,
+    CanonicalizationCache,
+    SnapshotCache,
+    install_change_counter,
+    uninstall_change_counter,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from sqlalchemy.engine import Engine
+
     from .alembic_helpers import AlembicProject
 
 
@@ -199,6 +212,217 @@ LANGUAGE sql AS $$ $$"""
         assert "op.execute(" not in upgrade_match.group(0)
 
 
+@pytest.mark.integration
+class TestAutogenerateLazyDefinitions:
+    """The current state is compared by digest, but every rendered definition is the full DDL."""
+
+    def test_replace_downgrade_restores_the_full_original(self, alembic_project: AlembicProject):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE VIEW {schema}.report AS SELECT 'before'::text AS label")
+        alembic_project.execute(f"CREATE VIEW {schema}.untouched AS SELECT 'same'::text AS label")
+
+        content = _autogenerate(
+            alembic_project,
+            pg_views=[
+                f"CREATE VIEW {schema}.report AS SELECT 'after'::text AS label",
+                f"CREATE VIEW {schema}.untouched AS SELECT 'same'::text AS label",
+            ],
+        )
+
+        downgrade = content[content.index("def downgrade()") :]
+        assert "'before'::text" in downgrade
+        assert "untouched" not in content
+
+    def test_drop_downgrade_recreates_the_full_original(self, alembic_project: AlembicProject):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.obsolete() RETURNS text LANGUAGE sql AS $$ SELECT 'x' $$")
+
+        content = _autogenerate(alembic_project, pg_functions=[])
+
+        downgrade = content[content.index("def downgrade()") :]
+        assert "CREATE OR REPLACE FUNCTION" in downgrade
+        assert "SELECT 'x'" in downgrade
+
+
+@pytest.mark.integration
+class TestAutogenerateCanonicalizationCache:
+    """``pg_canonicalize_cache`` serves canonical forms from disk without changing the generated migration."""
+
+    def test_cached_run_matches_uncached_run(self, alembic_project: AlembicProject, tmp_path: Path):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.greet() RETURNS text LANGUAGE sql AS $$ SELECT 'hello' $$")
+        alembic_project.execute(
+            f"CREATE FUNCTION {schema}.greet(name text) RETURNS text LANGUAGE sql AS $$ SELECT name $$"
+        )
+        pg_functions = [f"CREATE FUNCTION {schema}.greet() RETURNS text LANGUAGE sql AS $$ SELECT 'goodbye' $$"]
+        cache_path = tmp_path / "canonical.db"
+
+        uncached = _autogenerate(alembic_project, pg_functions=pg_functions)
+        script_dir = Path(alembic_project.config.get_main_option("script_location"))  # pyright: ignore[reportArgumentType]
+        for migration in (script_dir / "versions").glob("*.py"):
+            migration.unlink()
+        cached = _autogenerate(alembic_project, pg_functions=pg_functions, pg_canonicalize_cache=cache_path)
+
+        assert len(CanonicalizationCache(cache_path)) == 1
+        assert _body(cached) == _body(uncached)
+        assert "goodbye" in cached
+        assert "DROP FUNCTION" not in cached, "the undeclared overload must be kept"
+
+
+class _InspectCounts:
+    """An observer keeping the counts of every ``inspect`` phase."""
+
+    def __init__(self) -> None:
+        self.counts: list[dict[str, int]] = []
+
+    def phase_started(self, _phase: str) -> None:
+        pass
+
+    def phase_finished(self, phase: str, _seconds: float, counts: Mapping[str, int]) -> None:
+        if phase == "inspect":
+            self.counts.append(dict(counts))
+
+
+@pytest.fixture
+def change_counter(pg_engine: Engine) -> Generator[str]:
+    """Install the catalog change counter for the test, returning its schema.  Event triggers are database-wide."""
+    schema = "test_snapshot_counter"
+    with pg_engine.begin() as conn:
+        install_change_counter(conn, schema=schema)
+    try:
+        yield schema
+    finally:
+        with pg_engine.begin() as conn:
+            uninstall_change_counter(conn, schema=schema)
+
+
+@pytest.mark.integration
+class TestAutogenerateSnapshotCache:
+    """``pg_snapshot_cache`` reuses the inspected catalog while the change counter shows it unchanged."""
+
+    def test_unchanged_catalog_is_served_from_the_cache(
+        self, alembic_project: AlembicProject, tmp_path: Path, change_counter: str, caplog: pytest.LogCaptureFixture
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.greet() RETURNS text LANGUAGE sql AS $$ SELECT 'hello' $$")
+        pg_functions = [f"CREATE FUNCTION {schema}.greet() RETURNS text LANGUAGE sql AS $$ SELECT 'goodbye' $$"]
+        cache = SnapshotCache(tmp_path / "snapshots.db", counter_schema=change_counter)
+        observer = _InspectCounts()
+        runs: list[str] = []
+        script_dir = Path(alembic_project.config.get_main_option("script_location"))  # pyright: ignore[reportArgumentType]
+
+        def run() -> None:
+            for migration in (script_dir / "versions").glob("*.py"):
+                migration.unlink()
+            runs.append(
+                _body(
+                    _autogenerate(
+                        alembic_project, pg_functions=pg_functions, pg_snapshot_cache=cache, pg_observers=[observer]
+                    )
+                )
+            )
+
+        run()
+        with caplog.at_level(logging.INFO, logger="alembic_pg_autogen.compare"):
+            run()
+        alembic_project.execute(f"CREATE FUNCTION {schema}.extra() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$")
+        run()
+
+        assert [counts["cached"] for counts in observer.counts] == [0, 1, 0]
+        assert runs[0] == runs[1]
+        assert "greet" in runs[0]
+        assert "DROP FUNCTION" in runs[2] and "extra" in runs[2], "the new function is seen once the catalog changed"
+        assert any("snapshot cache" in record.getMessage() for record in caplog.records)
+
+    def test_changed_search_path_is_not_served_from_the_cache(
+        self, alembic_project: AlembicProject, pg_engine: Engine, tmp_path: Path, change_counter: str
+    ):
+        """A view's deparsed definition qualifies only the names its session's ``search_path`` does not resolve."""
+        schema = alembic_project.schema
+        other = f"{schema}_other"
+        alembic_project.execute(f"CREATE SCHEMA {other}; CREATE TABLE {other}.t (a integer)")
+        view = f"CREATE VIEW {schema}.v AS SELECT a FROM {other}.t"
+        alembic_project.execute(view)
+        cache = SnapshotCache(tmp_path / "snapshots.db", counter_schema=change_counter)
+        observer = _InspectCounts()
+        script_dir = Path(alembic_project.config.get_main_option("script_location"))  # pyright: ignore[reportArgumentType]
+        runs: list[str] = []
+        try:
+            for search_path in (schema, f"{schema},{other}"):
+                for migration in (script_dir / "versions").glob("*.py"):
+                    migration.unlink()
+                engine = create_engine(
+                    pg_engine.url, connect_args={"options": f"-csearch_path={search_path}"}, poolclass=NullPool
+                )
+                try:
+                    content = _autogenerate(
+                        alembic_project,
+                        connection=engine,
+                        pg_views=[view],
+                        pg_snapshot_cache=cache,
+                        pg_observers=[observer],
+                    )
+                finally:
+                    engine.dispose()
+                runs.append(_body(content))
+        finally:
+            alembic_project.execute(f"DROP SCHEMA {other} CASCADE")
+
+        assert ["op.execute(" in run for run in runs] == [False, False], "no spurious CREATE OR REPLACE VIEW"
+        assert [counts["cached"] for counts in observer.counts] == [0, 0]
+
+    def test_without_the_counter_the_catalog_is_inspected(
+        self, alembic_project: AlembicProject, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ):
+        cache = SnapshotCache(tmp_path / "snapshots.db", counter_schema="no_such_counter")
+        observer = _InspectCounts()
+
+        with caplog.at_level(logging.WARNING, logger="alembic_pg_autogen.compare"):
+            _autogenerate(alembic_project, pg_functions=[], pg_snapshot_cache=cache, pg_observers=[observer])
+
+        assert observer.counts[0]["cached"] == 0
+        assert len(cache) == 0
+        assert "change counter is not installed" in caplog.text
+
+
+@pytest.mark.integration
+class TestAutogenerateParsesOnce:
+    """Each declared statement is parsed once and the parse is reused by every later stage."""
+
+    @pytest.mark.parametrize("cached", [False, True])
+    def test_each_declared_statement_is_parsed_once(
+        self, alembic_project: AlembicProject, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, cached: bool
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE TABLE {schema}.orders (id int)")
+        pg_functions = [
+            f"CREATE FUNCTION {schema}.audit() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$"
+        ]
+        pg_views = [f"CREATE VIEW {schema}.order_ids AS SELECT id FROM {schema}.orders"]
+        pg_triggers = [
+            f"CREATE TRIGGER audit_trg AFTER INSERT ON {schema}.orders FOR EACH ROW EXECUTE FUNCTION {schema}.audit()"
+        ]
+        parsed: list[str] = []
+        parse = postgast.parse
+
+        def counting_parse(query: str) -> object:
+            parsed.append(query)
+            return parse(query)
+
+        monkeypatch.setattr(postgast, "parse", counting_parse)
+        options: dict[str, object] = {"pg_canonicalize_cache": tmp_path / "canonical.db"} if cached else {}
+
+        _autogenerate(alembic_project, pg_functions=pg_functions, pg_views=pg_views, pg_triggers=pg_triggers, **options)
+
+        for ddl in (*pg_functions, *pg_views, *pg_triggers):
+            assert parsed.count(ddl) == 1, ddl
+
+
+def _body(content: str) -> str:
+    """Strip the revision header, which differs between two otherwise identical migrations."""
+    return content[content.index("def upgrade()") :]
+
+
 @pytest.mark.integration
 class TestAutogenerateEmptyConfig:
     """5.7 — No errors when pg_functions/pg_triggers absent."""
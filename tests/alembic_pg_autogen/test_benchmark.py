@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import postgast
+import pytest
+from sqlalchemy import text
+
+from alembic_pg_autogen.benchmark import (
+    EXTRACTIONS,
+    PHASES,
+    SNAPSHOTS,
+    BenchmarkResult,
+    PhaseTiming,
+    Regression,
+    SchemaSpec,
+    SnapshotMemory,
+    compare_results,
+    format_memory_table,
+    format_table,
+    generate_schema,
+    measure_memory,
+    run_benchmark,
+    run_extraction_benchmark,
+)
+from alembic_pg_autogen.benchmark.__main__ import main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from sqlalchemy.engine import Engine
+
+SMALL = SchemaSpec(
+    schemas=1, functions=3, overloads=2, tables=2, partitions=2, triggers=1, view_layers=2, views=2, check_constraints=2
+)
+
+
+def _result(**medians: float) -> BenchmarkResult:
+    return BenchmarkResult(SMALL, {}, "16.0", tuple(PhaseTiming(phase, (value,)) for phase, value in medians.items()))
+
+
+class TestGenerateSchema:
+    def test_counts_follow_the_spec(self):
+        generated = generate_schema(SMALL)
+
+        assert dict(generated.counts) == {
+            "schemas": 1,
+            "functions": 3 * 2 + 2 * 1,  # overloads, plus one trigger function per trigger
+            "triggers": 2,
+            "views": 2 * 2,
+            "tables": 2,
+            "check_constraints": 2 * 2,
+        }
+
+    def test_output_is_deterministic(self):
+        first, second = generate_schema(SMALL), generate_schema(SMALL)
+
+        assert first.setup == second.setup
+        assert first.function_ddl == second.function_ddl
+
+    def test_every_statement_parses(self):
+        generated = generate_schema(SMALL._replace(extension_noise=2))
+
+        for statement in (*generated.setup, *generated.function_ddl, *generated.trigger_ddl, *generated.view_ddl):
+            postgast.parse(statement)
+
+    def test_change_every_controls_how_much_differs(self):
+        unchanged = generate_schema(SMALL._replace(change_every=0))
+        changed = generate_schema(SMALL._replace(change_every=1))
+
+        assert set(unchanged.function_ddl) <= set(unchanged.setup)
+        assert not set(changed.view_ddl) & set(changed.setup)
+
+    def test_extension_noise_is_attached_to_an_extension(self):
+        generated = generate_schema(SMALL._replace(extension_noise=3))
+
+        assert sum(statement.startswith("ALTER EXTENSION") for statement in generated.setup) == 6
+
+
+class TestBenchmarkResultJson:
+    def test_round_trip(self):
+        result = _result(parse=0.5, diff=0.25)
+
+        assert BenchmarkResult.from_json(json.loads(json.dumps(result.to_json()))) == result
+
+    def test_unknown_format_rejected(self):
+        data = _result(parse=0.5).to_json() | {"format": 99}
+
+        with pytest.raises(ValueError, match="format"):
+            BenchmarkResult.from_json(data)
+
+
+class TestCompareResults:
+    def test_slowdown_beyond_tolerance_is_a_regression(self):
+        regressions = compare_results(_result(parse=1.5, diff=1.1), _result(parse=1.0, diff=1.0), tolerance=0.25)
+
+        assert regressions == [Regression("parse", 1.0, 1.5)]
+        assert regressions[0].ratio == 1.5
+
+    def test_noise_below_the_floor_is_ignored(self):
+        assert compare_results(_result(diff=0.003), _result(diff=0.001), floor=0.005) == []
+
+    def test_phases_missing_from_the_baseline_are_skipped(self):
+        assert compare_results(_result(render=9.0), _result(parse=1.0)) == []
+
+    def test_table_marks_regressions(self):
+        result = _result(parse=1.5, diff=1.0)
+
+        table = format_table(result, [Regression("parse", 1.0, 1.5)])
+
+        assert "REGRESSION x1.50" in table
+        assert table.count("REGRESSION") == 1
+
+
+class TestSnapshotMemory:
+    def test_per_record(self):
+        assert SnapshotMemory("current", 4, 1000).per_record == 250
+        assert SnapshotMemory("current", 0, 0).per_record == 0
+
+    def test_table_lists_every_snapshot(self):
+        table = format_memory_table([SnapshotMemory("current", 4, 1000), SnapshotMemory("desired", 2, 100)])
+
+        assert table.splitlines()[1].split() == ["current", "4", "1000", "250.0"]
+        assert len(table.splitlines()) == 3
+
+
+@pytest.mark.integration
+class TestRunBenchmarkIntegration:
+    def test_every_phase_is_timed_and_the_database_left_untouched(self, pg_engine: Engine):
+        with pg_engine.connect() as conn:
+            result = run_benchmark(conn, SMALL._replace(extension_noise=1), repeat=2)
+            leftover = conn.execute(text("SELECT count(*) FROM pg_namespace WHERE nspname LIKE 'bench\\_%'")).scalar()
+
+        assert [timing.phase for timing in result.phases] == list(PHASES)
+        assert all(len(timing.seconds) == 2 for timing in result.phases)
+        assert leftover == 0
+
+    def test_runs_inside_an_open_transaction(self, pg_engine: Engine):
+        with pg_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            run_benchmark(conn, SMALL, repeat=1)
+            assert conn.in_transaction()
+
+    def test_memory_of_each_snapshot(self, pg_engine: Engine):
+        with pg_engine.connect() as conn:
+            usage = {snapshot.snapshot: snapshot for snapshot in measure_memory(conn, SMALL)}
+            leftover = conn.execute(text("SELECT count(*) FROM pg_namespace WHERE nspname LIKE 'bench\\_%'")).scalar()
+
+        assert list(usage) == list(SNAPSHOTS)
+        assert usage["current"].records == usage["current_uninterned"].records > 0
+        assert usage["current"].bytes < usage["current_uninterned"].bytes, "interned identifiers are shared"
+        assert usage["current_digests"].bytes < usage["current"].bytes
+        assert leftover == 0
+
+    def test_every_extraction_is_timed(self, pg_engine: Engine):
+        with pg_engine.connect() as conn:
+            result = run_extraction_benchmark(conn, SMALL, repeat=2)
+            leftover = conn.execute(text("SELECT count(*) FROM pg_namespace WHERE nspname LIKE 'bench\\_%'")).scalar()
+
+        assert [timing.phase for timing in result.phases] == list(EXTRACTIONS)
+        assert all(len(timing.seconds) == 2 for timing in result.phases)
+        assert leftover == 0
+
+    def test_command_line_extraction(self, pg_engine: Engine, capsys: pytest.CaptureFixture[str]):
+        url = pg_engine.url.render_as_string(hide_password=False)
+        sizes = [f"--{field.replace('_', '-')}={value}" for field, value in SMALL._asdict().items()]
+
+        assert main(["--url", url, "--repeat", "1", "--extraction", *sizes]) == 0
+        assert "extract_copy_binary" in capsys.readouterr().out
+
+    def test_command_line_writes_results_and_fails_on_regression(
+        self, pg_engine: Engine, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ):
+        url = pg_engine.url.render_as_string(hide_password=False)
+        sizes = [f"--{field.replace('_', '-')}={value}" for field, value in SMALL._asdict().items()]
+        output = tmp_path / "results.json"
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(_result(**dict.fromkeys(PHASES, 0.0)).to_json()))
+
+        queries = tmp_path / "queries.json"
+
+        assert main(["--url", url, "--repeat", "1", "--output", str(output), "--queries", str(queries), *sizes]) == 0
+        assert BenchmarkResult.from_json(json.loads(output.read_text())).spec == SMALL
+        assert json.loads(queries.read_text())["statements"] > 0
+        assert main(["--url", url, "--repeat", "1", "--baseline", str(baseline), "--memory", *sizes]) == 1
+        out = capsys.readouterr().out
+        assert "REGRESSION" in out
+        assert "current_uninterned" in out
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from alembic_pg_autogen import (
+    CanonicalizationCache,
+    CanonicalState,
+    CatalogVersion,
+    FunctionInfo,
+    SnapshotCache,
+    ViewInfo,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _key(
+    ddl: str,
+    kind: str = "function",
+    *,
+    server_version_num: str = "160004",
+    search_path: str = "public",
+    catalog: CatalogVersion | None = None,
+) -> str:
+    return CanonicalizationCache.key(
+        kind, ddl, server_version_num=server_version_num, search_path=search_path, catalog=catalog
+    )
+
+
+def _fill(path: str, worker: int, count: int) -> None:
+    """Store *count* entries from a separate process."""
+    cache = CanonicalizationCache(path)
+    for index in range(count):
+        cache.put_many({f"{worker}-{index}": ["public", f"f{worker}_{index}", "", "def"]})
+
+
+class TestCacheKey:
+    def test_is_stable(self):
+        assert _key("CREATE OR REPLACE FUNCTION f()") == _key("CREATE OR REPLACE FUNCTION f()")
+
+    def test_server_context_is_part_of_the_key(self):
+        ddl = "CREATE OR REPLACE FUNCTION f()"
+
+        assert _key(ddl) != _key(ddl, server_version_num="170000")
+        assert _key(ddl) != _key(ddl, search_path="app,public")
+
+    def test_kind_is_part_of_the_key(self):
+        ddl = "CREATE OR REPLACE VIEW v AS SELECT 1"
+
+        assert _key(ddl, "view") != _key(ddl, "trigger")
+
+    def test_catalog_version_is_part_of_the_key(self):
+        ddl = "CREATE OR REPLACE VIEW v AS SELECT * FROM t"
+
+        def key(counter: int) -> str:
+            return _key(ddl, "view", catalog=CatalogVersion("app", "160004", counter))
+
+        assert key(7) == key(7)
+        assert key(7) != key(8)
+        assert key(7) != _key(ddl, "view")
+
+
+class TestCanonicalizationCache:
+    def test_round_trip(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+
+        cache.put_many({"k1": ["public", "f", "", "def"]})
+
+        assert cache.get_many(["k1", "k2"]) == {"k1": ["public", "f", "", "def"]}
+        assert len(cache) == 1
+
+    def test_entries_persist_across_instances(self, tmp_path: Path):
+        CanonicalizationCache(tmp_path / "cache.db").put_many({"k": ["v"]})
+
+        assert CanonicalizationCache(tmp_path / "cache.db").get_many(["k"]) == {"k": ["v"]}
+
+    def test_missing_parent_directories_are_created(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "nested" / "dir" / "cache.db")
+
+        assert cache.path.exists()
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db", max_entries=2)
+        cache.put_many({"old": ["1"]})
+        cache.put_many({"touched": ["2"]})
+        cache.get_many(["old"])
+
+        cache.put_many({"new": ["3"]})
+
+        assert set(cache.get_many(["old", "touched", "new"])) == {"old", "new"}
+        assert len(cache) == 2
+
+    def test_lookups_beyond_the_bind_variable_limit(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        cache.put_many({str(index): [str(index)] for index in range(1_200)})
+
+        assert len(cache.get_many([str(index) for index in range(1_500)])) == 1_200
+
+    def test_clear(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        cache.put_many({"k": ["v"]})
+
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_max_entries_must_be_positive(self, tmp_path: Path):
+        with pytest.raises(ValueError, match="max_entries"):
+            CanonicalizationCache(tmp_path / "cache.db", max_entries=0)
+
+    def test_concurrent_processes_share_one_file(self, tmp_path: Path):
+        path = str(tmp_path / "cache.db")
+        CanonicalizationCache(path)
+
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            for future in [pool.submit(_fill, path, worker, 25) for worker in range(4)]:
+                future.result()
+
+        assert len(CanonicalizationCache(path)) == 100
+
+
+VERSION = CatalogVersion("app", "160004", 7)
+STATE = CanonicalState(
+    functions=[FunctionInfo("public", "f", "", "d41d8cd98f00b204e9800998ecf8427e")],
+    triggers=[],
+    views=[ViewInfo("public", "v", "CREATE OR REPLACE VIEW public.v AS SELECT 1")],
+)
+
+
+class TestSnapshotCache:
+    def test_round_trip(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+
+        cache.put(VERSION, ["public"], STATE, digests=True)
+        loaded = cache.get(VERSION, ["public"], digests=True)
+
+        assert loaded == STATE
+        assert loaded is not None
+        assert all(isinstance(record, FunctionInfo) for record in loaded.functions)
+        assert len(cache) == 1
+
+    def test_changed_catalog_misses(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        cache.put(VERSION, ["public"], STATE)
+
+        assert cache.get(VERSION._replace(counter=8), ["public"]) is None
+
+    @pytest.mark.parametrize(
+        "lookup",
+        [
+            pytest.param({"schemas": ["app"]}, id="schemas"),
+            pytest.param({"schemas": None}, id="all-schemas"),
+            pytest.param({"schemas": ["public"], "views": False}, id="shape"),
+            pytest.param({"schemas": ["public"], "version": VERSION._replace(database="other")}, id="database"),
+            pytest.param({"schemas": ["public"], "settings": {"search_path": "app, public"}}, id="settings"),
+        ],
+    )
+    def test_snapshots_are_kept_apart(self, tmp_path: Path, lookup: dict[str, Any]):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        cache.put(VERSION, ["public"], STATE)
+
+        version = lookup.pop("version", VERSION)
+        schemas = lookup.pop("schemas")
+
+        assert cache.get(version, schemas, **lookup) is None
+
+    def test_same_settings_hit(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        cache.put(VERSION, ["public"], STATE, settings={"search_path": "public", "DateStyle": "ISO, MDY"})
+
+        assert cache.get(VERSION, ["public"], settings={"DateStyle": "ISO, MDY", "search_path": "public"}) == STATE
+
+    def test_schema_order_does_not_matter(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        cache.put(VERSION, ["public", "app"], STATE)
+
+        assert cache.get(VERSION, ["app", "public"]) == STATE
+
+    def test_newer_snapshot_replaces_older(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        newer = VERSION._replace(counter=8)
+        cache.put(VERSION, ["public"], STATE)
+        cache.put(newer, ["public"], CanonicalState(functions=[], triggers=[]))
+
+        assert cache.get(newer, ["public"]) == CanonicalState(functions=[], triggers=[], views=[])
+        assert len(cache) == 1
+
+    def test_clear(self, tmp_path: Path):
+        cache = SnapshotCache(tmp_path / "snapshots.db")
+        cache.put(VERSION, ["public"], STATE)
+
+        cache.clear()
+
+        assert len(cache) == 0
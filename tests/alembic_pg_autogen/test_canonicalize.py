@@ -2,26 +2,39 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Generator
-from typing import Any, cast
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
 
 import pytest
-from sqlalchemy import Connection, text
+from sqlalchemy import Connection, event, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 
 from alembic_pg_autogen import (
     IGNORED,
+    Action,
+    CanonicalizationCache,
     CanonicalState,
     canonicalize,
+    canonicalize_all_check_constraints,
     canonicalize_check_constraints,
     canonicalize_functions,
     canonicalize_triggers,
     canonicalize_views,
+    diff,
+    inspect_catalog,
     inspect_check_constraints,
+    install_change_counter,
 )
 
+if TYPE_CHECKING:
+    import psycopg
+
 FN_DDL = "CREATE FUNCTION public.f() RETURNS void LANGUAGE sql AS $$ SELECT 1 $$"
 VIEW_DDL = "CREATE VIEW public.v AS SELECT 1"
 TRG_DDL = "CREATE TRIGGER trg AFTER INSERT ON public.t FOR EACH ROW EXECUTE FUNCTION public.f()"
+CACHED_FN_DDL = "CREATE FUNCTION public.test_canon_cached(a integer) RETURNS integer LANGUAGE sql AS $$ SELECT a $$"
+CACHED_VIEW_DDL = "CREATE VIEW public.test_canon_cached_v AS SELECT public.test_canon_cached(1) AS one"
 
 
 class TestCanonicalStateUnit:
@@ -129,6 +142,56 @@ class TestCanonicalizeIntegration:
         result = pg_conn.execute(text("SELECT 1 AS val")).scalar()
         assert result == 1
 
+    def test_error_names_the_failing_statement(self, pg_conn: Connection):
+        function_ddl = [
+            "CREATE FUNCTION public.test_canon_ok() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$",
+            "CREATE FUNCTION public.test_canon_bad() RETURNS integer LANGUAGE sql AS $$ SELECT missing_column $$",
+        ]
+
+        with pytest.raises(DBAPIError) as excinfo:
+            canonicalize(pg_conn, function_ddl=function_ddl, view_ddl=IGNORED, trigger_ddl=IGNORED)
+
+        message = str(excinfo.value.orig)
+        assert 'column "missing_column" does not exist' in message
+        assert "CREATE OR REPLACE FUNCTION public.test_canon_bad()" in message
+        assert getattr(excinfo.value.orig, "sqlstate", None) == "42703"
+        assert pg_conn.execute(text("SELECT 1")).scalar() == 1
+
+    def test_error_keeps_its_detail(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE VIEW public.test_canon_view AS SELECT 1 AS one"))
+        trigger_ddl = [
+            "CREATE TRIGGER test_canon_trg AFTER INSERT ON public.test_canon_view FOR EACH ROW EXECUTE FUNCTION f()"
+        ]
+
+        with pytest.raises(DBAPIError) as excinfo:
+            canonicalize(pg_conn, function_ddl=IGNORED, view_ddl=IGNORED, trigger_ddl=trigger_ddl)
+
+        diag = getattr(excinfo.value.orig, "diag", None)
+        assert diag is not None
+        assert diag.message_detail == "Views cannot have row-level BEFORE or AFTER triggers."
+        assert "CREATE OR REPLACE TRIGGER test_canon_trg" in (diag.context or "")
+
+    def test_role_without_temp_privilege(self, pg_conn: Connection):
+        database = pg_conn.execute(text("SELECT current_database()")).scalar()
+        pg_conn.execute(text("CREATE ROLE test_canon_no_temp"))
+        pg_conn.execute(text(f'REVOKE TEMPORARY ON DATABASE "{database}" FROM PUBLIC'))
+        pg_conn.execute(text("GRANT USAGE, CREATE ON SCHEMA public TO test_canon_no_temp"))
+        pg_conn.execute(text("SET LOCAL ROLE test_canon_no_temp"))
+        ddl = (
+            "CREATE FUNCTION public.test_canon_colon() RETURNS text LANGUAGE sql AS $$ SELECT ' :not_a_param'::text $$"
+        )
+
+        result = canonicalize_functions(pg_conn, [ddl], schemas=["public"])
+
+        assert any(f.name == "test_canon_colon" and ":not_a_param" in f.definition for f in result)
+
+    def test_ddl_is_not_scanned_for_bind_parameters(self, pg_conn: Connection):
+        ddl = "CREATE FUNCTION public.test_canon_colon() RETURNS text LANGUAGE sql AS $$ SELECT ' :not_a_param' $$"
+
+        result = canonicalize_functions(pg_conn, [ddl], schemas=["public"])
+
+        assert any(":not_a_param" in f.definition for f in result)
+
     # 3.6 — Schema scoping
     def test_schema_scoping(self, pg_conn: Connection):
         pg_conn.execute(text("CREATE SCHEMA IF NOT EXISTS test_canon_other"))
@@ -284,14 +347,14 @@ class TestCanonicalizeUnit:
             trigger_ddl=[TRG_DDL],
         )
 
-        assert [_ddl_kind(s) for s in conn.statements if _ddl_kind(s)] == ["function", "view", "trigger"]
+        assert [_ddl_kind(s) for s in _batched(conn)] == ["function", "view", "trigger"]
 
     def test_catalog_is_read_after_the_ddl_runs(self):
         conn = _RecordingConnection()
 
         canonicalize(_as_conn(conn), function_ddl=[FN_DDL])
 
-        ddl_index = next(i for i, s in enumerate(conn.statements) if _ddl_kind(s) == "function")
+        ddl_index = next(i for i, s in enumerate(conn.statements) if _BATCH_CALL in s)
         catalog_index = next(i for i, s in enumerate(conn.statements) if "pg_catalog.pg_proc" in s)
         assert ddl_index < catalog_index
 
@@ -304,7 +367,7 @@ class TestCanonicalizeUnit:
 
     def test_savepoint_is_rolled_back_when_ddl_fails(self):
         """A failed round-trip must still leave the database exactly as it was found."""
-        conn = _RecordingConnection(fail_on="CREATE OR REPLACE FUNCTION")
+        conn = _RecordingConnection(fail_on=_BATCH_CALL)
 
         with pytest.raises(RuntimeError):
             canonicalize(_as_conn(conn), function_ddl=[FN_DDL])
@@ -321,7 +384,7 @@ class TestCanonicalizeUnit:
             trigger_ddl=IGNORED,
         )
 
-        assert [_ddl_kind(s) for s in conn.statements if _ddl_kind(s)] == ["function"]
+        assert [_ddl_kind(s) for s in _batched(conn)] == ["function"]
         assert not any("pg_catalog.pg_trigger" in s for s in conn.statements)
         assert list(state.views) == []
         assert list(state.triggers) == []
@@ -351,6 +414,54 @@ class TestCanonicalizeUnit:
         assert "produced no triggers" in caplog.text
 
 
+class TestCanonicalizeBatchUnit:
+    def test_statements_cost_a_fixed_number_of_round_trips(self):
+        few, many = _RecordingConnection(), _RecordingConnection()
+
+        canonicalize(_as_conn(few), function_ddl=[FN_DDL])
+        canonicalize(_as_conn(many), function_ddl=[FN_DDL] * 50, view_ddl=[VIEW_DDL] * 50)
+
+        assert len(few.statements) == len(many.statements)
+        assert len(_batched(many)) == 100
+
+    def test_no_ddl_creates_no_helper(self):
+        conn = _RecordingConnection()
+
+        canonicalize(_as_conn(conn), function_ddl=[], view_ddl=[], trigger_ddl=[])
+
+        assert not any("alembic_pg_autogen_execute" in s for s in conn.statements)
+
+
+class TestCanonicalizeDeclaredOnlyUnit:
+    def test_identities_are_pushed_into_the_read_back(self):
+        conn = _RecordingConnection()
+
+        canonicalize(
+            _as_conn(conn), function_ddl=[FN_DDL], view_ddl=[VIEW_DDL], trigger_ddl=IGNORED, declared_only=True
+        )
+
+        read_back = conn.params[-1]
+        assert read_back["functions_identity_0"] == ["public"]
+        assert read_back["functions_identity_1"] == ["f"]
+        assert read_back["views_identity_1"] == ["v"]
+
+    def test_empty_declaration_skips_the_read_back(self):
+        conn = _RecordingConnection()
+
+        state = canonicalize(_as_conn(conn), function_ddl=[], view_ddl=[], trigger_ddl=[], declared_only=True)
+
+        assert not any("pg_catalog" in s for s in conn.statements)
+        assert state == CanonicalState(functions=(), triggers=(), views=())
+
+    def test_unparsable_identity_raises_before_any_sql(self):
+        conn = _RecordingConnection()
+
+        with pytest.raises(ValueError, match="Cannot parse view identity"):
+            canonicalize(_as_conn(conn), view_ddl=["SELECT 1"], declared_only=True)
+
+        assert conn.statements == []
+
+
 class TestCanonicalizeWrappersUnit:
     """Each convenience wrapper manages exactly one object type and ignores the rest."""
 
@@ -386,6 +497,14 @@ class TestCanonicalizeWrappersUnit:
         assert {"schemas": ["audit"]} in conn.params
 
 
+_BATCH_CALL = "pg_temp.alembic_pg_autogen_execute(CAST"
+
+
+def _batched(conn: _RecordingConnection) -> list[str]:
+    """Return the DDL statements handed to the batch execution helper, in execution order."""
+    return [statement for params in conn.params for statement in cast("list[str]", params.get("statements", []))]
+
+
 def _ddl_kind(statement: str) -> str | None:
     """Classify a canonicalization DDL statement, ignoring the catalog queries around it."""
     for keyword, kind in (("FUNCTION", "function"), ("VIEW", "view"), ("TRIGGER", "trigger")):
@@ -409,6 +528,22 @@ class _RecordingSavepoint:
         self._log.append(True)
 
 
+class _EmptyCatalogRow:
+    """The single row of an ``inspect_catalog`` query over an empty catalog: every column is an empty JSON array."""
+
+    def __getattr__(self, name: str) -> str:
+        return "[]"
+
+
+class _EmptyResult(list[object]):
+    def one(self) -> _EmptyCatalogRow:
+        return _EmptyCatalogRow()
+
+    def scalar(self) -> bool:
+        # The only scalar canonicalization asks for is whether the role may create its temporary helper.
+        return True
+
+
 class _RecordingConnection:
     """Records every statement and returns no rows, standing in for a ``Connection``."""
 
@@ -426,14 +561,14 @@ class _RecordingConnection:
     def begin_nested(self) -> _RecordingSavepoint:
         return _RecordingSavepoint(self.savepoints)
 
-    def execute(self, statement: object, params: dict[str, object] | None = None) -> list[object]:
+    def execute(self, statement: object, params: dict[str, object] | None = None) -> _EmptyResult:
         rendered = str(statement)
         self.statements.append(rendered)
         if params is not None:
             self.params.append(params)
         if self._fail_on is not None and self._fail_on in rendered:
             raise RuntimeError(f"simulated failure for {rendered!r}")
-        return []
+        return _EmptyResult()
 
 
 class TestCanonicalizeCheckConstraintsUnit:
@@ -443,6 +578,158 @@ class TestCanonicalizeCheckConstraintsUnit:
 
         assert canonicalize_check_constraints(unusable, schema="public", table_name="orders", expressions={}) == {}
 
+    def test_bulk_form_without_expressions_never_touches_the_connection(self):
+        unusable = cast("Connection", object())
+
+        assert canonicalize_all_check_constraints(unusable, {("public", "orders"): {}}) == {("public", "orders"): {}}
+
+
+@pytest.mark.integration
+class TestCanonicalizeDeclaredOnlyIntegration:
+    def test_preexisting_objects_are_not_read_back(self, pg_conn: Connection):
+        pg_conn.execute(
+            text("CREATE FUNCTION public.test_canon_bystander() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$")
+        )
+        ddl = "CREATE FUNCTION public.test_canon_declared() RETURNS integer LANGUAGE sql AS $$ SELECT 2 $$"
+
+        result = canonicalize(pg_conn, function_ddl=[ddl], view_ddl=IGNORED, trigger_ddl=IGNORED, declared_only=True)
+
+        assert [f.name for f in result.functions] == ["test_canon_declared"]
+
+    def test_matches_the_unscoped_read_back(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE SCHEMA test_canon_scope"))
+        pg_conn.execute(text("CREATE TABLE test_canon_scope.t (id integer)"))
+        pg_conn.execute(text("SET LOCAL search_path TO test_canon_scope"))
+        kwargs: dict[str, Any] = {
+            "function_ddl": ["CREATE FUNCTION fn() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$"],
+            "view_ddl": ["CREATE VIEW v AS SELECT 1 AS one"],
+            "trigger_ddl": ["CREATE TRIGGER trg BEFORE INSERT ON t FOR EACH ROW EXECUTE FUNCTION fn()"],
+        }
+
+        scoped = canonicalize(pg_conn, declared_only=True, **kwargs)
+        unscoped = canonicalize(pg_conn, schemas=["test_canon_scope"], **kwargs)
+
+        assert scoped == unscoped
+        assert len(scoped.functions) == len(scoped.triggers) == len(scoped.views) == 1
+
+
+@pytest.mark.integration
+class TestCanonicalizeCachedIntegration:
+    def _canonicalize(self, conn: Connection, cache: CanonicalizationCache, **kwargs: Any) -> CanonicalState:
+        return canonicalize(
+            conn,
+            function_ddl=[CACHED_FN_DDL],
+            view_ddl=[CACHED_VIEW_DDL],
+            trigger_ddl=IGNORED,
+            declared_only=True,
+            cache=cache,
+            **kwargs,
+        )
+
+    def test_warm_cache_runs_no_ddl(self, pg_conn: Connection, tmp_path: Path):
+        install_change_counter(pg_conn)
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        cold = self._canonicalize(pg_conn, cache)
+        statements: list[str] = []
+        event.listen(pg_conn, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        warm = self._canonicalize(pg_conn, cache)
+
+        assert warm == cold
+        assert not [statement for statement in statements if "CREATE" in statement or "SAVEPOINT" in statement]
+        assert len(cache) == 2
+
+    def test_views_are_not_cached_without_a_change_counter(self, pg_conn: Connection, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+
+        first = self._canonicalize(pg_conn, cache)
+        second = self._canonicalize(pg_conn, cache)
+
+        assert first == second
+        assert [v.name for v in second.views] == ["test_canon_cached_v"]
+        assert len(cache) == 1
+
+    def test_catalog_changes_invalidate_dependent_entries(self, pg_conn: Connection, tmp_path: Path):
+        """A view over ``SELECT *`` gains the column its table gained, rather than keeping the cached column list."""
+        install_change_counter(pg_conn)
+        pg_conn.execute(text("CREATE TABLE public.test_canon_cached_t (a int)"))
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        view_ddl = ["CREATE VIEW public.test_canon_cached_tv AS SELECT * FROM public.test_canon_cached_t"]
+        before = canonicalize(pg_conn, view_ddl=view_ddl, declared_only=True, cache=cache)
+        pg_conn.execute(text("ALTER TABLE public.test_canon_cached_t ADD COLUMN b int"))
+
+        after = canonicalize(pg_conn, view_ddl=view_ddl, declared_only=True, cache=cache)
+
+        assert "b\n" not in before.views[0].definition
+        assert "SELECT a,\n    b\n" in after.views[0].definition
+        assert len(cache) == 2
+
+    def test_matches_the_uncached_read_back(self, pg_conn: Connection, tmp_path: Path):
+        cached = self._canonicalize(pg_conn, CanonicalizationCache(tmp_path / "cache.db"))
+        uncached = canonicalize(
+            pg_conn, function_ddl=[CACHED_FN_DDL], view_ddl=[CACHED_VIEW_DDL], trigger_ddl=IGNORED, declared_only=True
+        )
+
+        assert cached == uncached
+
+    def test_a_miss_still_runs_the_ddl_it_depends_on(self, pg_conn: Connection, tmp_path: Path):
+        """Only the view misses, but it calls the cached function, which must exist for the view to be created."""
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        canonicalize(pg_conn, function_ddl=[CACHED_FN_DDL], declared_only=True, cache=cache)
+
+        install_change_counter(pg_conn)
+        result = self._canonicalize(pg_conn, cache)
+
+        assert [v.name for v in result.views] == ["test_canon_cached_v"]
+        assert len(cache) == 2
+
+    def test_only_the_declared_overload_is_returned(self, pg_conn: Connection, tmp_path: Path):
+        pg_conn.execute(
+            text("CREATE FUNCTION public.test_canon_cached(a text) RETURNS text LANGUAGE sql AS $$ SELECT a $$")
+        )
+
+        result = self._canonicalize(pg_conn, CanonicalizationCache(tmp_path / "cache.db"))
+
+        assert [(f.name, f.identity_args) for f in result.functions] == [("test_canon_cached", "a integer")]
+
+    def test_unchanged_objects_match_the_baseline_digest(self, pg_conn: Connection, tmp_path: Path):
+        pg_conn.execute(text(CACHED_FN_DDL))
+        baseline = inspect_catalog(pg_conn, ["public"], triggers=False, views=False, digests=True)
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+        self._canonicalize(pg_conn, cache)
+
+        result = self._canonicalize(pg_conn, cache, baseline=baseline)
+
+        assert result.functions == baseline.functions
+        assert result.views[0].definition.startswith("CREATE OR REPLACE VIEW")
+
+    def test_requires_declared_only(self, pg_conn: Connection, tmp_path: Path):
+        with pytest.raises(ValueError, match="declared_only"):
+            canonicalize(pg_conn, function_ddl=[CACHED_FN_DDL], cache=CanonicalizationCache(tmp_path / "cache.db"))
+
+
+@pytest.mark.integration
+class TestCanonicalizeBaselineIntegration:
+    def test_unchanged_objects_come_back_as_their_baseline_digest(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE VIEW public.test_canon_same AS SELECT 1 AS one"))
+        pg_conn.execute(text("CREATE VIEW public.test_canon_changed AS SELECT 1 AS one"))
+        baseline = inspect_catalog(pg_conn, ["public"], functions=False, triggers=False, digests=True)
+
+        result = canonicalize(
+            pg_conn,
+            view_ddl=[
+                "CREATE VIEW public.test_canon_same AS SELECT 1 AS one",
+                "CREATE VIEW public.test_canon_changed AS SELECT 2 AS one",
+            ],
+            declared_only=True,
+            baseline=baseline,
+        )
+
+        by_name = {v.name: v.definition for v in result.views}
+        assert by_name["test_canon_same"] == {v.name: v.definition for v in baseline.views}["test_canon_same"]
+        assert by_name["test_canon_changed"].startswith("CREATE OR REPLACE VIEW public.test_canon_changed AS")
+        assert diff(baseline, result).view_ops == [(Action.REPLACE, baseline.views[0], result.views[0])]
+
 
 @pytest.mark.integration
 class TestCanonicalizeCheckConstraintsIntegration:
@@ -539,3 +826,206 @@ class TestCanonicalizeCheckConstraintsIntegration:
         )
 
         assert "ck_test_path" in normalized
+
+
+@pytest.mark.integration
+class TestCanonicalizeAllCheckConstraintsIntegration:
+    def test_every_table_is_canonicalized_in_one_batch(self, pg_conn: Connection):
+        for name in ("test_ccka_orders", "test_ccka_invoices"):
+            pg_conn.execute(text(f"CREATE TABLE public.{name} (amount numeric)"))
+        statements: list[str] = []
+
+        def record(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+            statements.append(statement)
+
+        event.listen(pg_conn, "before_cursor_execute", record)
+        try:
+            normalized = canonicalize_all_check_constraints(
+                pg_conn,
+                {
+                    ("public", "test_ccka_orders"): {"ck_orders": "amount >= 0", "ck_orders_cap": "amount < 10"},
+                    ("public", "test_ccka_invoices"): {"ck_invoices": "amount > 0"},
+                },
+            )
+        finally:
+            event.remove(pg_conn, "before_cursor_execute", record)
+
+        assert set(normalized["public", "test_ccka_orders"]) == {"ck_orders", "ck_orders_cap"}
+        assert set(normalized["public", "test_ccka_invoices"]) == {"ck_invoices"}
+        # Savepoint, privilege check, helper function, the batch with its read-back, and the rollback: no statement per
+        # probe or table.
+        assert len(statements) == 5
+
+    @pytest.fixture
+    def committed_tables(self, pg_engine: Engine) -> Generator[None]:
+        """Two committed tables, which the test's own transaction holds no lock on yet."""
+        with pg_engine.connect() as other:
+            for name in ("test_ccka_first", "test_ccka_second"):
+                other.execute(text(f"CREATE TABLE public.{name} (amount numeric)"))
+            other.commit()
+            try:
+                yield
+            finally:
+                other.execute(text("DROP TABLE public.test_ccka_first, public.test_ccka_second"))
+                other.commit()
+
+    @pytest.mark.usefixtures("committed_tables")
+    def test_one_table_is_locked_at_a_time(self, pg_conn: Connection):
+        """Each table's probes are rolled back, releasing its ACCESS EXCLUSIVE lock, before the next table is probed."""
+        pg_conn.execute(
+            text(
+                "CREATE FUNCTION public.test_ccka_report_locks() RETURNS event_trigger LANGUAGE plpgsql AS $$ BEGIN "
+                "RAISE NOTICE 'locked %', (SELECT count(*) FROM pg_locks WHERE pid = pg_backend_pid() "
+                "AND mode = 'AccessExclusiveLock' AND relation IN "
+                "('public.test_ccka_first'::regclass, 'public.test_ccka_second'::regclass)); END $$"
+            )
+        )
+        pg_conn.execute(
+            text(
+                "CREATE EVENT TRIGGER test_ccka_report_locks ON ddl_command_end WHEN TAG IN ('ALTER TABLE') "
+                "EXECUTE FUNCTION public.test_ccka_report_locks()"
+            )
+        )
+        notices: list[str | None] = []
+        driver = cast("psycopg.Connection[Any]", pg_conn.connection.driver_connection)
+        driver.add_notice_handler(lambda diagnostic: notices.append(diagnostic.message_primary))
+
+        normalized = canonicalize_all_check_constraints(
+            pg_conn,
+            {
+                ("public", "test_ccka_first"): {"ck_first": "amount >= 0"},
+                ("public", "test_ccka_second"): {"ck_second": "amount > 0"},
+            },
+        )
+
+        assert set(normalized["public", "test_ccka_second"]) == {"ck_second"}
+        assert notices == ["locked 1", "locked 1"]
+
+    def test_a_failing_probe_does_not_take_the_others_down(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE TABLE public.test_ccka_good (amount numeric)"))
+        pg_conn.execute(text("CREATE TABLE public.test_ccka_bad (amount numeric)"))
+
+        normalized = canonicalize_all_check_constraints(
+            pg_conn,
+            {
+                ("public", "test_ccka_good"): {"ck_good": "amount >= 0"},
+                ("public", "test_ccka_bad"): {"ck_bad": "no_such_column > 0", "ck_fine": "amount <> 1"},
+                ("public", "test_ccka_missing"): {"ck_missing": "amount > 0"},
+            },
+        )
+
+        assert set(normalized["public", "test_ccka_good"]) == {"ck_good"}
+        assert set(normalized["public", "test_ccka_bad"]) == {"ck_fine"}
+        assert normalized["public", "test_ccka_missing"] == {}
+        assert inspect_check_constraints(pg_conn, schemas=["public"], table_names=["test_ccka_good"]) == []
+
+    @pytest.fixture
+    def role_without_temp(self, pg_conn: Connection) -> Connection:
+        """The test's connection, switched to a role that owns two tables but may not create temporary objects."""
+        database = pg_conn.execute(text("SELECT current_database()")).scalar()
+        pg_conn.execute(text("CREATE ROLE test_ccka_no_temp"))
+        pg_conn.execute(text(f'REVOKE TEMPORARY ON DATABASE "{database}" FROM PUBLIC'))
+        for name in ("test_ccka_owned", "test_ccka_other"):
+            pg_conn.execute(text(f"CREATE TABLE public.{name} (amount numeric)"))
+            pg_conn.execute(text(f"ALTER TABLE public.{name} OWNER TO test_ccka_no_temp"))
+        pg_conn.execute(text("SET LOCAL ROLE test_ccka_no_temp"))
+        return pg_conn
+
+    def test_role_without_temp_privilege_probes_in_savepoints(self, role_without_temp: Connection):
+        normalized = canonicalize_all_check_constraints(
+            role_without_temp,
+            {
+                ("public", "test_ccka_owned"): {"ck_owned": "amount >= 0", "ck_bad": "no_such_column > 0"},
+                ("public", "test_ccka_other"): {"ck_other": "amount <> 1"},
+            },
+        )
+
+        assert normalized["public", "test_ccka_owned"] == {"ck_owned": "amount >= 0::numeric"}
+        assert normalized["public", "test_ccka_other"] == {"ck_other": "amount <> 1::numeric"}
+        assert inspect_check_constraints(role_without_temp, schemas=["public"], table_names=["test_ccka_owned"]) == []
+        assert role_without_temp.in_transaction()
+
+    def test_shadow_needs_the_temp_privilege(self, role_without_temp: Connection, caplog: pytest.LogCaptureFixture):
+        normalized = canonicalize_all_check_constraints(
+            role_without_temp, {("public", "test_ccka_owned"): {"ck_owned": "amount >= 0"}}, shadow=True
+        )
+
+        assert normalized == {("public", "test_ccka_owned"): {}}
+        assert "need the TEMP privilege" in caplog.text
+
+
+@pytest.mark.integration
+class TestCanonicalizeCheckConstraintsShadowIntegration:
+    @pytest.mark.parametrize(
+        ("column", "expression"),
+        [
+            ("amount numeric", "amount >= 0"),
+            ("status varchar(16)", "status IN ('new', 'done')"),
+            ('code text COLLATE "C"', "code > 'a'"),
+            ("tags text[]", "cardinality(tags) < 4"),
+            ("created date", "created > '2020-01-01'"),
+        ],
+    )
+    def test_shadow_read_back_matches_the_live_table(self, pg_conn: Connection, column: str, expression: str):
+        pg_conn.execute(text(f"CREATE TABLE public.test_ccks_same ({column})"))
+
+        live = canonicalize_check_constraints(
+            pg_conn, schema="public", table_name="test_ccks_same", expressions={"ck": expression}
+        )
+        shadowed = canonicalize_check_constraints(
+            pg_conn, schema="public", table_name="test_ccks_same", expressions={"ck": expression}, shadow=True
+        )
+
+        assert shadowed == live
+        assert "ck" in shadowed
+
+    @pytest.fixture
+    def busy_table(self, pg_engine: Engine) -> Generator[str]:
+        """A committed table another session is writing to, holding the ROW EXCLUSIVE lock an UPDATE would take."""
+        with pg_engine.connect() as other:
+            other.execute(text("CREATE TABLE public.test_ccks_busy (amount numeric)"))
+            other.commit()
+            other.execute(text("LOCK TABLE public.test_ccks_busy IN ROW EXCLUSIVE MODE"))
+            try:
+                yield "test_ccks_busy"
+            finally:
+                other.rollback()
+                other.execute(text("DROP TABLE public.test_ccks_busy"))
+                other.commit()
+
+    @pytest.mark.parametrize(("shadow", "expected"), [(True, {"ck_test_busy"}), (False, set[str]())])
+    def test_shadow_does_not_wait_for_a_busy_table(
+        self, pg_conn: Connection, busy_table: str, shadow: bool, expected: set[str]
+    ):
+        """Probing the live table needs ACCESS EXCLUSIVE and times out; the shadow needs only ACCESS SHARE."""
+        pg_conn.execute(text("SET LOCAL lock_timeout = '200ms'"))
+
+        normalized = canonicalize_check_constraints(
+            pg_conn, schema="public", table_name=busy_table, expressions={"ck_test_busy": "amount >= 0"}, shadow=shadow
+        )
+
+        assert set(normalized) == expected
+
+    def test_shadow_leaves_nothing_behind(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE TABLE public.test_ccks_clean (amount numeric)"))
+
+        canonicalize_check_constraints(
+            pg_conn, schema="public", table_name="test_ccks_clean", expressions={"ck": "amount >= 0"}, shadow=True
+        )
+
+        assert pg_conn.execute(text("SELECT to_regclass('pg_temp._alembic_pg_autogen_shadow_0')")).scalar() is None
+
+    def test_missing_table_is_omitted_rather_than_raised(self, pg_conn: Connection):
+        pg_conn.execute(text("CREATE TABLE public.test_ccks_present (amount numeric)"))
+
+        normalized = canonicalize_all_check_constraints(
+            pg_conn,
+            {
+                ("public", "test_ccks_absent"): {"ck_absent": "amount > 0"},
+                ("public", "test_ccks_present"): {"ck": "amount > 0"},
+            },
+            shadow=True,
+        )
+
+        assert normalized["public", "test_ccks_absent"] == {}
+        assert set(normalized["public", "test_ccks_present"]) == {"ck"}
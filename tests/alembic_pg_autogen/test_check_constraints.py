@@ -9,9 +9,10 @@ import pytest
 from alembic.operations.ops import ModifyTableOps
 from alembic.runtime.plugins import Plugin
 from alembic.util import PriorityDispatchResult
-from sqlalchemy import CheckConstraint, Column, Enum, Integer, MetaData, Numeric, String, Table, bindparam, text
+from sqlalchemy import CheckConstraint, Column, Enum, Integer, MetaData, Numeric, String, Table, bindparam, event, text
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
 
 from alembic_pg_autogen import CheckConstraintInfo
 from alembic_pg_autogen import compare_check_constraints as module
@@ -22,6 +23,7 @@ from alembic_pg_autogen.compare_check_constraints import (
     _same_sql,
     setup,
 )
+from alembic_pg_autogen.context import run_context
 
 from .test_autogenerate import _autogenerate
 
@@ -56,12 +58,17 @@ class _StubAutogenContext:
 
     connection: object | None
     dialect: Dialect
+    opts: dict[str, Any]
+    sorted_tables: list[Table]
     name_filter_result: bool
     object_filter_result: bool
 
     def __init__(self, connection: object | None = None) -> None:
         self.connection = connection
         self.dialect = PG_DIALECT
+        self.opts = {}
+        # Empty by default, so each comparator call takes the per-table path the prepass would otherwise cover.
+        self.sorted_tables = []
         self.name_filter_result = True
         self.object_filter_result = True
 
@@ -178,12 +185,15 @@ class TestComparatorSkips:
                     CheckConstraintInfo("public", "orders", name, expression) for name, expression in current.items()
                 ]
 
-            def fake_canonicalize(_conn: object, **kwargs: Any) -> dict[str, str]:
-                canonicalized.extend(kwargs["expressions"])
-                return normalized
+            def fake_canonicalize(
+                _conn: object, tables: dict[tuple[str, str], dict[str, str]], **_kw: Any
+            ) -> dict[tuple[str, str], dict[str, str]]:
+                for expressions in tables.values():
+                    canonicalized.extend(expressions)
+                return {key: normalized for key in tables}
 
             monkeypatch.setattr(module, "inspect_check_constraints", fake_inspect)
-            monkeypatch.setattr(module, "canonicalize_check_constraints", fake_canonicalize)
+            monkeypatch.setattr(module, "canonicalize_all_check_constraints", fake_canonicalize)
             return canonicalized
 
         return install
@@ -257,6 +267,138 @@ class TestComparatorSkips:
         assert [type(op).__name__ for op in ops] == ["DropConstraintOp", "CreateCheckConstraintOp"]
 
 
+class TestComparatorPrepass:
+    """The first call covers every table Alembic is about to compare, so the rest issue no queries of their own."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch: pytest.MonkeyPatch) -> dict[str, list[Any]]:
+        calls: dict[str, list[Any]] = {"inspect": [], "canonicalize": [], "shadow": []}
+
+        def fake_inspect(_conn: object, **kwargs: Any) -> list[CheckConstraintInfo]:
+            calls["inspect"].append(kwargs)
+            return [
+                CheckConstraintInfo("public", table_name, f"ck_{table_name}_amount", "amount > (0)::numeric")
+                for table_name in kwargs["table_names"]
+            ]
+
+        def fake_canonicalize(
+            _conn: object, tables: dict[tuple[str, str], dict[str, str]], *, shadow: bool
+        ) -> dict[tuple[str, str], dict[str, str]]:
+            calls["canonicalize"].append(tables)
+            calls["shadow"].append(shadow)
+            return {key: dict.fromkeys(expressions, "amount >= (0)::numeric") for key, expressions in tables.items()}
+
+        monkeypatch.setattr(module, "inspect_check_constraints", fake_inspect)
+        monkeypatch.setattr(module, "canonicalize_all_check_constraints", fake_canonicalize)
+        return calls
+
+    @staticmethod
+    def _tables() -> list[Table]:
+        metadata = MetaData()
+        return [
+            Table(name, metadata, Column("amount", Numeric()), CheckConstraint("amount >= 0", name=f"ck_{name}_amount"))
+            for name in ("invoices", "orders")
+        ]
+
+    @staticmethod
+    def _run(context: Any, table: Table) -> ModifyTableOps:
+        modify_table_ops = ModifyTableOps(table.name, [])
+        _compare_check_constraint_expressions(context, modify_table_ops, None, table.name, table, table)
+        return modify_table_ops
+
+    def _context(self, tables: list[Table]) -> Any:
+        context = _stub_context(connection=object())
+        context.sorted_tables = tables
+        context.opts["include_schemas"] = False
+        run_context(context).current_schema = "public"
+        return context
+
+    def test_one_inspection_and_one_canonicalization_for_all_tables(self, calls: dict[str, list[Any]]):
+        tables = self._tables()
+        context = self._context(tables)
+
+        results = [self._run(context, table) for table in tables]
+
+        assert [len(result.ops) for result in results] == [2, 2]
+        assert len(calls["inspect"]) == 1
+        assert calls["inspect"][0]["table_names"] == ["invoices", "orders"]
+        assert calls["canonicalize"] == [
+            {
+                ("public", "invoices"): {"ck_invoices_amount": "amount >= 0"},
+                ("public", "orders"): {"ck_orders_amount": "amount >= 0"},
+            }
+        ]
+
+    @pytest.mark.parametrize(("opts", "shadow"), [({}, False), ({"pg_lock_free_check_constraints": True}, True)])
+    def test_lock_free_option_probes_shadow_tables(
+        self, calls: dict[str, list[Any]], opts: dict[str, Any], shadow: bool
+    ):
+        tables = self._tables()
+        context = self._context(tables)
+        context.opts.update(opts)
+
+        self._run(context, tables[0])
+
+        assert calls["shadow"] == [shadow]
+
+    def test_table_outside_the_default_schema_needs_include_schemas(self, calls: dict[str, list[Any]]):
+        tables = self._tables()
+        other = Table(
+            "audit", MetaData(), Column("amount", Numeric()), CheckConstraint("amount >= 0", name="ck"), schema="ops"
+        )
+        context = self._context([*tables, other])
+
+        self._run(context, tables[0])
+
+        assert calls["inspect"][0]["schemas"] == ["public"]
+
+    def test_table_qualified_with_the_default_schema_is_foreseen(self, calls: dict[str, list[Any]]):
+        """Alembic compares such a table as unqualified, so the prepass must count it without ``include_schemas``."""
+        metadata = MetaData()
+        invoices, orders = (
+            Table(
+                name,
+                metadata,
+                Column("amount", Numeric()),
+                CheckConstraint("amount >= 0", name=f"ck_{name}_amount"),
+                schema="public",
+            )
+            for name in ("invoices", "orders")
+        )
+        context = self._context([invoices, orders])
+        context.dialect = postgresql.dialect()
+        context.dialect.default_schema_name = "public"
+
+        self._run(context, invoices)
+        self._run(context, orders)
+
+        assert [kwargs["table_names"] for kwargs in calls["inspect"]] == [["invoices", "orders"]]
+
+    def test_table_excluded_by_include_object_is_never_probed(self, calls: dict[str, list[Any]]):
+        invoices, orders = self._tables()
+        context = self._context([invoices, orders])
+
+        def include_object(_obj: object, name: str, type_: str, *_args: object) -> bool:
+            return not (type_ == "table" and name == "invoices")
+
+        context.run_object_filters = include_object
+
+        self._run(context, orders)
+
+        assert [list(tables) for tables in calls["canonicalize"]] == [[("public", "orders")]]
+        assert [kwargs["table_names"] for kwargs in calls["inspect"]] == [["orders"]]
+
+    def test_table_the_prepass_did_not_foresee_is_loaded_on_its_own(self, calls: dict[str, list[Any]]):
+        invoices, orders = self._tables()
+        context = self._context([invoices])
+
+        self._run(context, invoices)
+        result = self._run(context, orders)
+
+        assert len(result.ops) == 2
+        assert [kwargs["table_names"] for kwargs in calls["inspect"]] == [["invoices"], ["orders"]]
+
+
 class TestComparatorShortCircuits:
     """The comparator must stay out of the way when there is nothing it can compare."""
 
@@ -384,3 +526,53 @@ class TestCheckConstraintAutogenerateIntegration:
             ).all()
 
         assert remaining == []
+
+    def test_all_tables_share_one_inspection_and_one_probe_batch(self, alembic_project: AlembicProject):
+        metadata = MetaData()
+        for index in range(4):
+            alembic_project.execute(
+                f"CREATE TABLE t{index} (id int PRIMARY KEY, n int CONSTRAINT ck_t{index} CHECK (n > 0))"
+            )
+            Table(
+                f"t{index}",
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("n", Integer),
+                # One table's expression cannot be applied; it must not cost the others their comparison.
+                CheckConstraint("no_such_column > 0" if index == 2 else "n > 1", name=f"ck_t{index}"),
+            )
+        statements: list[str] = []
+
+        def record(_conn: object, _cursor: object, statement: str, *_args: object) -> None:
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            content = _autogenerate(alembic_project, target_metadata=metadata, pg_functions=[], pg_views=[])
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        assert all(f"op.create_check_constraint('ck_t{index}', 't{index}', 'n > 1')" in content for index in (0, 1, 3))
+        assert "ck_t2" not in content
+        assert sum("con.contype = 'c'" in statement for statement in statements) == 1
+        assert sum("pg_temp.alembic_pg_autogen_try(" in statement for statement in statements) == 2  # create, call
+
+    def test_lock_free_option_detects_the_same_change(self, alembic_project: AlembicProject):
+        alembic_project.execute("CREATE TABLE orders (id serial PRIMARY KEY, amount numeric)")
+        alembic_project.execute("ALTER TABLE orders ADD CONSTRAINT ck_orders_amount CHECK (amount >= 0)")
+
+        metadata = MetaData()
+        Table(
+            "orders",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("amount", Numeric()),
+            CheckConstraint("amount > 0", name="ck_orders_amount"),
+            CheckConstraint("amount < 100", name="ck_orders_cap"),
+        )
+        alembic_project.execute("ALTER TABLE orders ADD CONSTRAINT ck_orders_cap CHECK (amount < 100)")
+
+        content = _autogenerate(alembic_project, target_metadata=metadata, pg_lock_free_check_constraints=True)
+
+        assert "op.create_check_constraint('ck_orders_amount', 'orders', 'amount > 0')" in content
+        assert "ck_orders_cap" not in content
@@ -10,6 +10,7 @@ parsers extract.
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -17,6 +18,8 @@ import pytest
 from alembic_pg_autogen import (
     IGNORED,
     Action,
+    AlterFunctionOp,
+    CanonicalizationCache,
     CanonicalState,
     CreateFunctionOp,
     CreateTriggerOp,
@@ -36,14 +39,18 @@ from alembic_pg_autogen import (
 )
 from alembic_pg_autogen.compare import (
     _filter_to_declared,
-    _filter_to_schemas,
     _order_ops,
     _parse_function_names,
     _parse_trigger_identities,
     _parse_view_names,
+    _resolve_cache,
     _resolve_ddl,
     _resolve_schemas,
+    _with_definitions,
+    filter_to_schemas,
+    with_undeclared_overloads,
 )
+from alembic_pg_autogen.context import RunContext
 
 LOGGER = "alembic_pg_autogen.compare"
 
@@ -70,9 +77,10 @@ class _FakeConnection:
         return self.schema
 
 
-def _conn(schema: str = "public") -> Any:
-    """Return a fake connection typed as ``Any`` so it can stand in for ``Connection``."""
-    return _FakeConnection(schema)
+def _conn(schema: str = "public") -> RunContext:
+    """Return a run context over a fake connection whose current schema is *schema*."""
+    fake: Any = _FakeConnection(schema)
+    return RunContext(fake)
 
 
 def _fn(schema: str = "public", name: str = "fn", args: str = "", definition: str = "def") -> FunctionInfo:
@@ -167,6 +175,29 @@ class TestOrderOps:
     def test_function_actions_map_to_operations(self, op: FunctionOp, expected_type: type):
         assert [type(o) for o in _order_ops([op], [], [])] == [expected_type]
 
+    @pytest.mark.parametrize(
+        ("desired", "expected_type"),
+        [
+            ("STABLE COST 5 AS $$ SELECT 1 $$", AlterFunctionOp),
+            ("AS $$ SELECT 2 $$", ReplaceFunctionOp),
+        ],
+    )
+    def test_only_a_changed_body_replaces_a_function(self, desired: str, expected_type: type):
+        prefix = "CREATE OR REPLACE FUNCTION public.fn() RETURNS integer LANGUAGE sql "
+        op = FunctionOp(Action.REPLACE, _fn(definition=prefix + "AS $$ SELECT 1 $$"), _fn(definition=prefix + desired))
+
+        assert [type(o) for o in _order_ops([op], [], [])] == [expected_type]
+
+    def test_alter_carries_its_statement(self):
+        prefix = "CREATE OR REPLACE FUNCTION public.fn() RETURNS integer LANGUAGE sql "
+        current = _fn(definition=prefix + "AS $$ SELECT 1 $$")
+        op = FunctionOp(Action.REPLACE, current, _fn(definition=prefix + "STABLE COST 5 AS $$ SELECT 1 $$"))
+
+        [alter] = _order_ops([op], [], [])
+
+        assert isinstance(alter, AlterFunctionOp)
+        assert alter.statement == "ALTER FUNCTION public.fn() STABLE COST 5"
+
     @pytest.mark.parametrize(
         ("op", "expected_type"),
         [
@@ -191,7 +222,7 @@ class TestOrderOps:
 
 
 class TestFilterToSchemas:
-    """``_filter_to_schemas`` narrows a catalog snapshot to the schemas autogenerate asked about."""
+    """``filter_to_schemas`` narrows a catalog snapshot to the schemas autogenerate asked about."""
 
     def _state(self) -> CanonicalState:
         return CanonicalState(
@@ -203,24 +234,24 @@ class TestFilterToSchemas:
     def test_none_returns_the_state_unchanged(self):
         state = self._state()
 
-        assert _filter_to_schemas(state, None) is state
+        assert filter_to_schemas(state, None) is state
 
     def test_filters_every_object_type(self):
-        filtered = _filter_to_schemas(self._state(), ["public"])
+        filtered = filter_to_schemas(self._state(), ["public"])
 
         assert [f.schema for f in filtered.functions] == ["public"]
         assert [t.schema for t in filtered.triggers] == ["public"]
         assert [v.schema for v in filtered.views] == ["public"]
 
     def test_multiple_schemas_are_all_kept(self):
-        filtered = _filter_to_schemas(self._state(), ["public", "audit"])
+        filtered = filter_to_schemas(self._state(), ["public", "audit"])
 
         assert len(filtered.functions) == 2
         assert len(filtered.triggers) == 2
         assert len(filtered.views) == 2
 
     def test_unmatched_schema_empties_the_state(self):
-        filtered = _filter_to_schemas(self._state(), ["reporting"])
+        filtered = filter_to_schemas(self._state(), ["reporting"])
 
         assert list(filtered.functions) == []
         assert list(filtered.triggers) == []
@@ -228,7 +259,7 @@ class TestFilterToSchemas:
 
     def test_empty_schema_list_empties_the_state(self):
         """An empty list is "no schemas", not "no filter" — that is what *None* means."""
-        filtered = _filter_to_schemas(self._state(), [])
+        filtered = filter_to_schemas(self._state(), [])
 
         assert list(filtered.functions) == []
 
@@ -253,8 +284,9 @@ class TestResolveSchemas:
 
     def test_named_schema_does_not_query_the_connection(self):
         conn = _FakeConnection()
+        fake: Any = conn
 
-        _resolve_schemas(conn, ["audit"])  # pyright: ignore[reportArgumentType]
+        _resolve_schemas(RunContext(fake), ["audit"])
 
         assert conn.statements == []
 
@@ -449,6 +481,70 @@ class TestFilterToDeclared:
         assert len(desired.functions) == 2
 
 
+class TestWithDefinitions:
+    """``_with_definitions`` swaps the digest-only current side of each op for its fully loaded record."""
+
+    def test_current_is_replaced_by_identity(self):
+        ops = [
+            FunctionOp(Action.REPLACE, _fn(args="a integer", definition="digest"), _fn(args="a integer")),
+            FunctionOp(Action.DROP, _fn(name="old", definition="digest"), None),
+        ]
+        loaded = [_fn(args="a integer", definition="full"), _fn(args="a text", definition="other overload")]
+        loaded.append(_fn(name="old", definition="old full"))
+
+        result = _with_definitions(ops, loaded)
+
+        assert [op.current.definition for op in result if op.current is not None] == ["full", "old full"]
+        assert [op.desired for op in result] == [op.desired for op in ops]
+
+    def test_create_ops_pass_through(self):
+        ops = [ViewOp(Action.CREATE, None, _view())]
+
+        assert _with_definitions(ops, []) == ops
+
+    def test_objects_that_disappeared_are_named(self):
+        functions = [FunctionOp(Action.DROP, _fn(name="old", args="a integer", definition="digest"), None)]
+        views = [ViewOp(Action.REPLACE, _view(definition="digest"), _view())]
+
+        with pytest.raises(RuntimeError, match=r"function public\.old\(a integer\) disappeared from the catalog"):
+            _with_definitions(functions, [])
+        with pytest.raises(RuntimeError, match=r"view public\.v disappeared"):
+            _with_definitions(views, [_view(name="other")])
+
+
+class TestWithUndeclaredOverloads:
+    def test_current_siblings_of_a_declared_name_are_kept(self):
+        desired = CanonicalState(functions=[_fn(args="a integer", definition="new")], triggers=[])
+        current = CanonicalState(
+            functions=[_fn(args="a integer", definition="old"), _fn(args="a text"), _fn(name="other")], triggers=[]
+        )
+
+        result = with_undeclared_overloads(desired, current)
+
+        assert result.functions == [_fn(args="a integer", definition="new"), _fn(args="a text")]
+
+    def test_complete_desired_state_is_returned_as_is(self):
+        desired = CanonicalState(functions=[_fn()], triggers=[_trg()], views=[_view()])
+
+        assert with_undeclared_overloads(desired, desired) is desired
+
+
+class TestResolveCache:
+    def test_none_disables_caching(self):
+        assert _resolve_cache(None) is None
+
+    def test_path_opens_a_cache(self, tmp_path: Path):
+        cache = _resolve_cache(tmp_path / "cache.db")
+
+        assert isinstance(cache, CanonicalizationCache)
+        assert cache.path == tmp_path / "cache.db"
+
+    def test_cache_passes_through(self, tmp_path: Path):
+        cache = CanonicalizationCache(tmp_path / "cache.db")
+
+        assert _resolve_cache(cache) is cache
+
+
 class _StubSQLCreatable:
     """Minimal alembic-utils-style entity: ``to_sql_statement_create()`` returning an object with ``.text``."""
 
@@ -47,6 +47,9 @@ class TestWarnUnrecognizedOptions:
             ("pg_trigger", "pg_triggers"),
             ("pg_functons", "pg_functions"),
             ("pg_veiws", "pg_views"),
+            ("pg_canonicalise_cache", "pg_canonicalize_cache"),
+            ("pg_lock_free_check_constraint", "pg_lock_free_check_constraints"),
+            ("pg_observer", "pg_observers"),
         ],
     )
     def test_close_match_warns_with_intended_key(self, typo: str, intended: str, caplog: pytest.LogCaptureFixture):
@@ -67,7 +70,14 @@ class TestWarnUnrecognizedOptions:
 
     def test_recognized_keys_are_silent(self, caplog: pytest.LogCaptureFixture):
         with caplog.at_level(logging.WARNING, logger=LOGGER):
-            _warn_unrecognized_options({"pg_functions": [], "pg_triggers": [], "pg_views": []})
+            _warn_unrecognized_options({
+                "pg_functions": [],
+                "pg_triggers": [],
+                "pg_views": [],
+                "pg_canonicalize_cache": None,
+                "pg_lock_free_check_constraints": True,
+                "pg_observers": [],
+            })
 
         assert caplog.records == []
 
@@ -0,0 +1,115 @@
+"""Tests for the per-run memo shared by the autogenerate comparators."""
+
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Table, event
+from sqlalchemy.engine import Engine
+
+from alembic_pg_autogen.context import RunContext, run_context
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from .alembic_helpers import AlembicProject
+
+
+class _CountingConnection:
+    """Stands in for a ``Connection`` and answers every query with the same current schema."""
+
+    statements: list[str]
+    dialect: Any
+
+    def __init__(self, version: tuple[int, ...] = (16, 4)) -> None:
+        self.statements = []
+        self.dialect = type("Dialect", (), {"server_version_info": version})()
+
+    def execute(self, statement: Any, *_args: Any, **_kw: Any) -> _CountingConnection:
+        self.statements.append(str(statement))
+        return self
+
+    def scalar(self) -> str:
+        return "app"
+
+
+class _AutogenContext:
+    """Exposes only the connection, which is all :func:`run_context` reads."""
+
+    connection: Any
+
+    def __init__(self, connection: Any) -> None:
+        self.connection = connection
+
+
+def _context(connection: Any) -> Any:
+    return _AutogenContext(connection)
+
+
+class TestRunContext:
+    def test_current_schema_is_queried_once(self):
+        conn = _CountingConnection()
+        run = RunContext(_context(conn).connection)
+
+        assert [run.resolve_schema(None) for _ in range(100)] == ["app"] * 100
+        assert len(conn.statements) == 1
+
+    def test_named_schema_needs_no_query(self):
+        conn = _CountingConnection()
+
+        assert RunContext(_context(conn).connection).resolve_schema("audit") == "audit"
+        assert conn.statements == []
+
+    def test_server_version_comes_from_the_dialect(self):
+        conn = _CountingConnection((14, 11))
+
+        assert RunContext(_context(conn).connection).server_version == (14, 11)
+        assert conn.statements == []
+
+
+class TestRunContextLookup:
+    def test_shared_within_a_run(self):
+        autogen_context = _context(_CountingConnection())
+
+        assert run_context(autogen_context) is run_context(autogen_context)
+
+    def test_fresh_for_each_run(self):
+        conn = _CountingConnection()
+
+        assert run_context(_context(conn)) is not run_context(_context(conn))
+
+    def test_offline_autogenerate_raises(self):
+        with pytest.raises(ValueError, match="online autogenerate"):
+            run_context(_context(None))
+
+
+@pytest.mark.integration
+class TestRunContextIntegration:
+    def test_current_schema_is_read_once_per_run(self, alembic_project: AlembicProject):
+        metadata = MetaData()
+        for index in range(5):
+            alembic_project.execute(
+                f"CREATE TABLE t{index} (id int PRIMARY KEY, n int CONSTRAINT ck_t{index} CHECK (n > 0))"
+            )
+            Table(
+                f"t{index}",
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("n", Integer),
+                CheckConstraint("n > 1", name=f"ck_t{index}"),
+            )
+        statements: list[str] = []
+
+        def record(_conn: object, _cursor: object, statement: str, *_args: object) -> None:
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            content = _autogenerate(alembic_project, target_metadata=metadata, pg_functions=[], pg_views=[])
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        assert all(f"op.create_check_constraint('ck_t{index}', 't{index}', 'n > 1')" in content for index in range(5))
+        assert statements.count("SELECT current_schema()") == 1
@@ -1,10 +1,26 @@
-"""Tests for postgast-based DDL parsing: identity extraction and ensure_or_replace."""
+"""Tests for postgast-based DDL parsing: identity extraction, ensure_or_replace and ParsedDDL."""
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import postgast
 import pytest
 
+from alembic_pg_autogen.ddl import (
+    alter_function_statement,
+    drop_statement,
+    ensure_parsed,
+    function_identity,
+    parse_ddl,
+    replace_trigger_statement,
+    trigger_identity,
+    view_identity,
+)
+
+if TYPE_CHECKING:
+    from alembic_pg_autogen.ddl import DDLKind
+
 
 class TestExtractFunctionIdentity:
     def test_schema_qualified(self):
@@ -116,3 +132,176 @@ class TestToDrop:
     def test_quoted_identifiers(self):
         result = postgast.to_drop('CREATE FUNCTION "My Schema"."My Func"() RETURNS void LANGUAGE sql AS $$ SELECT 1 $$')
         assert result == 'DROP FUNCTION "My Schema"."My Func"()'
+
+
+class TestIdentityHelpers:
+    """``alembic_pg_autogen.ddl`` flattens postgast's identities into plain tuples, leaving the schema unresolved."""
+
+    def test_function_identity(self):
+        ddl = "CREATE FUNCTION audit.log_event() RETURNS void LANGUAGE sql AS $$ SELECT 1 $$"
+        assert function_identity(ddl) == ("audit", "log_event")
+
+    def test_unqualified_function_has_no_schema(self):
+        assert function_identity("CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $$ SELECT 1 $$") == (None, "f")
+
+    def test_trigger_identity(self):
+        ddl = "CREATE TRIGGER trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION fn()"
+        assert trigger_identity(ddl) == ("public", "orders", "trg")
+
+    def test_view_identity(self):
+        assert view_identity('CREATE VIEW "Reporting".v AS SELECT 1') == ("Reporting", "v")
+
+    def test_unqualified_view_has_no_schema(self):
+        """Postgast reports an unqualified view's schema as ``""``; the helper normalizes that to *None*."""
+        assert view_identity("CREATE OR REPLACE VIEW v AS SELECT 1") == (None, "v")
+
+    @pytest.mark.parametrize("parse", [function_identity, trigger_identity, view_identity])
+    def test_other_statements_return_none(self, parse: object):
+        assert callable(parse)
+        assert parse("SELECT 1") is None
+
+
+class TestParseDDL:
+    """``parse_ddl`` derives every form from one parse, matching what postgast's string helpers produce."""
+
+    @pytest.mark.parametrize(
+        ("kind", "ddl"),
+        [
+            (
+                "function",
+                "CREATE FUNCTION public.add(a int, b int[], OUT c int) RETURNS int LANGUAGE sql AS $$ SELECT a $$",
+            ),
+            ("function", 'CREATE FUNCTION "My Schema"."My Func"(VARIADIC x text[]) RETURNS void LANGUAGE sql AS $$ $$'),
+            ("trigger", "CREATE TRIGGER trg AFTER INSERT ON orders FOR EACH ROW EXECUTE FUNCTION fn()"),
+            ("view", 'CREATE VIEW "weird name" AS SELECT 1'),
+        ],
+    )
+    def test_matches_postgast(self, kind: DDLKind, ddl: str):
+        parsed = parse_ddl(ddl, kind)
+        assert parsed.source == ddl
+        assert parsed.or_replace == postgast.ensure_or_replace(ddl)
+        assert parsed.drop == postgast.to_drop(ddl)
+
+    def test_identity(self):
+        ddl = "CREATE TRIGGER trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION fn()"
+        assert parse_ddl(ddl, "trigger").identity == ("public", "orders", "trg")
+
+    def test_procedure_has_a_drop_but_no_identity(self):
+        parsed = parse_ddl("CREATE PROCEDURE p(INOUT a int) LANGUAGE sql AS $$ SELECT 1 $$", "function")
+        assert parsed.identity is None
+        assert parsed.drop == "DROP PROCEDURE p(int)"
+
+    def test_statement_of_another_kind(self):
+        parsed = parse_ddl("CREATE VIEW v AS SELECT 1", "function")
+        assert parsed.identity is None
+        assert parsed.drop is None
+
+    def test_several_statements_have_no_drop(self):
+        parsed = parse_ddl("CREATE VIEW a AS SELECT 1; CREATE VIEW b AS SELECT 2", "view")
+        assert parsed.drop is None
+        assert parsed.or_replace.count("CREATE OR REPLACE VIEW") == 2
+
+    @pytest.mark.parametrize(
+        ("kind", "ddl", "expected"),
+        [
+            ("function", "CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $$ SELECT count(*) FROM t $$", True),
+            ("function", "CREATE FUNCTION f() RETURNS bigint LANGUAGE sql RETURN (SELECT count(*) FROM t)", False),
+            ("view", "CREATE VIEW v AS SELECT 1", False),
+            ("trigger", "CREATE TRIGGER trg AFTER INSERT ON t FOR EACH ROW EXECUTE FUNCTION fn()", False),
+        ],
+    )
+    def test_self_contained(self, kind: DDLKind, ddl: str, expected: bool):
+        """Only a string body is stored as written; everything else is deparsed against the objects it references."""
+        assert parse_ddl(ddl, kind).self_contained is expected
+
+    def test_ensure_parsed_reuses_a_parsed_statement(self):
+        parsed = parse_ddl("CREATE VIEW v AS SELECT 1", "view")
+        assert ensure_parsed(parsed, "view") is parsed
+        assert ensure_parsed("CREATE VIEW v AS SELECT 1", "view") == parsed
+
+
+class TestDropStatement:
+    def test_function(self):
+        ddl = "CREATE FUNCTION public.add(a integer, b integer) RETURNS integer LANGUAGE sql AS $$ SELECT a + b $$"
+        assert drop_statement(ddl, "function") == "DROP FUNCTION public.add(int, int)"
+
+    def test_wrong_kind_raises(self):
+        with pytest.raises(ValueError, match="Cannot build a DROP statement from trigger DDL"):
+            drop_statement("CREATE VIEW v AS SELECT 1", "trigger")
+
+
+class TestReplaceTriggerStatement:
+    def test_adds_or_replace(self):
+        ddl = "CREATE TRIGGER trg BEFORE INSERT ON public.orders FOR EACH ROW WHEN (new.id > 0) EXECUTE FUNCTION f('a')"
+
+        assert replace_trigger_statement(ddl) == ddl.replace("CREATE TRIGGER", "CREATE OR REPLACE TRIGGER")
+
+    @pytest.mark.parametrize(
+        "ddl",
+        [
+            "CREATE CONSTRAINT TRIGGER trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION f()",
+            "CREATE VIEW v AS SELECT 1",
+            "CREATE TRIGGER a AFTER INSERT ON t EXECUTE FUNCTION f(); "
+            "CREATE TRIGGER b AFTER INSERT ON t EXECUTE FUNCTION f()",
+        ],
+    )
+    def test_none_unless_a_single_plain_trigger(self, ddl: str):
+        assert replace_trigger_statement(ddl) is None
+
+
+_FUNCTION = "CREATE OR REPLACE FUNCTION public.f(a integer, b text DEFAULT 'x') RETURNS SETOF integer LANGUAGE {}"
+
+
+def _function(attributes: str, language: str = "plpgsql", body: str = "BEGIN RETURN; END") -> str:
+    return _FUNCTION.format(language) + (f" {attributes}" if attributes else "") + f" AS $$ {body} $$"
+
+
+class TestAlterFunctionStatement:
+    def test_changes_only_what_differs(self):
+        current = _function("STABLE COST 5")
+        desired = _function("STABLE PARALLEL SAFE LEAKPROOF STRICT SECURITY DEFINER COST 5 ROWS 10")
+
+        assert alter_function_statement(current, desired) == (
+            "ALTER FUNCTION public.f(int, text) PARALLEL safe LEAKPROOF RETURNS NULL ON NULL INPUT SECURITY DEFINER "
+            "ROWS 10"
+        )
+
+    def test_left_out_attributes_return_to_their_defaults(self):
+        current = _function("IMMUTABLE PARALLEL SAFE LEAKPROOF STRICT SECURITY DEFINER COST 5 ROWS 10")
+
+        assert alter_function_statement(current, _function("")) == (
+            "ALTER FUNCTION public.f(int, text) VOLATILE PARALLEL unsafe NOT LEAKPROOF CALLED ON NULL INPUT "
+            "SECURITY INVOKER COST 100 ROWS 1000"
+        )
+
+    def test_default_cost_depends_on_the_language(self):
+        current = _FUNCTION.format("c") + " COST 5 AS 'lib', 'f'"
+
+        assert alter_function_statement(current, _FUNCTION.format("c") + " AS 'lib', 'f'") == (
+            "ALTER FUNCTION public.f(int, text) COST 1"
+        )
+
+    def test_changed_settings_are_all_set_again_in_order(self):
+        current = _function("SET search_path TO 'public' SET work_mem TO '64MB'")
+        desired = _function("SET work_mem TO '64MB' SET search_path TO 'public'")
+
+        assert alter_function_statement(current, desired) == (
+            'ALTER FUNCTION public.f(int, text) RESET ALL SET work_mem TO "64MB" SET search_path TO public'
+        )
+
+    def test_procedure(self):
+        current = "CREATE PROCEDURE p() LANGUAGE sql AS $$ SELECT 1 $$"
+        desired = "CREATE PROCEDURE p() LANGUAGE sql SECURITY DEFINER AS $$ SELECT 1 $$"
+
+        assert alter_function_statement(current, desired) == "ALTER PROCEDURE p() SECURITY DEFINER"
+
+    @pytest.mark.parametrize(
+        "desired",
+        [_function("STABLE", body="BEGIN RETURN NEXT 1; END"), _function("STABLE")],
+        ids=["body", "nothing"],
+    )
+    def test_none_unless_only_attributes_differ(self, desired: str):
+        assert alter_function_statement(_function("STABLE"), desired) is None
+
+    def test_none_when_the_language_differs(self):
+        assert alter_function_statement(_function("STABLE"), _function("IMMUTABLE", language="sql")) is None
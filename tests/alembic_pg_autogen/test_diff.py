@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+import pytest
+
 from alembic_pg_autogen import (
     Action,
     CanonicalState,
@@ -11,8 +15,12 @@ from alembic_pg_autogen import (
     ViewInfo,
     ViewOp,
     diff,
+    iter_diff,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 
 class TestActionEnum:
     """3.1 — Action enum members and values."""
@@ -385,3 +393,67 @@ class TestDiffViews:
         assert len(result.view_ops) == 3
         actions = {op.action for op in result.view_ops}
         assert actions == {Action.DROP, Action.REPLACE, Action.CREATE}
+
+
+class TestIterDiff:
+    """Merge-join over identity-ordered streams."""
+
+    def test_yields_each_op_before_reading_the_rest(self):
+        consumed: list[str] = []
+
+        def stream(*names: str) -> Iterator[ViewInfo]:
+            for name in names:
+                consumed.append(name)
+                yield ViewInfo("public", name, f"def {name}")
+
+        ops = iter_diff(stream("a", "c"), stream("b", "c"), ViewOp)
+        first = next(ops)
+
+        assert first.action is Action.DROP
+        assert first.current == ViewInfo("public", "a", "def a")
+        assert consumed == ["a", "b"], "one record of each side is read ahead, no more"
+        assert list(ops) == [ViewOp(Action.CREATE, None, ViewInfo("public", "b", "def b"))]
+
+    def test_replace_and_unchanged(self):
+        current = [FunctionInfo("public", "f", "", "old"), FunctionInfo("public", "g", "", "same")]
+        desired = [FunctionInfo("public", "f", "", "new"), FunctionInfo("public", "g", "", "same")]
+
+        ops = list(iter_diff(current, desired, FunctionOp))
+
+        assert ops == [FunctionOp(Action.REPLACE, current[0], desired[0])]
+
+    def test_matches_diff(self):
+        current = [ViewInfo("a", "v", "1"), ViewInfo("b", "v", "1"), ViewInfo("b", "w", "1")]
+        desired = [ViewInfo("a", "u", "1"), ViewInfo("b", "v", "2"), ViewInfo("c", "v", "1")]
+
+        ops = list(iter_diff(current, desired, ViewOp))
+
+        assert (
+            ops
+            == diff(
+                CanonicalState(functions=[], triggers=[], views=current),
+                CanonicalState(functions=[], triggers=[], views=desired),
+            ).view_ops
+        )
+
+    @pytest.mark.parametrize(
+        "names",
+        [pytest.param(["b", "a"], id="descending"), pytest.param(["a", "a"], id="repeated")],
+    )
+    def test_unordered_input_raises(self, names: list[str]):
+        records = [ViewInfo("public", name, "def") for name in names]
+
+        with pytest.raises(ValueError, match="desired records are not in ascending identity order"):
+            list(iter_diff([], records, ViewOp))
+
+    def test_diff_sorts_unordered_input(self):
+        later = ViewInfo("public", "b", "def")
+        first = ViewInfo("public", "a", "old")
+        repeated = ViewInfo("public", "a", "new")
+
+        result = diff(
+            CanonicalState(functions=[], triggers=[], views=[]),
+            CanonicalState(functions=[], triggers=[], views=[later, first, repeated]),
+        )
+
+        assert [op.desired for op in result.view_ops] == [repeated, later], "the last record of an identity wins"
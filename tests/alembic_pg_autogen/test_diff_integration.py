@@ -9,10 +9,13 @@ from sqlalchemy.engine import Engine
 from alembic_pg_autogen import (
     Action,
     CanonicalState,
+    FunctionOp,
     canonicalize,
     diff,
     inspect_functions,
     inspect_triggers,
+    iter_diff,
+    iter_functions,
 )
 
 
@@ -149,3 +152,16 @@ class TestDiffIntegration:
         # new_trg in desired but not current → CREATE
         create_ops = [op for op in result.trigger_ops if op.action is Action.CREATE]
         assert any(op.desired and op.desired.trigger_name == "new_trg" for op in create_ops)
+
+    def test_streamed_functions_merge_without_sorting(self, pg_conn: Connection):
+        """Catalog order agrees with Python's for mixed-case and punctuated names, whatever the collation."""
+        pg_conn.execute(text("CREATE SCHEMA diff_order"))
+        names = ["b_fn", '"B_fn"', '"_fn"', "a_fn", '"Z"']
+        for name in names:
+            pg_conn.execute(text(f"CREATE FUNCTION diff_order.{name}() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$"))
+
+        ops = list(iter_diff(iter_functions(pg_conn, ["diff_order"]), [], FunctionOp))
+
+        dropped = [op.current.name for op in ops if op.current is not None]
+        assert dropped == sorted(["b_fn", "B_fn", "_fn", "a_fn", "Z"])
+        assert all(op.action is Action.DROP for op in ops)
@@ -73,6 +73,12 @@ def _run_migration(project: AlembicProject, **attrs: object) -> str:
     return new_files.pop().read_text()
 
 
+def _replaces_triggers(project: AlembicProject) -> bool:
+    """Whether the server accepts ``CREATE OR REPLACE TRIGGER``, which trigger replacements then render as."""
+    with project.connect() as conn:
+        return (conn.dialect.server_version_info or ()) >= (14,)
+
+
 def _count(text: str, pattern: str) -> int:
     return len(re.findall(pattern, text, re.IGNORECASE))
 
@@ -168,6 +174,43 @@ RETURNS text LANGUAGE sql AS $$ SELECT 'goodbye'::text $$"""
             assert "hello" in fns[0].definition
 
 
+@pytest.mark.integration
+class TestAlterFunctionAttributes:
+    """Change only planner attributes and settings: the function is altered in place, its body never resent."""
+
+    def test_alter_and_rollback(self, alembic_project: AlembicProject) -> None:
+        schema = alembic_project.schema
+        alembic_project.execute(f"""\
+            CREATE FUNCTION {schema}.lookup(key integer) RETURNS SETOF text
+            LANGUAGE sql STABLE SET search_path = public, pg_temp SET work_mem = '64MB'
+            AS $$ SELECT 'body-' || key::text $$
+        """)
+        with alembic_project.connect() as conn:
+            before = inspect_functions(conn, [schema])
+
+        new_ddl = f"""\
+CREATE OR REPLACE FUNCTION {schema}.lookup(key integer) RETURNS SETOF text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE COST 5 ROWS 10 SET work_mem = '32MB'
+AS $$ SELECT 'body-' || key::text $$"""
+
+        content = _run_migration(alembic_project, pg_functions=[new_ddl])
+        body = _upgrade_body(content)
+        assert _count(body, r"ALTER FUNCTION") == 1
+        assert "CREATE OR REPLACE FUNCTION" not in content
+        assert "body-" not in content
+
+        with alembic_project.connect() as conn:
+            after = inspect_functions(conn, [schema])
+        assert "PARALLEL SAFE" in after[0].definition
+        assert "search_path" not in after[0].definition
+        # Altered in place, the function compares equal to its declaration.
+        assert "op.execute(" not in _upgrade_body(_autogenerate(alembic_project, pg_functions=[new_ddl]))
+
+        downgrade(alembic_project.config, "base")
+        with alembic_project.connect() as conn:
+            assert inspect_functions(conn, [schema]) == before
+
+
 @pytest.mark.integration
 class TestReplaceFunctionArgs:
     """Replace a function by changing its argument signature.
@@ -338,9 +381,13 @@ FOR EACH ROW EXECUTE FUNCTION {schema}.notify_fn()"""
         content = _run_migration(alembic_project, pg_functions=[fn_ddl], pg_triggers=[trg_ddl])
         body = _upgrade_body(content)
 
-        # Trigger replace is DROP + CREATE (no CREATE OR REPLACE TRIGGER in PG)
-        assert "DROP TRIGGER" in body
-        assert "CREATE TRIGGER" in body
+        # One atomic statement on PostgreSQL 14+, DROP + CREATE before that
+        if _replaces_triggers(alembic_project):
+            assert "DROP TRIGGER" not in content
+            assert _count(body, r"CREATE OR REPLACE TRIGGER") == 1
+        else:
+            assert "DROP TRIGGER" in body
+            assert "CREATE TRIGGER" in body
         assert "INSERT OR UPDATE" in content
 
         with alembic_project.connect() as conn:
@@ -653,8 +700,11 @@ FOR EACH ROW EXECUTE FUNCTION {schema}.log_item()"""
         content2 = _run_migration(alembic_project, pg_functions=[fn_v2], pg_triggers=[trg_v2])
         up2 = _upgrade_body(content2)
         assert "CREATE OR REPLACE FUNCTION" in up2  # function body changed
-        assert "DROP TRIGGER" in up2  # trigger replaced (DROP + CREATE)
-        assert "CREATE TRIGGER" in up2
+        if _replaces_triggers(alembic_project):
+            assert "CREATE OR REPLACE TRIGGER" in up2  # trigger replaced in one statement
+        else:
+            assert "DROP TRIGGER" in up2  # trigger replaced (DROP + CREATE)
+            assert "CREATE TRIGGER" in up2
 
         with alembic_project.connect() as conn:
             trgs = inspect_triggers(conn, [schema])
@@ -22,12 +22,14 @@ def test_check_constraint_exports_present():
     assert "CheckConstraintInfo" in alembic_pg_autogen.__all__
     assert "inspect_check_constraints" in alembic_pg_autogen.__all__
     assert "canonicalize_check_constraints" in alembic_pg_autogen.__all__
+    assert "canonicalize_all_check_constraints" in alembic_pg_autogen.__all__
     assert "current_schema" in alembic_pg_autogen.__all__
 
 
 def test_check_constraint_exports_importable():
     from alembic_pg_autogen import (
         CheckConstraintInfo,
+        canonicalize_all_check_constraints,
         canonicalize_check_constraints,
         current_schema,
         inspect_check_constraints,
@@ -36,6 +38,7 @@ def test_check_constraint_exports_importable():
     assert CheckConstraintInfo is not None
     assert inspect_check_constraints is not None
     assert canonicalize_check_constraints is not None
+    assert canonicalize_all_check_constraints is not None
     assert current_schema is not None
 
 
@@ -141,3 +144,121 @@ def test_ignored_exports_importable():
 
     assert IGNORED is not None
     assert Ignored is not None
+
+
+def test_inspect_catalog_exported():
+    import alembic_pg_autogen
+
+    assert "inspect_catalog" in alembic_pg_autogen.__all__
+
+
+def test_canonical_state_still_importable_from_canonicalize():
+    from alembic_pg_autogen import CanonicalState
+    from alembic_pg_autogen.canonicalize import CanonicalState as LegacyCanonicalState
+
+    assert LegacyCanonicalState is CanonicalState
+
+
+def test_canonicalization_cache_exported():
+    import alembic_pg_autogen
+
+    assert "CanonicalizationCache" in alembic_pg_autogen.__all__
+    assert "definition_digest" in alembic_pg_autogen.__all__
+
+
+def test_parsed_ddl_exported():
+    import alembic_pg_autogen
+
+    assert "ParsedDDL" in alembic_pg_autogen.__all__
+    assert "parse_ddl" in alembic_pg_autogen.__all__
+
+
+def test_observer_exports_importable():
+    import alembic_pg_autogen
+    from alembic_pg_autogen import Observer, Phase, add_observer, remove_observer
+
+    assert {"Observer", "Phase", "add_observer", "remove_observer"} <= set(alembic_pg_autogen.__all__)
+    assert Observer is not None
+    assert Phase is not None
+    assert add_observer is not None
+    assert remove_observer is not None
+
+
+def test_query_recorder_exported():
+    import alembic_pg_autogen
+
+    assert {"CallSiteSummary", "QueryRecord", "QueryRecorder"} <= set(alembic_pg_autogen.__all__)
+
+
+def test_query_budget_exported():
+    import alembic_pg_autogen
+
+    assert {"QueryBudget", "QueryBudgetExceeded", "query_budget"} <= set(alembic_pg_autogen.__all__)
+
+
+def test_streaming_inspection_exported():
+    import alembic_pg_autogen
+
+    assert {"iter_check_constraints", "iter_functions", "iter_triggers", "iter_views"} <= set(
+        alembic_pg_autogen.__all__
+    )
+
+
+def test_iter_diff_exported():
+    import alembic_pg_autogen
+
+    assert "iter_diff" in alembic_pg_autogen.__all__
+
+
+def test_catalog_record_exported():
+    import alembic_pg_autogen
+
+    assert "catalog_record" in alembic_pg_autogen.__all__
+
+
+def test_change_counter_exported():
+    import alembic_pg_autogen
+
+    assert {
+        "CatalogVersion",
+        "SnapshotCache",
+        "catalog_version",
+        "install_change_counter",
+        "uninstall_change_counter",
+    } <= set(alembic_pg_autogen.__all__)
+
+
+def test_inspect_catalog_parallel_exported():
+    import alembic_pg_autogen
+
+    assert "inspect_catalog_parallel" in alembic_pg_autogen.__all__
+
+
+def test_pipelining_helpers_exported():
+    import alembic_pg_autogen
+
+    assert {"apply_baseline", "sibling_connection"} <= set(alembic_pg_autogen.__all__)
+
+
+def test_shadow_database_exported():
+    import alembic_pg_autogen
+
+    assert "ShadowDatabase" in alembic_pg_autogen.__all__
+
+
+def test_hot_standby_exported():
+    import alembic_pg_autogen
+
+    assert {"HotStandby", "replay_lag"} <= set(alembic_pg_autogen.__all__)
+
+
+def test_copy_extraction_exported():
+    import alembic_pg_autogen
+
+    assert {"copy_catalog", "copy_functions", "copy_triggers", "copy_views"} <= set(alembic_pg_autogen.__all__)
+
+
+def test_alter_function_op_exported():
+    import alembic_pg_autogen
+
+    assert "AlterFunctionOp" in alembic_pg_autogen.__all__
@@ -4,21 +4,34 @@ from __future__ import annotations
 from collections.abc import Generator
 
 import pytest
-from sqlalchemy import Connection, text
+from sqlalchemy import Connection, event, text
 from sqlalchemy.engine import Engine
 
 from alembic_pg_autogen import (
+    CanonicalState,
     CheckConstraintInfo,
     FunctionInfo,
     TriggerInfo,
     ViewInfo,
+    canonicalize,
+    catalog_record,
+    copy_catalog,
+    copy_functions,
+    copy_triggers,
+    copy_views,
     current_schema,
+    definition_digest,
+    inspect_catalog,
     inspect_check_constraints,
     inspect_functions,
     inspect_triggers,
     inspect_views,
+    iter_check_constraints,
+    iter_functions,
+    iter_triggers,
+    iter_views,
 )
-from alembic_pg_autogen.inspect import _build_schema_filter
+from alembic_pg_autogen.inspect import _CATALOG_SECTIONS, _build_identity_filter, _build_schema_filter
 
 
 class TestFunctionInfoUnit:
@@ -92,6 +105,22 @@ class TestCheckConstraintInfoUnit:
         assert info[:-1] == ("myschema", "orders", "ck_orders_amount")
 
 
+class TestCatalogRecordUnit:
+    def test_identity_is_interned_and_payload_kept(self):
+        definition = "".join(["CREATE VIEW ", "v"])
+        first = catalog_record(ViewInfo, ["".join(["pub", "lic"]), "".join(["v"]), definition])
+        second = catalog_record(ViewInfo, ["".join(["pub", "lic"]), "".join(["w"]), definition])
+
+        assert first == ViewInfo("public", "v", "CREATE VIEW v")
+        assert first.schema is second.schema
+        assert first.definition is definition
+
+    def test_builds_any_record_type(self):
+        record = catalog_record(CheckConstraintInfo, ("s", "t", "ck", "(x > 0)"))
+
+        assert record == CheckConstraintInfo("s", "t", "ck", "(x > 0)")
+
+
 class TestBuildSchemaFilterUnit:
     """``_build_schema_filter`` decides which schemas a catalog query covers.
 
@@ -143,6 +172,42 @@ class TestBuildSchemaFilterUnit:
         assert params["schemas"] == ["public"]
 
 
+_FUNCTIONS, _TRIGGERS, _VIEWS = _CATALOG_SECTIONS
+
+
+class TestBuildIdentityFilterUnit:
+    """``_build_identity_filter`` pushes declared identities into a catalog section as array parameters."""
+
+    def test_none_applies_no_restriction(self):
+        assert _build_identity_filter(_FUNCTIONS, None) == ("true", {})
+
+    def test_each_component_is_its_own_array(self):
+        fragment, params = _build_identity_filter(_TRIGGERS, [("public", "orders", "trg"), (None, "t", "x")])
+
+        assert params == {
+            "triggers_identity_0": ["public", None],
+            "triggers_identity_1": ["orders", "t"],
+            "triggers_identity_2": ["trg", "x"],
+        }
+        assert "unnest(" in fragment
+        assert "coalesce(i.c0, current_schema())" in fragment
+        assert "t.tgname = i.c2" in fragment
+
+    def test_empty_sequence_matches_nothing(self):
+        fragment, params = _build_identity_filter(_VIEWS, [])
+
+        assert "unnest(" in fragment
+        assert params == {"views_identity_0": [], "views_identity_1": []}
+
+    def test_names_are_never_interpolated_into_sql(self):
+        hostile = "v'; DROP TABLE users; --"
+
+        fragment, params = _build_identity_filter(_VIEWS, [("public", hostile)])
+
+        assert hostile not in fragment
+        assert params["views_identity_1"] == [hostile]
+
+
 @pytest.fixture
 def pg_conn(pg_engine: Engine) -> Generator[Connection]:
     """Provide an isolated connection that rolls back all DDL after each test."""
@@ -430,6 +495,154 @@ class TestInspectCheckConstraintsIntegration:
         assert inspect_check_constraints(pg_conn, schemas=["nonexistent"]) == []
 
 
+@pytest.mark.integration
+class TestInspectCatalogIntegration:
+    @pytest.fixture
+    def populated(self, pg_conn: Connection) -> Connection:
+        pg_conn.execute(text("CREATE SCHEMA test_catalog"))
+        pg_conn.execute(text("CREATE TABLE test_catalog.t (id integer)"))
+        pg_conn.execute(
+            text("CREATE FUNCTION test_catalog.f(a integer) RETURNS integer LANGUAGE sql AS $$ SELECT a $$")
+        )
+        pg_conn.execute(text("CREATE FUNCTION test_catalog.f(a text) RETURNS text LANGUAGE sql AS $$ SELECT a $$"))
+        pg_conn.execute(
+            text("CREATE FUNCTION test_catalog.trg() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$")
+        )
+        pg_conn.execute(
+            text(
+                "CREATE TRIGGER b_trg BEFORE INSERT ON test_catalog.t FOR EACH ROW EXECUTE FUNCTION test_catalog.trg()"
+            )
+        )
+        pg_conn.execute(
+            text("CREATE TRIGGER a_trg AFTER INSERT ON test_catalog.t FOR EACH ROW EXECUTE FUNCTION test_catalog.trg()")
+        )
+        pg_conn.execute(text("CREATE VIEW test_catalog.v AS SELECT 'it''s: {}'::text AS quoted"))
+        return pg_conn
+
+    def test_matches_per_type_helpers(self, populated: Connection):
+        """The single-statement snapshot is exactly what the per-type helpers return, in the same order."""
+        state = inspect_catalog(populated, ["test_catalog"])
+
+        assert isinstance(state, CanonicalState)
+        assert list(state.functions) == list(inspect_functions(populated, ["test_catalog"]))
+        assert list(state.triggers) == list(inspect_triggers(populated, ["test_catalog"]))
+        assert list(state.views) == list(inspect_views(populated, ["test_catalog"]))
+        assert [f.name for f in state.functions] == ["f", "f", "trg"]
+        assert [t.trigger_name for t in state.triggers] == ["a_trg", "b_trg"]
+        assert all(isinstance(f, FunctionInfo) for f in state.functions)
+
+    def test_identifiers_are_shared_with_the_canonical_state(self, populated: Connection):
+        current = inspect_catalog(populated, ["test_catalog"])
+        desired = canonicalize(
+            populated,
+            view_ddl=["CREATE VIEW test_catalog.v AS SELECT 'changed'::text AS quoted"],
+            schemas=["test_catalog"],
+            declared_only=True,
+        )
+
+        assert current.functions[0].schema is current.triggers[0].schema
+        assert desired.views[0].schema is current.views[0].schema
+        assert desired.views[0].name is current.views[0].name
+
+    def test_definitions_survive_json_round_trip(self, populated: Connection):
+        state = inspect_catalog(populated, ["test_catalog"], functions=False, triggers=False)
+
+        assert len(state.views) == 1
+        assert "'it''s: {}'::text" in state.views[0].definition
+
+    def test_single_round_trip(self, populated: Connection):
+        statements: list[str] = []
+
+        def record(*args: object) -> None:
+            statements.append(str(args[2]))
+
+        event.listen(populated, "before_cursor_execute", record)
+        try:
+            inspect_catalog(populated, ["test_catalog"])
+        finally:
+            event.remove(populated, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+
+    def test_unrequested_types_are_empty_and_not_queried(self, populated: Connection):
+        state = inspect_catalog(populated, ["test_catalog"], functions=False, views=False)
+
+        assert state.functions == ()
+        assert state.views == ()
+        assert len(state.triggers) == 2
+
+    def test_nothing_requested_skips_the_query(self, pg_conn: Connection):
+        statements: list[str] = []
+
+        def record(*args: object) -> None:
+            statements.append(str(args[2]))
+
+        event.listen(pg_conn, "before_cursor_execute", record)
+        try:
+            state = inspect_catalog(pg_conn, functions=False, triggers=False, views=False)
+        finally:
+            event.remove(pg_conn, "before_cursor_execute", record)
+
+        assert state == CanonicalState(functions=(), triggers=(), views=())
+        assert statements == []
+
+    def test_nonexistent_schema_empty(self, pg_conn: Connection):
+        assert inspect_catalog(pg_conn, ["nonexistent"]) == CanonicalState(functions=[], triggers=[], views=[])
+
+    def test_identities_restrict_each_section(self, populated: Connection):
+        state = inspect_catalog(
+            populated,
+            function_identities=[("test_catalog", "f")],
+            trigger_identities=[("test_catalog", "t", "a_trg")],
+            view_identities=[("test_catalog", "missing")],
+        )
+
+        assert [(f.name, f.identity_args) for f in state.functions] == [("f", "a integer"), ("f", "a text")]
+        assert [t.trigger_name for t in state.triggers] == ["a_trg"]
+        assert state.views == []
+
+    def test_unqualified_identity_resolves_through_search_path(self, populated: Connection):
+        populated.execute(text("SET LOCAL search_path TO test_catalog"))
+
+        state = inspect_catalog(populated, function_identities=[(None, "trg")], triggers=False, views=False)
+
+        assert [(f.schema, f.name) for f in state.functions] == [("test_catalog", "trg")]
+
+    def test_identities_combine_with_schema_filter(self, populated: Connection):
+        state = inspect_catalog(populated, ["public"], function_identities=[("test_catalog", "f")])
+
+        assert state.functions == []
+
+    def test_digests_match_the_full_definitions(self, populated: Connection):
+        full = inspect_catalog(populated, ["test_catalog"])
+        digests = inspect_catalog(populated, ["test_catalog"], digests=True)
+
+        for full_items, digest_items in zip(full, digests, strict=True):
+            assert [item[:-1] for item in digest_items] == [item[:-1] for item in full_items]
+            assert [item[-1] for item in digest_items] == [definition_digest(item[-1]) for item in full_items]
+
+    def test_baseline_returns_only_changed_definitions_in_full(self, populated: Connection):
+        baseline = inspect_catalog(populated, ["test_catalog"], digests=True)
+        populated.execute(text("CREATE OR REPLACE VIEW test_catalog.v AS SELECT 'changed'::text AS quoted"))
+
+        state = inspect_catalog(populated, ["test_catalog"], baseline=baseline)
+
+        assert state.functions == baseline.functions
+        assert state.triggers == baseline.triggers
+        assert state.views[0].definition.startswith("CREATE OR REPLACE VIEW test_catalog.v AS")
+
+    def test_objects_missing_from_baseline_are_returned_in_full(self, populated: Connection):
+        baseline = CanonicalState(functions=[], triggers=[], views=[])
+
+        state = inspect_catalog(populated, ["test_catalog"], baseline=baseline)
+
+        assert state == inspect_catalog(populated, ["test_catalog"])
+
+    def test_digests_and_baseline_are_exclusive(self, pg_conn: Connection):
+        with pytest.raises(ValueError, match="mutually exclusive"):
+            inspect_catalog(pg_conn, digests=True, baseline=CanonicalState(functions=[], triggers=[], views=[]))
+
+
 @pytest.mark.integration
 class TestCurrentSchemaIntegration:
     def test_returns_search_path_head(self, pg_conn: Connection):
@@ -440,3 +653,136 @@ class TestCurrentSchemaIntegration:
         pg_conn.execute(text("SET search_path TO test_current_schema"))
 
         assert current_schema(pg_conn) == "test_current_schema"
+
+
+@pytest.mark.integration
+class TestIterIntegration:
+    """The streaming helpers yield what the list helpers return, a batch at a time."""
+
+    @pytest.fixture
+    def populated(self, pg_conn: Connection) -> Connection:
+        pg_conn.execute(text("CREATE SCHEMA test_iter"))
+        pg_conn.execute(text("CREATE TABLE test_iter.t (id integer CHECK (id > 0), n integer CHECK (n < 10))"))
+        for index in range(5):
+            pg_conn.execute(
+                text(f"CREATE FUNCTION test_iter.f{index}() RETURNS integer LANGUAGE sql AS $$ SELECT {index} $$")
+            )
+            pg_conn.execute(text(f"CREATE VIEW test_iter.v{index} AS SELECT {index} AS n"))
+        pg_conn.execute(
+            text("CREATE FUNCTION test_iter.trg() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$")
+        )
+        for name in ("b_trg", "a_trg"):
+            pg_conn.execute(
+                text(f"CREATE TRIGGER {name} AFTER INSERT ON test_iter.t FOR EACH ROW EXECUTE FUNCTION test_iter.trg()")
+            )
+        return pg_conn
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 1000])
+    def test_matches_the_catalog_snapshot(self, populated: Connection, batch_size: int):
+        state = inspect_catalog(populated, ["test_iter"])
+
+        assert list(iter_functions(populated, ["test_iter"], batch_size=batch_size)) == list(state.functions)
+        assert list(iter_triggers(populated, ["test_iter"], batch_size=batch_size)) == list(state.triggers)
+        assert list(iter_views(populated, ["test_iter"], batch_size=batch_size)) == list(state.views)
+        assert list(iter_check_constraints(populated, ["test_iter"], batch_size=batch_size)) == list(
+            inspect_check_constraints(populated, ["test_iter"])
+        )
+
+    def test_check_constraints_filter_by_table(self, populated: Connection):
+        assert list(iter_check_constraints(populated, ["test_iter"], ["missing"])) == []
+
+    def test_uses_a_server_side_cursor(self, populated: Connection):
+        options: list[object] = []
+
+        def record(_conn: object, _cursor: object, _statement: str, _params: object, context: object, _many: bool):
+            options.append(getattr(context, "execution_options", {}).get("stream_results"))
+
+        event.listen(populated, "before_cursor_execute", record)
+        try:
+            list(iter_functions(populated, ["test_iter"], batch_size=2))
+        finally:
+            event.remove(populated, "before_cursor_execute", record)
+
+        assert options == [True]
+
+    def test_connection_stays_usable_while_streaming(self, populated: Connection):
+        functions = iter_functions(populated, ["test_iter"], batch_size=1)
+        first = next(functions)
+
+        assert populated.execute(text("SELECT 1")).scalar() == 1
+        assert [first, *functions] == list(inspect_functions(populated, ["test_iter"]))
+
+    def test_abandoned_iterator_releases_the_cursor(self, populated: Connection):
+        functions = iter_functions(populated, ["test_iter"], batch_size=1)
+        next(functions)
+        del functions
+
+        cursors = populated.execute(text("SELECT count(*) FROM pg_cursors WHERE NOT is_holdable")).scalar()
+        assert cursors == 0
+
+    def test_batch_size_must_be_positive(self, pg_conn: Connection):
+        with pytest.raises(ValueError, match="batch_size"):
+            iter_views(pg_conn, batch_size=0)
+
+
+@pytest.mark.integration
+class TestCopyIntegration:
+    """The ``COPY`` helpers load what the cursor and JSON paths load."""
+
+    @pytest.fixture
+    def populated(self, pg_conn: Connection) -> Connection:
+        pg_conn.execute(text("CREATE SCHEMA test_copy"))
+        pg_conn.execute(text("CREATE TABLE test_copy.t (id integer)"))
+        pg_conn.execute(
+            text(
+                "CREATE FUNCTION test_copy.f(a text DEFAULT E'tab\\there') RETURNS text LANGUAGE sql"
+                " AS $$ SELECT a || E'\\n\\\\' $$"
+            )
+        )
+        pg_conn.execute(text("CREATE FUNCTION test_copy.g() RETURNS integer LANGUAGE sql AS $$ SELECT 2 $$"))
+        pg_conn.execute(
+            text("CREATE FUNCTION test_copy.trg() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$")
+        )
+        pg_conn.execute(
+            text("CREATE TRIGGER trg AFTER INSERT ON test_copy.t FOR EACH ROW EXECUTE FUNCTION test_copy.trg()")
+        )
+        pg_conn.execute(text("CREATE VIEW test_copy.v AS SELECT 'ünï\\cöde'::text AS quoted"))
+        return pg_conn
+
+    @pytest.mark.parametrize("binary", [True, False])
+    def test_matches_the_catalog_snapshot(self, populated: Connection, binary: bool):
+        state = copy_catalog(populated, ["test_copy"], binary=binary)
+
+        assert state == inspect_catalog(populated, ["test_copy"])
+        assert list(copy_functions(populated, ["test_copy"], binary=binary)) == list(
+            iter_functions(populated, ["test_copy"])
+        )
+        assert list(copy_triggers(populated, ["test_copy"], binary=binary)) == list(state.triggers)
+        assert list(copy_views(populated, ["test_copy"], binary=binary)) == list(state.views)
+
+    def test_skipped_object_types_are_empty(self, populated: Connection):
+        state = copy_catalog(populated, ["test_copy"], functions=False, views=False)
+
+        assert state.functions == ()
+        assert [trigger.trigger_name for trigger in state.triggers] == ["trg"]
+        assert state.views == ()
+
+    def test_abandoned_copy_leaves_the_transaction_usable(self, populated: Connection):
+        functions = copy_functions(populated, ["test_copy"])
+        next(functions)
+        del functions
+
+        assert populated.in_transaction()
+        assert populated.execute(text("SELECT to_regclass('test_copy.t') IS NOT NULL")).scalar()
+
+    def test_unadvanced_copy_leaves_the_connection_untouched(self, populated: Connection):
+        functions = copy_functions(populated, ["test_copy"])
+
+        assert populated.execute(text("SELECT to_regclass('test_copy.t') IS NOT NULL")).scalar()
+        assert [function.name for function in functions] == ["f", "g", "trg"]
+
+    def test_unsupported_driver_is_rejected_at_the_call(self, populated: Connection, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(populated.dialect, "driver", "psycopg2")
+
+        with pytest.raises(ValueError, match="psycopg2"):
+            copy_functions(populated, ["test_copy"])
@@ -0,0 +1,181 @@
+"""Tests for the phase-timing observer hooks."""
+
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Table
+from typing_extensions import override
+
+from alembic_pg_autogen import add_observer, remove_observer
+from alembic_pg_autogen.observe import observing, phase
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from alembic_pg_autogen import Phase
+
+    from .alembic_helpers import AlembicProject
+
+
+class _Recorder:
+    """Records every event it receives, in order."""
+
+    events: list[tuple[str, Phase]]
+    finished: list[tuple[Phase, float, dict[str, int]]]
+
+    def __init__(self) -> None:
+        self.events = []
+        self.finished = []
+
+    def phase_started(self, phase: Phase) -> None:
+        self.events.append(("started", phase))
+
+    def phase_finished(self, phase: Phase, seconds: float, counts: Mapping[str, int]) -> None:
+        self.events.append(("finished", phase))
+        self.finished.append((phase, seconds, dict(counts)))
+
+    def counts(self, phase: Phase) -> list[dict[str, int]]:
+        return [counts for name, _, counts in self.finished if name == phase]
+
+
+class _Broken(_Recorder):
+    """Records like :class:`_Recorder`, then fails."""
+
+    @override
+    def phase_started(self, phase: Phase) -> None:
+        super().phase_started(phase)
+        raise RuntimeError("metrics sink down")
+
+    @override
+    def phase_finished(self, phase: Phase, seconds: float, counts: Mapping[str, int]) -> None:
+        super().phase_finished(phase, seconds, counts)
+        raise RuntimeError("metrics sink down")
+
+
+@pytest.fixture
+def global_recorder() -> Generator[_Recorder]:
+    recorder = _Recorder()
+    add_observer(recorder)
+    yield recorder
+    remove_observer(recorder)
+
+
+class TestPhase:
+    def test_no_observers_still_yields_counts(self):
+        with phase("diff") as counts:
+            counts["ops"] = 3
+
+        assert counts == {"ops": 3}
+
+    def test_observers_see_start_then_finish_with_counts(self):
+        recorder = _Recorder()
+        with observing([recorder]), phase("diff") as counts:
+            assert recorder.events == [("started", "diff")]
+            counts["ops"] = 3
+
+        assert recorder.events == [("started", "diff"), ("finished", "diff")]
+        [(name, seconds, reported)] = recorder.finished
+        assert name == "diff"
+        assert seconds >= 0
+        assert reported == {"ops": 3}
+
+    def test_finish_is_reported_when_the_phase_raises(self):
+        recorder = _Recorder()
+        with pytest.raises(ValueError, match="boom"), observing([recorder]), phase("parse"):
+            raise ValueError("boom")
+
+        assert recorder.events == [("started", "parse"), ("finished", "parse")]
+
+    def test_observing_is_scoped_to_the_block(self):
+        recorder = _Recorder()
+        with observing([recorder]):
+            pass
+        with phase("order"):
+            pass
+
+        assert recorder.events == []
+
+    def test_global_observer_sees_every_phase(self, global_recorder: _Recorder):
+        with phase("filter"):
+            pass
+
+        assert global_recorder.events == [("started", "filter"), ("finished", "filter")]
+
+    def test_removed_observer_sees_nothing(self):
+        recorder = _Recorder()
+        add_observer(recorder)
+        remove_observer(recorder)
+        with phase("filter"):
+            pass
+
+        assert recorder.events == []
+
+    def test_remove_unregistered_observer_raises(self):
+        with pytest.raises(ValueError):
+            remove_observer(_Recorder())
+
+    def test_failing_observer_is_logged_and_ignored(self, caplog: pytest.LogCaptureFixture):
+        recorder = _Recorder()
+        with caplog.at_level(logging.WARNING, logger="alembic_pg_autogen.observe"):
+            with observing([_Broken(), recorder]), phase("render") as counts:
+                counts["ops"] = 1
+
+        assert recorder.finished == [("render", recorder.finished[0][1], {"ops": 1})]
+        assert len(caplog.records) == 2
+
+
+@pytest.mark.integration
+class TestObservedAutogenerate:
+    """A run configured with ``pg_observers`` reports every phase it goes through."""
+
+    def test_run_reports_each_phase(self, alembic_project: AlembicProject):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE TABLE {schema}.orders (id int, CONSTRAINT positive_id CHECK (id > 0))")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.answer() RETURNS int LANGUAGE sql AS $$ SELECT 41 $$")
+        metadata = MetaData()
+        Table("orders", metadata, Column("id", Integer), CheckConstraint("id >= 0", name="positive_id"), schema=schema)
+        recorder = _Recorder()
+
+        _autogenerate(
+            alembic_project,
+            target_metadata=metadata,
+            pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS int LANGUAGE sql AS $$ SELECT 42 $$"],
+            pg_views=[f"CREATE VIEW {schema}.ids AS SELECT id FROM {schema}.orders"],
+            pg_observers=[recorder],
+        )
+
+        seen = {name for name, _, _ in recorder.finished}
+        assert seen == {
+            "parse",
+            "inspect",
+            "canonicalize_execute",
+            "canonicalize_read_back",
+            "filter",
+            "diff",
+            "hydrate",
+            "order",
+            "render",
+            "check_constraints_inspect",
+            "check_constraints_canonicalize",
+        }
+        assert recorder.counts("parse") == [{"functions": 1, "views": 1}], "pg_triggers is not configured"
+        assert recorder.counts("order") == [{"ops": 2}]
+        assert len(recorder.counts("render")) == 4, "a replace and a create, each rendered for upgrade and downgrade"
+        assert recorder.counts("check_constraints_inspect") == [{"tables": 1, "constraints": 1}]
+        assert all(seconds >= 0 for _, seconds, _ in recorder.finished)
+
+    def test_observers_do_not_outlive_their_run(self, alembic_project: AlembicProject):
+        recorder = _Recorder()
+        _autogenerate(alembic_project, pg_functions=[], pg_observers=[recorder])
+        seen = len(recorder.events)
+        with phase("diff"):
+            pass
+
+        assert len(recorder.events) == seen
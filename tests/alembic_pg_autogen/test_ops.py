@@ -3,6 +3,7 @@ from __future__ import annotations
 from alembic.operations.ops import MigrateOperation
 
 from alembic_pg_autogen import (
+    AlterFunctionOp,
     CreateFunctionOp,
     CreateTriggerOp,
     CreateViewOp,
@@ -65,6 +66,40 @@ class TestReplaceFunctionOp:
         assert issubclass(ReplaceFunctionOp, MigrateOperation)
 
 
+_FN_PREFIX = "CREATE OR REPLACE FUNCTION public.fn() RETURNS integer LANGUAGE sql "
+FN_STABLE = FunctionInfo("public", "fn", "", _FN_PREFIX + "STABLE AS $$ SELECT 1 $$")
+FN_COSTLY = FunctionInfo("public", "fn", "", _FN_PREFIX + "STABLE COST 5 AS $$ SELECT 1 $$")
+
+
+class TestAlterFunctionOp:
+    def test_stores_current_desired_and_statement(self):
+        op = AlterFunctionOp(FN_A, FN_B, "ALTER FUNCTION audit.log_change() COST 5")
+        assert op.current is FN_A
+        assert op.desired is FN_B
+        assert op.statement == "ALTER FUNCTION audit.log_change() COST 5"
+
+    def test_reverse_swaps_and_alters_back(self):
+        rev = AlterFunctionOp(FN_STABLE, FN_COSTLY, "ALTER FUNCTION public.fn() COST 5").reverse()
+        assert isinstance(rev, AlterFunctionOp)
+        assert rev.current is FN_COSTLY
+        assert rev.desired is FN_STABLE
+        assert rev.statement == "ALTER FUNCTION public.fn() COST 100"
+
+    def test_reverse_replaces_when_no_alter_goes_back(self):
+        changed_body = FN_STABLE._replace(definition=_FN_PREFIX + "STABLE AS $$ SELECT 2 $$")
+        rev = AlterFunctionOp(changed_body, FN_STABLE, "ALTER FUNCTION public.fn() STABLE").reverse()
+        assert isinstance(rev, ReplaceFunctionOp)
+        assert rev.current is FN_STABLE
+        assert rev.desired is changed_body
+
+    def test_to_diff_tuple(self):
+        op = AlterFunctionOp(FN_A, FN_B, "ALTER FUNCTION audit.log_change() COST 5")
+        assert op.to_diff_tuple() == ("alter_function", "audit", "log_change", "")
+
+    def test_extends_migrate_operation(self):
+        assert issubclass(AlterFunctionOp, MigrateOperation)
+
+
 class TestDropFunctionOp:
     def test_stores_current(self):
         op = DropFunctionOp(FN_A)
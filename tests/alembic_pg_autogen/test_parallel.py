@@ -0,0 +1,274 @@
+"""Tests for catalog inspection on several connections under an exported snapshot."""
+
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import text
+
+from alembic_pg_autogen import (
+    IGNORED,
+    apply_baseline,
+    canonicalize,
+    inspect_catalog,
+    inspect_catalog_parallel,
+    parse_ddl,
+    sibling_connection,
+)
+from alembic_pg_autogen.compare import _canonicalize_alongside
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+    from sqlalchemy import Connection
+    from sqlalchemy.engine import Engine
+
+    from alembic_pg_autogen import CanonicalState, Phase
+
+    from .alembic_helpers import AlembicProject
+
+SCHEMAS = ["parallel_a", "parallel_b"]
+
+
+@pytest.fixture(scope="module")
+def catalog(pg_engine: Engine) -> Generator[list[str]]:
+    """Committed objects in two schemas, so that worker connections see them; dropped afterwards."""
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA parallel_a"))
+        conn.execute(text("CREATE SCHEMA parallel_b"))
+        conn.execute(text("CREATE TABLE parallel_a.events (id integer, at date)"))
+        conn.execute(
+            text("CREATE FUNCTION parallel_a.touch() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$")
+        )
+        for index in range(40):
+            schema = SCHEMAS[index % 2]
+            conn.execute(
+                text(f"CREATE FUNCTION {schema}.f{index}(x integer) RETURNS integer LANGUAGE sql AS $$ SELECT x $$")
+            )
+            conn.execute(text(f"CREATE FUNCTION {schema}.f{index}(x text) RETURNS text LANGUAGE sql AS $$ SELECT x $$"))
+        for index in range(10):
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER t{index} BEFORE INSERT ON parallel_a.events "
+                    "FOR EACH ROW EXECUTE FUNCTION parallel_a.touch()"
+                )
+            )
+            day = f"DATE '2020-01-0{index + 1}'"
+            conn.execute(text(f"CREATE VIEW parallel_b.v{index} AS SELECT id, {day} AS day FROM parallel_a.events"))
+    yield SCHEMAS
+    with pg_engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA parallel_a, parallel_b CASCADE"))
+
+
+@pytest.fixture
+def conn(pg_engine: Engine) -> Generator[Connection]:
+    with pg_engine.connect() as conn:
+        yield conn
+
+
+@pytest.mark.integration
+class TestInspectCatalogParallel:
+    @pytest.mark.parametrize("workers", [1, 2, 3, 8])
+    def test_matches_a_single_connection(self, conn: Connection, catalog: list[str], workers: int):
+        assert inspect_catalog_parallel(conn, catalog, workers=workers) == inspect_catalog(conn, catalog)
+
+    def test_matches_with_digests_and_a_subset_of_types(self, conn: Connection, catalog: list[str]):
+        parallel = inspect_catalog_parallel(conn, catalog, workers=3, triggers=False, digests=True)
+
+        assert parallel == inspect_catalog(conn, catalog, triggers=False, digests=True)
+        assert parallel.triggers == ()
+
+    def test_workers_take_the_callers_settings(self, conn: Connection, catalog: list[str]):
+        conn.execute(text("SET search_path TO parallel_a, public"))
+        conn.execute(text("SET DateStyle TO 'SQL, DMY'"))
+
+        parallel = inspect_catalog_parallel(conn, catalog, workers=2, functions=False, triggers=False)
+
+        assert parallel == inspect_catalog(conn, catalog, functions=False, triggers=False)
+        assert "FROM events" in parallel.views[0].definition, "the table is on the caller's search_path"
+        assert "'01/01/2020'::date" in parallel.views[0].definition
+
+    def test_unqualified_identities_resolve_against_the_callers_schema(self, conn: Connection, catalog: list[str]):
+        conn.execute(text("SET search_path TO parallel_b, public"))
+
+        parallel = inspect_catalog_parallel(
+            conn, catalog, workers=2, triggers=False, views=False, function_identities=[(None, "f1"), (None, "f2")]
+        )
+
+        assert [(f.schema, f.name) for f in parallel.functions] == [("parallel_b", "f1"), ("parallel_b", "f1")]
+
+    def test_own_writes_are_inspected_on_the_callers_connection(self, conn: Connection, catalog: list[str]):
+        conn.execute(text("CREATE FUNCTION parallel_a.uncommitted() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$"))
+        try:
+            parallel = inspect_catalog_parallel(conn, catalog, workers=4)
+
+            assert "uncommitted" in {f.name for f in parallel.functions}
+            assert parallel == inspect_catalog(conn, catalog)
+        finally:
+            conn.rollback()
+
+    def test_shards_partition_the_catalog(self, conn: Connection, catalog: list[str]):
+        shards = [inspect_catalog(conn, catalog, shard=(index, 3)) for index in range(3)]
+        whole = inspect_catalog(conn, catalog)
+
+        assert sorted(f for shard in shards for f in shard.functions) == list(whole.functions)
+        assert sum(len(shard.triggers) for shard in shards) == len(whole.triggers)
+        assert sum(len(shard.views) for shard in shards) == len(whole.views)
+
+    @pytest.mark.parametrize("shard", [(3, 3), (-1, 2)])
+    def test_shard_out_of_range_raises(self, conn: Connection, shard: tuple[int, int]):
+        with pytest.raises(ValueError, match="shard index"):
+            inspect_catalog(conn, shard=shard)
+
+    def test_workers_must_be_positive(self, conn: Connection):
+        with pytest.raises(ValueError, match="workers must be positive"):
+            inspect_catalog_parallel(conn, workers=0)
+
+
+@pytest.mark.integration
+class TestAutogenerateInspectWorkers:
+    def test_workers_find_the_same_changes(self, alembic_project: AlembicProject, caplog: pytest.LogCaptureFixture):
+        schema = alembic_project.schema
+        # As after a first upgrade, so that the autogenerate transaction writes nothing and can share its snapshot.
+        alembic_project.execute("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 41 $$")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+
+        with caplog.at_level(logging.DEBUG, logger="alembic_pg_autogen.parallel"):
+            content = _autogenerate(
+                alembic_project,
+                pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 42 $$"],
+                pg_inspect_workers=3,
+            )
+
+        assert any("on 3 connections" in record.message for record in caplog.records)
+        assert "SELECT 42" in content
+        assert f"DROP FUNCTION {schema}.stale()" in content
+
+    def test_a_transaction_that_wrote_inspects_alone(
+        self, alembic_project: AlembicProject, caplog: pytest.LogCaptureFixture
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+
+        # Without a version table, Alembic creates one in the autogenerate transaction.
+        with caplog.at_level(logging.DEBUG, logger="alembic_pg_autogen.parallel"):
+            content = _autogenerate(alembic_project, pg_functions=[], pg_inspect_workers=3)
+
+        assert any("inspecting on its own connection" in record.message for record in caplog.records)
+        assert f"DROP FUNCTION {schema}.stale()" in content
+
+
+class _PhaseThreads:
+    """Records the thread each phase starts on."""
+
+    def __init__(self) -> None:
+        self.threads: dict[Phase, str] = {}
+
+    def phase_started(self, phase: Phase) -> None:
+        self.threads[phase] = threading.current_thread().name
+
+    def phase_finished(self, _phase: Phase, _seconds: float, _counts: Mapping[str, int]) -> None:
+        pass
+
+
+@pytest.mark.integration
+class TestSiblingConnection:
+    def test_reads_the_callers_catalog_and_settings(self, conn: Connection, catalog: list[str]):
+        conn.execute(text("SET search_path TO parallel_b, public"))
+
+        with sibling_connection(conn, lock_timeout="2s") as sibling:
+            assert sibling is not None
+            assert sibling.execute(text("SELECT current_schema()")).scalar() == "parallel_b"
+            assert sibling.execute(text("SHOW lock_timeout")).scalar() == "2s"
+            assert inspect_catalog(sibling, catalog) == inspect_catalog(conn, catalog)
+
+    def test_none_after_the_caller_wrote(self, conn: Connection):
+        conn.execute(text("CREATE TEMPORARY TABLE scratch (id integer)"))
+
+        with sibling_connection(conn) as sibling:
+            assert sibling is None
+
+    def test_apply_baseline_matches_a_baseline_read_back(self, conn: Connection, catalog: list[str]):
+        baseline = inspect_catalog(conn, catalog, triggers=False, views=False, digests=True)
+        ddl = [
+            "CREATE FUNCTION parallel_a.f1(x integer) RETURNS integer LANGUAGE sql AS $$ SELECT x $$",
+            "CREATE FUNCTION parallel_b.f2(x integer) RETURNS integer LANGUAGE sql AS $$ SELECT x + 1 $$",
+        ]
+        full = canonicalize(conn, function_ddl=ddl, view_ddl=IGNORED, trigger_ddl=IGNORED, declared_only=True)
+
+        assert apply_baseline(full, baseline) == canonicalize(
+            conn, function_ddl=ddl, view_ddl=IGNORED, trigger_ddl=IGNORED, declared_only=True, baseline=baseline
+        )
+
+
+@pytest.mark.integration
+class TestAutogeneratePipeline:
+    def test_canonicalizes_on_another_thread(self, alembic_project: AlembicProject):
+        schema = alembic_project.schema
+        alembic_project.execute("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 41 $$")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+        threads = _PhaseThreads()
+
+        content = _autogenerate(
+            alembic_project,
+            pg_functions=[
+                f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 42 $$",
+                f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$",
+            ],
+            pg_pipeline=True,
+            pg_observers=[threads],
+        )
+
+        assert threads.threads["inspect"] != threads.threads["canonicalize_read_back"]
+        assert "SELECT 42" in content
+        assert f"DROP FUNCTION {schema}.stale()" in content
+        assert "same()" not in content, "an unchanged function must compare equal to its digest"
+
+    def test_a_transaction_that_wrote_runs_sequentially(
+        self, alembic_project: AlembicProject, caplog: pytest.LogCaptureFixture
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$")
+
+        with caplog.at_level(logging.INFO, logger="alembic_pg_autogen.compare"):
+            content = _autogenerate(
+                alembic_project,
+                pg_functions=[f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 2 $$"],
+                pg_pipeline=True,
+            )
+
+        assert any("pg_pipeline ignored" in record.message for record in caplog.records)
+        assert "SELECT 2" in content
+
+    def test_falls_back_when_the_sibling_waits_for_a_lock(
+        self, conn: Connection, catalog: list[str], caplog: pytest.LogCaptureFixture
+    ):
+        # Reading the view holds a lock on it until the transaction ends, which replacing it must wait for.
+        conn.execute(text("SELECT * FROM parallel_b.v0"))
+        declared = (
+            parse_ddl(
+                "CREATE VIEW parallel_b.v0 AS SELECT id, DATE '2021-01-01' AS day FROM parallel_a.events", "view"
+            ),
+        )
+
+        def inspect_current() -> CanonicalState:
+            return inspect_catalog(conn, catalog, functions=False, triggers=False, digests=True)
+
+        with caplog.at_level(logging.WARNING, logger="alembic_pg_autogen.compare"):
+            pipelined = _canonicalize_alongside(conn, inspect_current, IGNORED, IGNORED, declared, None)
+
+        assert pipelined is not None
+        current, canonical = pipelined
+        assert any("retrying on the migration connection" in record.message for record in caplog.records)
+        assert [view.name for view in canonical.views] == ["v0"]
+        assert canonical.views[0].definition != current.views[0].definition
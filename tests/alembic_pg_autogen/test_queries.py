@@ -0,0 +1,243 @@
+"""Tests for the statement recorder and query budgets."""
+
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Table, create_engine, text
+
+from alembic_pg_autogen import QueryBudget, QueryBudgetExceeded, QueryRecorder, inspect_catalog, query_budget
+from alembic_pg_autogen.queries import QueryRecord, _bind_sizes
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+
+    from sqlalchemy import Engine
+
+    from .alembic_helpers import AlembicProject
+
+
+def _record(call_site: str, seconds: float, *, rows: int | None = 1, received: int | None = 10) -> QueryRecord:
+    return QueryRecord("SELECT 1", call_site, (), seconds, rows, 8, received)
+
+
+class TestSummary:
+    def test_groups_by_call_site_slowest_first(self):
+        recorder = QueryRecorder()
+        recorder.records.extend([
+            _record("a:fast", 0.1),
+            _record("b:slow", 0.5),
+            _record("a:fast", 0.2, rows=None, received=None),
+        ])
+
+        [slow, fast] = recorder.summary()
+
+        assert slow.call_site == "b:slow"
+        assert fast == ("a:fast", 2, pytest.approx(0.3), 0.2, 1, 16, 10)
+
+    def test_table_lists_every_call_site(self):
+        recorder = QueryRecorder()
+        recorder.records.extend([_record("a:one", 0.1), _record("b:two", 0.2)])
+
+        table = recorder.format_table()
+
+        assert "a:one" in table
+        assert "b:two" in table
+
+    def test_json_round_trips(self, tmp_path: Path):
+        recorder = QueryRecorder()
+        recorder.records.append(_record("a:one", 0.1))
+        path = tmp_path / "queries.json"
+
+        recorder.write_json(path)
+        data = json.loads(path.read_text())
+
+        assert data["statements"] == 1
+        assert data["summary"][0]["call_site"] == "a:one"
+        assert data["records"][0] == recorder.records[0]._asdict() | {"bind_sizes": []}
+
+
+class TestBindSizes:
+    @pytest.mark.parametrize(
+        ("parameter_sets", "expected"),
+        [
+            ([dict[str, object]()], ()),
+            ([None], ()),
+            ([{"name": "abc", "none": None}], (3, 0)),
+            ([{"names": ["ab", "cde"]}], (5,)),
+            ([("é", b"\x00\x01", 42)], (2, 2, 2)),
+            ([{"a": "x"}, {"a": "yy"}], (3,)),
+        ],
+    )
+    def test_sizes(self, parameter_sets: list[object], expected: tuple[int, ...]):
+        assert _bind_sizes(parameter_sets) == expected
+
+
+@pytest.mark.integration
+class TestQueryRecorderIntegration:
+    def test_records_statements_with_their_call_site(self, pg_engine: Engine):
+        recorder = QueryRecorder()
+        with pg_engine.connect() as conn:
+            with recorder.recording(conn):
+                inspect_catalog(conn, ["public"])
+            conn.execute(text("SELECT 1"))
+
+        [record] = recorder.records
+        assert record.call_site == "alembic_pg_autogen.inspect:inspect_catalog"
+        assert record.rows == 1
+        assert record.bind_sizes == (len("public"),)
+        assert record.bytes_sent > len(record.sql)
+        assert record.bytes_received is not None
+        assert record.bytes_received > 0
+        assert record.seconds > 0
+
+    def test_statements_outside_the_package_name_their_caller(self, pg_engine: Engine):
+        recorder = QueryRecorder()
+        with pg_engine.connect() as conn, recorder.recording(conn):
+            conn.execute(text("SELECT 1"))
+
+        [record] = recorder.records
+        assert record.call_site.endswith(":test_statements_outside_the_package_name_their_caller")
+
+    def test_concurrent_statements_are_timed_apart(self, pg_engine: Engine):
+        """A quick statement on another thread does not cut short the timing of a slow one."""
+        recorder = QueryRecorder()
+        slow_started = threading.Event()
+
+        def slow() -> None:
+            with pg_engine.connect() as conn:
+                slow_started.set()
+                conn.execute(text("SELECT pg_sleep(0.3)"))
+
+        with recorder.recording(pg_engine):
+            thread = threading.Thread(target=slow)
+            thread.start()
+            slow_started.wait()
+            with pg_engine.connect() as conn:
+                time.sleep(0.1)
+                conn.execute(text("SELECT 1"))
+            thread.join()
+
+        seconds = {record.sql: record.seconds for record in recorder.records}
+        assert seconds["SELECT pg_sleep(0.3)"] >= 0.3
+        assert seconds["SELECT 1"] < 0.3
+
+    def test_records_an_autogenerate_run(self, alembic_project: AlembicProject):
+        schema = alembic_project.schema
+        recorder = QueryRecorder()
+        engine = alembic_project.config.attributes["connection"]
+
+        with recorder.recording(engine):
+            _autogenerate(
+                alembic_project,
+                pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS int LANGUAGE sql AS $$ SELECT 42 $$"],
+            )
+
+        sites = {summary.call_site for summary in recorder.summary()}
+        assert "alembic_pg_autogen.inspect:inspect_catalog" in sites
+        assert "alembic_pg_autogen.canonicalize:_execute_batch" in sites
+
+
+class TestQueryBudget:
+    @pytest.mark.parametrize(
+        ("budget", "counts", "expected"),
+        [
+            (QueryBudget(8), {}, 8),
+            (QueryBudget(8), {"tables": 100}, 8),
+            (QueryBudget(2, {"tables": 1}), {"tables": 5}, 7),
+            (QueryBudget(1, {"tables": 2, "views": 1}), {"tables": 3, "views": 4}, 11),
+        ],
+    )
+    def test_limit(self, budget: QueryBudget, counts: dict[str, int], expected: int):
+        assert budget.limit(counts) == expected
+
+    def test_limit_requires_every_charged_count(self):
+        with pytest.raises(ValueError, match="tables"):
+            QueryBudget(2, {"tables": 1}).limit({"views": 1})
+
+    def test_within_budget(self, sqlite_engine: Engine):
+        with query_budget(2) as recorder, sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+        assert len(recorder.records) == 2
+
+    def test_over_budget_lists_the_statements(self, sqlite_engine: Engine):
+        with pytest.raises(QueryBudgetExceeded, match="3 statements sent, but the budget allows 2") as excinfo:
+            with query_budget(QueryBudget(1, {"tables": 1}), tables=1), sqlite_engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+
+        assert excinfo.value.limit == 2
+        assert "test_over_budget_lists_the_statements" in str(excinfo.value)
+
+    def test_statements_on_every_engine_count(self, sqlite_engine: Engine):
+        """Workers, standbys and shadow databases have engines of their own; their statements count too."""
+        other = create_engine("sqlite://")
+        try:
+            with pytest.raises(QueryBudgetExceeded, match="2 statements sent, but the budget allows 1"):
+                with query_budget(1), sqlite_engine.connect() as conn, other.connect() as other_conn:
+                    conn.execute(text("SELECT 1"))
+                    other_conn.execute(text("SELECT 2"))
+        finally:
+            other.dispose()
+
+    def test_error_in_block_propagates_unchanged(self, sqlite_engine: Engine):
+        with pytest.raises(KeyError), query_budget(0), sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            raise KeyError("boom")
+
+    def test_fixture(
+        self, pg_query_budget: Callable[..., AbstractContextManager[QueryRecorder]], sqlite_engine: Engine
+    ):
+        with pytest.raises(QueryBudgetExceeded):
+            with pg_query_budget(0), sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+
+@pytest.fixture
+def sqlite_engine() -> Generator[Engine]:
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.integration
+class TestAutogenerateQueryBudget:
+    """Autogenerate sends a fixed number of statements however many tables and check constraints there are."""
+
+    @pytest.mark.parametrize("tables", [1, 16])
+    def test_round_trips_do_not_grow_with_tables(self, alembic_project: AlembicProject, tables: int):
+        schema = alembic_project.schema
+        metadata = MetaData()
+        for index in range(tables):
+            alembic_project.execute(f"CREATE TABLE {schema}.t{index} (id int, CONSTRAINT ck_{index} CHECK (id > 0))")
+            Table(
+                f"t{index}",
+                metadata,
+                Column("id", Integer),
+                CheckConstraint("id >= 0", name=f"ck_{index}"),
+                schema=schema,  # the default schema, which Alembic compares as unqualified
+            )
+        with query_budget(QueryBudget(_AUTOGENERATE_BUDGET), tables=tables):
+            content = _autogenerate(
+                alembic_project,
+                target_metadata=metadata,
+                pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS int LANGUAGE sql AS $$ SELECT 42 $$"],
+            )
+
+        assert content.count("create_check_constraint") == 2 * tables, "once for upgrade, once for downgrade"
+
+
+_AUTOGENERATE_BUDGET = 32
+"""Alembic's own reflection accounts for most of these; this package's comparators send about ten."""
@@ -8,6 +8,7 @@ import pytest
 
 from alembic_pg_autogen.inspect import FunctionInfo, TriggerInfo, ViewInfo
 from alembic_pg_autogen.ops import (
+    AlterFunctionOp,
     CreateFunctionOp,
     CreateTriggerOp,
     CreateViewOp,
@@ -20,6 +21,7 @@ from alembic_pg_autogen.ops import (
 )
 from alembic_pg_autogen.render import (
     _quote_ddl,
+    _render_alter_function,
     _render_create_function,
     _render_create_trigger,
     _render_create_view,
@@ -95,6 +97,22 @@ class TestRenderDropFunction:
         assert result == """op.execute('DROP FUNCTION "My Schema"."My Func"()')"""
 
 
+_FUNCTION_PREFIX = "CREATE OR REPLACE FUNCTION public.fn(a integer) RETURNS integer LANGUAGE sql "
+
+
+class TestRenderAlterFunction:
+    def test_renders_the_computed_statement(self):
+        current = FunctionInfo("public", "fn", "a integer", _FUNCTION_PREFIX + "STABLE AS $$ SELECT a $$")
+        desired = FunctionInfo(
+            "public", "fn", "a integer", _FUNCTION_PREFIX + "STABLE PARALLEL SAFE COST 5 AS $$ SELECT a $$"
+        )
+        op = AlterFunctionOp(current, desired, "ALTER FUNCTION public.fn(int) PARALLEL safe COST 5")
+
+        result = _render_alter_function(_ctx(), op)
+
+        assert result == "op.execute('ALTER FUNCTION public.fn(int) PARALLEL safe COST 5')"
+
+
 class TestRenderCreateTrigger:
     def test_simple_ddl(self):
         ddl = "CREATE TRIGGER audit_trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION audit.log()"
@@ -104,21 +122,66 @@ class TestRenderCreateTrigger:
         assert "CREATE TRIGGER audit_trg" in result
 
 
+def _versioned_ctx(version: tuple[int, ...] | None) -> MagicMock:
+    """Return a mock AutogenContext whose connection reports *version*, or with no connection for *None*."""
+    ctx = _ctx()
+    if version is None:
+        ctx.connection = None
+    else:
+        ctx.connection.dialect.server_version_info = version
+    return ctx
+
+
+_CURRENT_TRIGGER = TriggerInfo(
+    "public",
+    "orders",
+    "audit_trg",
+    "CREATE TRIGGER audit_trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION audit.log()",
+)
+_DESIRED_TRIGGER = TriggerInfo(
+    "public",
+    "orders",
+    "audit_trg",
+    "CREATE TRIGGER audit_trg AFTER INSERT OR UPDATE ON public.orders FOR EACH ROW EXECUTE FUNCTION audit.log()",
+)
+
+
 class TestRenderReplaceTrigger:
-    def test_emits_two_statements(self):
-        current_ddl = "CREATE TRIGGER audit_trg AFTER INSERT ON public.orders FOR EACH ROW EXECUTE FUNCTION audit.log()"
-        current = TriggerInfo("public", "orders", "audit_trg", current_ddl)
-        desired_ddl = (
-            "CREATE TRIGGER audit_trg AFTER INSERT OR UPDATE ON public.orders FOR EACH ROW EXECUTE FUNCTION audit.log()"
-        )
-        desired = TriggerInfo("public", "orders", "audit_trg", desired_ddl)
-        op = ReplaceTriggerOp(current, desired)
-        result = _render_replace_trigger(_ctx(), op)
+    @pytest.mark.parametrize("version", [(13, 14), None])
+    def test_emits_two_statements(self, version: tuple[int, ...] | None):
+        op = ReplaceTriggerOp(_CURRENT_TRIGGER, _DESIRED_TRIGGER)
+        result = _render_replace_trigger(_versioned_ctx(version), op)
         assert isinstance(result, list)
         assert len(result) == 2
         assert result[0] == "op.execute('DROP TRIGGER audit_trg ON public.orders')"
         assert "CREATE TRIGGER audit_trg" in result[1]
 
+    @pytest.mark.parametrize("version", [(14, 0), (16, 2)])
+    def test_replaces_in_one_statement(self, version: tuple[int, ...]):
+        result = _render_replace_trigger(_versioned_ctx(version), ReplaceTriggerOp(_CURRENT_TRIGGER, _DESIRED_TRIGGER))
+
+        assert result == (
+            "op.execute('CREATE OR REPLACE TRIGGER audit_trg AFTER INSERT OR UPDATE ON public.orders "
+            "FOR EACH ROW EXECUTE FUNCTION audit.log()')"
+        )
+
+    @pytest.mark.parametrize("constraint", ["current", "desired"])
+    def test_constraint_triggers_keep_two_statements(self, constraint: str):
+        def made_constraint(info: TriggerInfo) -> TriggerInfo:
+            return info._replace(definition=info.definition.replace("CREATE TRIGGER", "CREATE CONSTRAINT TRIGGER"))
+
+        current, desired = _CURRENT_TRIGGER, _DESIRED_TRIGGER
+        if constraint == "current":
+            current = made_constraint(current)
+        else:
+            desired = made_constraint(desired)
+        op = ReplaceTriggerOp(current, desired)
+
+        result = _render_replace_trigger(_versioned_ctx((16, 2)), op)
+
+        assert isinstance(result, list)
+        assert result[0] == "op.execute('DROP TRIGGER audit_trg ON public.orders')"
+
 
 class TestRenderDropTrigger:
     def test_drop_trigger(self):
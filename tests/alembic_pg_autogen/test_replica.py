@@ -0,0 +1,229 @@
+"""Tests for inspecting the current state on a hot standby."""
+
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Numeric, Table, create_engine, event, text
+
+from alembic_pg_autogen import HotStandby, inspect_catalog, replay_lag
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from sqlalchemy import Connection
+    from sqlalchemy.engine import Engine
+
+    from .alembic_helpers import AlembicProject
+
+REPLICA_URL_ENV_VAR = "ALEMBIC_PG_AUTOGEN_TEST_REPLICA_URL"
+"""A streaming replica of the database the tests run against; tests that need one are skipped without it."""
+
+
+@pytest.fixture(scope="module")
+def standby_engine() -> Generator[Engine]:
+    """The standby named by :data:`REPLICA_URL_ENV_VAR`."""
+    url = os.environ.get(REPLICA_URL_ENV_VAR)
+    if not url:
+        pytest.skip(f"{REPLICA_URL_ENV_VAR} is not set")
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def conn(pg_engine: Engine) -> Generator[Connection]:
+    with pg_engine.connect() as conn:
+        yield conn
+
+
+@pytest.fixture
+def replicated(pg_engine: Engine, standby_engine: Engine) -> Generator[str]:
+    """A committed schema with a view, replayed on the standby; dropped afterwards."""
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA replica_test"))
+        conn.execute(text("CREATE VIEW replica_test.day AS SELECT DATE '2021-02-03' AS day"))
+    _wait_for_replay(pg_engine, standby_engine)
+    yield "replica_test"
+    with pg_engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA replica_test CASCADE"))
+
+
+def _wait_for_replay(pg_engine: Engine, standby_engine: Engine) -> None:
+    deadline = time.monotonic() + 10
+    with pg_engine.connect() as primary:
+        while True:
+            with standby_engine.connect() as standby:
+                if replay_lag(primary, standby) == 0.0:
+                    return
+            assert time.monotonic() < deadline, "the standby did not catch up"
+            time.sleep(0.05)
+
+
+@pytest.mark.integration
+class TestHotStandby:
+    def test_a_primary_is_no_standby(self, conn: Connection, pg_engine: Engine, caplog: pytest.LogCaptureFixture):
+        with pg_engine.connect() as other:
+            assert replay_lag(conn, other) is None
+
+        with caplog.at_level(logging.WARNING), HotStandby(pg_engine).inspecting(conn) as inspector:
+            assert inspector is conn
+        assert any("is not a hot standby" in record.message for record in caplog.records)
+
+    def test_unreachable_standby(self, conn: Connection, pg_engine: Engine, caplog: pytest.LogCaptureFixture):
+        standby = HotStandby(pg_engine.url.set(database="alembic_pg_autogen_no_such_database"))
+
+        with caplog.at_level(logging.WARNING), standby.inspecting(conn) as inspector:
+            assert inspector is conn
+        assert any("cannot connect to the standby" in record.message for record in caplog.records)
+
+    def test_a_failing_session_setup_is_closed_and_reported(
+        self, conn: Connection, pg_engine: Engine, caplog: pytest.LogCaptureFixture
+    ):
+        engine = create_engine(pg_engine.url)
+        checked_out: list[int] = []
+
+        # A query before SET TRANSACTION makes it fail, as a canceled statement or a recovery conflict would.
+        @event.listens_for(engine, "checkout")
+        def query_first(dbapi_connection: Any, *_args: Any) -> None:
+            checked_out.append(1)
+            dbapi_connection.cursor().execute("SELECT 1")
+
+        @event.listens_for(engine, "checkin")
+        def returned(*_args: Any) -> None:
+            checked_out.append(-1)
+
+        try:
+            with caplog.at_level(logging.WARNING), HotStandby(engine).inspecting(conn) as inspector:
+                assert inspector is conn
+                assert checked_out == [1, -1], "the standby connection is closed before the block runs"
+        finally:
+            engine.dispose()
+        assert any("cannot set up the standby session" in record.message for record in caplog.records)
+
+    def test_a_transaction_that_wrote_is_inspected_itself(self, conn: Connection, pg_engine: Engine):
+        conn.execute(text("CREATE TEMPORARY TABLE scratch (id integer)"))
+        # Connecting would fail, so a warning-free fallback shows the standby was never tried.
+        standby = HotStandby(pg_engine.url.set(database="alembic_pg_autogen_no_such_database"))
+
+        with standby.inspecting(conn) as inspector:
+            assert inspector is conn
+
+    def test_negative_max_lag(self, pg_engine: Engine):
+        with pytest.raises(ValueError, match="must not be negative"):
+            HotStandby(pg_engine, max_lag=-1)
+
+    def test_inspects_on_the_standby(self, conn: Connection, standby_engine: Engine, replicated: str):
+        conn.execute(text("SET DateStyle = 'SQL, DMY'"))
+        expected = inspect_catalog(conn, [replicated])
+
+        with HotStandby(standby_engine).inspecting(conn) as inspector:
+            assert inspector is not conn
+            assert inspector.execute(text("SELECT pg_is_in_recovery()")).scalar()
+            state = inspect_catalog(inspector, [replicated])
+
+        assert state == expected
+        assert "03/02/2021" in state.views[0].definition
+
+    def test_falls_back_when_too_far_behind(
+        self, pg_engine: Engine, standby_engine: Engine, replicated: str, caplog: pytest.LogCaptureFixture
+    ):
+        with standby_engine.connect() as control:
+            control.execute(text("SELECT pg_wal_replay_pause()"))
+            try:
+                with pg_engine.begin() as writer:
+                    writer.execute(text(f"CREATE VIEW {replicated}.later AS SELECT 1 AS one"))
+                time.sleep(0.1)
+                with (
+                    pg_engine.connect() as conn,
+                    caplog.at_level(logging.INFO),
+                    HotStandby(standby_engine, max_lag=0).inspecting(conn) as inspector,
+                ):
+                    assert inspector is conn
+            finally:
+                control.execute(text("SELECT pg_wal_replay_resume()"))
+        assert any("the standby is" in record.message for record in caplog.records)
+
+
+@pytest.mark.integration
+class TestAutogenerateReplica:
+    def test_current_state_from_the_standby(
+        self,
+        alembic_project: AlembicProject,
+        pg_engine: Engine,
+        standby_engine: Engine,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 41 $$")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+        _wait_for_replay(pg_engine, standby_engine)
+
+        with caplog.at_level(logging.DEBUG, logger="alembic_pg_autogen.replica"):
+            content = _autogenerate(
+                alembic_project,
+                pg_replica_url=standby_engine,
+                pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 42 $$"],
+            )
+
+        assert any("Inspecting the standby" in record.message for record in caplog.records)
+        assert "SELECT 42" in content
+        assert f"DROP FUNCTION {schema}.stale()" in content
+
+    def test_definitions_are_hydrated_from_the_standby(
+        self, alembic_project: AlembicProject, pg_engine: Engine, standby_engine: Engine
+    ):
+        """The downgrade of a drop renders what the standby inspected, though the primary has moved on since."""
+        schema = alembic_project.schema
+        alembic_project.execute("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)")
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+        _wait_for_replay(pg_engine, standby_engine)
+        with standby_engine.connect() as control:
+            control.execute(text("SELECT pg_wal_replay_pause()"))
+            try:
+                alembic_project.execute(f"DROP FUNCTION {schema}.stale()")
+                content = _autogenerate(
+                    alembic_project,
+                    pg_replica_url=HotStandby(standby_engine, max_lag=3600),
+                    pg_functions=[f"CREATE FUNCTION {schema}.answer() RETURNS integer LANGUAGE sql AS $$ SELECT 42 $$"],
+                )
+            finally:
+                control.execute(text("SELECT pg_wal_replay_resume()"))
+
+        assert f"DROP FUNCTION {schema}.stale()" in content
+        assert "SELECT 0" in content
+
+    def test_check_constraints_from_the_standby(
+        self,
+        alembic_project: AlembicProject,
+        pg_engine: Engine,
+        standby_engine: Engine,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        alembic_project.execute("CREATE TABLE alembic_version (version_num varchar(32) PRIMARY KEY)")
+        alembic_project.execute("CREATE TABLE orders (id serial PRIMARY KEY, amount numeric)")
+        alembic_project.execute("ALTER TABLE orders ADD CONSTRAINT ck_orders_amount CHECK (amount >= 0)")
+        _wait_for_replay(pg_engine, standby_engine)
+        metadata = MetaData()
+        Table(
+            "orders",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("amount", Numeric()),
+            CheckConstraint("amount > 0", name="ck_orders_amount"),
+        )
+
+        with caplog.at_level(logging.DEBUG, logger="alembic_pg_autogen.replica"):
+            content = _autogenerate(alembic_project, target_metadata=metadata, pg_replica_url=standby_engine)
+
+        assert any("Inspecting the standby" in record.message for record in caplog.records)
+        assert "create_check_constraint" in content
@@ -9,6 +9,7 @@ from alembic.util import PriorityDispatchResult
 from alembic_pg_autogen import IGNORED, CanonicalState, FunctionInfo, TriggerInfo, ViewInfo
 from alembic_pg_autogen.canonicalize import _declared
 from alembic_pg_autogen.compare import _compare_pg_objects, _filter_to_declared, _resolve_ddl
+from alembic_pg_autogen.ddl import parse_ddl
 from alembic_pg_autogen.sentinels import _IgnoredSentinel
 
 
@@ -43,7 +44,7 @@ class TestFilterToDeclaredIgnored:
     """``_filter_to_declared`` short-circuits ignored object types.
 
     The connection is never touched for an ignored type — no DDL is parsed and ``current_schema()`` is not read — so
-    this test can pass ``None`` as the connection.
+    this test can pass ``None`` as the run context.
     """
 
     def _state(self) -> CanonicalState:
@@ -54,8 +55,8 @@ class TestFilterToDeclaredIgnored:
         )
 
     def test_all_ignored_yields_empty_desired_state(self):
-        no_conn: Any = None
-        desired = _filter_to_declared(self._state(), IGNORED, IGNORED, IGNORED, no_conn)
+        no_run: Any = None
+        desired = _filter_to_declared(self._state(), IGNORED, IGNORED, IGNORED, no_run)
 
         assert list(desired.functions) == []
         assert list(desired.triggers) == []
@@ -63,14 +64,18 @@ class TestFilterToDeclaredIgnored:
 
 
 class TestDeclared:
-    """``_declared`` maps the sentinel to "no DDL to execute"."""
+    """``_declared`` maps the sentinel to "no DDL to execute" and parses everything else."""
 
     def test_ignored_is_empty(self):
-        assert list(_declared(IGNORED)) == []
+        assert list(_declared(IGNORED, "view")) == []
 
-    def test_sequence_passes_through(self):
-        ddl = ["CREATE VIEW v AS SELECT 1"]
-        assert _declared(ddl) is ddl
+    def test_strings_are_parsed(self):
+        (parsed,) = _declared(["CREATE VIEW v AS SELECT 1"], "view")
+        assert parsed.or_replace == "CREATE OR REPLACE VIEW v AS SELECT 1"
+
+    def test_parsed_ddl_passes_through(self):
+        parsed = parse_ddl("CREATE VIEW v AS SELECT 1", "view")
+        assert _declared([parsed], "view")[0] is parsed
 
 
 class TestComparatorShortCircuit:
@@ -0,0 +1,208 @@
+"""Tests for canonicalizing declared DDL in a shadow database."""
+
+# pyright: reportPrivateUsage=false
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, text
+from sqlalchemy.pool import NullPool
+
+from alembic_pg_autogen import QueryRecorder, ShadowDatabase, canonicalize
+
+from .test_autogenerate import _autogenerate
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from sqlalchemy import URL, Connection
+    from sqlalchemy.engine import Engine
+
+    from alembic_pg_autogen import CanonicalState
+
+    from .alembic_helpers import AlembicProject
+
+SHADOW = "alembic_pg_autogen_shadow"
+TEMPLATE = "alembic_pg_autogen_shadow_template"
+
+
+def _admin(pg_engine: Engine) -> Engine:
+    """An autocommit engine on the test server, for creating and dropping databases."""
+    return create_engine(pg_engine.url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+
+
+@pytest.fixture(scope="module")
+def shadow_url(pg_engine: Engine) -> Generator[URL]:
+    """An empty scratch database next to the test database, plus a template holding a table; dropped afterwards."""
+    admin = _admin(pg_engine)
+    with admin.connect() as conn:
+        conn.execute(text(f"CREATE DATABASE {SHADOW}"))
+        conn.execute(text(f"CREATE DATABASE {TEMPLATE}"))
+    with create_engine(pg_engine.url.set(database=TEMPLATE), poolclass=NullPool).begin() as conn:
+        conn.execute(text("CREATE TABLE public.lookup (code text)"))
+    yield pg_engine.url.set(database=SHADOW)
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {SHADOW} WITH (FORCE)"))
+        conn.execute(text(f"DROP DATABASE IF EXISTS {TEMPLATE} WITH (FORCE)"))
+
+
+@pytest.fixture
+def conn(pg_engine: Engine) -> Generator[Connection]:
+    """A migration connection with a schema and a table of its own, rolled back afterwards."""
+    with pg_engine.connect() as conn:
+        txn = conn.begin()
+        conn.execute(text("CREATE SCHEMA shadow_test"))
+        conn.execute(text("CREATE TABLE shadow_test.events (id integer)"))
+        yield conn
+        txn.rollback()
+
+
+def _respelled(url: URL) -> URL:
+    """*url* with the server spelled differently: the default port made explicit, or ``localhost`` by its address."""
+    if url.port is None:
+        return url.set(port=5432)
+    if url.host == "localhost":
+        return url.set(host="127.0.0.1")
+    pytest.skip(f"No other spelling known for {url.host}:{url.port}")
+
+
+def _events(metadata: MetaData, schema: str) -> Table:
+    return Table("events", metadata, Column("id", Integer), schema=schema)
+
+
+@pytest.mark.integration
+class TestShadowDatabase:
+    def test_canonicalizes_as_the_migration_database_does(self, conn: Connection, shadow_url: URL):
+        conn.execute(text("SET LOCAL DateStyle = 'SQL, DMY'"))
+        metadata = MetaData()
+        _events(metadata, "shadow_test")
+        conn.execute(text("SET LOCAL search_path = shadow_test"))
+
+        def declared(target: Connection) -> CanonicalState:
+            return canonicalize(
+                target,
+                function_ddl=[
+                    "CREATE FUNCTION shadow_test.touch() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$"
+                ],
+                trigger_ddl=[
+                    "CREATE TRIGGER touch BEFORE INSERT ON shadow_test.events "
+                    "FOR EACH ROW EXECUTE FUNCTION shadow_test.touch()"
+                ],
+                view_ddl=["CREATE VIEW shadow_test.recent AS SELECT id, DATE '2021-02-03' AS day FROM events"],
+                declared_only=True,
+            )
+
+        expected = declared(conn)
+        with ShadowDatabase(shadow_url).prepared(conn, metadata) as scratch:
+            state = declared(scratch)
+
+        assert state == expected
+        assert "03/02/2021" in state.views[0].definition
+
+    def test_leaves_the_shadow_database_unchanged(self, conn: Connection, shadow_url: URL):
+        metadata = MetaData()
+        _events(metadata, "shadow_test")
+
+        with ShadowDatabase(shadow_url).prepared(conn, metadata) as scratch:
+            assert scratch.execute(text("SELECT to_regclass('shadow_test.events')")).scalar() is not None
+
+        with create_engine(shadow_url, poolclass=NullPool).connect() as scratch:
+            assert scratch.execute(text("SELECT to_regnamespace('shadow_test')")).scalar() is None
+
+    def test_refuses_the_migration_database(self, conn: Connection, pg_engine: Engine):
+        with pytest.raises(ValueError, match="is the migration database"), ShadowDatabase(pg_engine.url).prepared(conn):
+            pass
+
+    @pytest.mark.parametrize("alias", ["respelled", "pooler"])
+    def test_refuses_an_alias_of_the_migration_database(self, conn: Connection, pg_engine: Engine, alias: str):
+        """A URL that reaches the migration database under another host, port or name is still refused."""
+        if alias == "respelled":
+            shadow: Engine | URL = _respelled(pg_engine.url)
+        else:
+            # A pooler maps a database name of its own onto a real one; the shadow URL never names the live database.
+            args, kwargs = pg_engine.dialect.create_connect_args(pg_engine.url)
+            shadow = create_engine(
+                pg_engine.url.set(database="alembic_pg_autogen_alias"),
+                creator=lambda: pg_engine.dialect.loaded_dbapi.connect(*args, **kwargs),
+                poolclass=NullPool,
+            )
+
+        with pytest.raises(ValueError, match="is the migration database"), ShadowDatabase(shadow).prepared(conn):
+            pass
+
+    def test_reset_refuses_an_alias_of_the_migration_database(self, conn: Connection, pg_engine: Engine):
+        database = conn.execute(text("SELECT current_database()")).scalar_one()
+
+        with pytest.raises(ValueError, match=f"Refusing to drop the shadow database {database}"):
+            ShadowDatabase(_respelled(pg_engine.url), template=TEMPLATE).reset(conn)
+
+        assert conn.execute(text("SELECT 1")).scalar_one() == 1
+
+    def test_reset_requires_a_template(self, conn: Connection, shadow_url: URL):
+        with pytest.raises(ValueError, match="without a template"):
+            ShadowDatabase(shadow_url).reset(conn)
+
+    def test_reset_clones_the_template(self, conn: Connection, shadow_url: URL):
+        with ShadowDatabase(shadow_url, template=TEMPLATE).prepared(conn) as scratch:
+            state = canonicalize(
+                scratch,
+                view_ddl=["CREATE VIEW shadow_test.codes AS SELECT code FROM public.lookup"],
+                declared_only=True,
+            )
+
+        assert [view.name for view in state.views] == ["codes"]
+
+
+@pytest.mark.integration
+class TestAutogenerateShadow:
+    def test_trigger_on_a_table_the_revision_creates(self, alembic_project: AlembicProject, shadow_url: URL):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.stale() RETURNS integer LANGUAGE sql AS $$ SELECT 0 $$")
+        metadata = MetaData()
+        _events(metadata, schema)
+        recorder = QueryRecorder()
+
+        with recorder.recording(alembic_project.config.attributes["connection"]):
+            content = _autogenerate(
+                alembic_project,
+                target_metadata=metadata,
+                pg_shadow_url=shadow_url.render_as_string(hide_password=False),
+                pg_functions=[
+                    f"CREATE FUNCTION {schema}.touch() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN RETURN NEW; END $$"
+                ],
+                pg_triggers=[
+                    f"CREATE TRIGGER touch BEFORE INSERT ON {schema}.events FOR EACH ROW EXECUTE FUNCTION {schema}.touch()"
+                ],
+            )
+
+        assert "op.create_table('events'" in content
+        assert "CREATE TRIGGER touch" in content
+        assert f"DROP FUNCTION {schema}.stale()" in content
+        # The declared DDL never ran on the migration database, not even inside a savepoint.
+        statements = [record.sql.lstrip().upper() for record in recorder.records]
+        assert statements
+        assert not [sql for sql in statements if sql.startswith(("SAVEPOINT", "CREATE FUNCTION", "CREATE TRIGGER"))]
+
+    def test_pipelined_with_a_shadow_after_writing(
+        self, alembic_project: AlembicProject, shadow_url: URL, caplog: pytest.LogCaptureFixture
+    ):
+        schema = alembic_project.schema
+        alembic_project.execute(f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$")
+
+        with caplog.at_level(logging.INFO, logger="alembic_pg_autogen.compare"):
+            content = _autogenerate(
+                alembic_project,
+                pg_shadow_url=ShadowDatabase(shadow_url),
+                pg_pipeline=True,
+                pg_functions=[
+                    f"CREATE FUNCTION {schema}.same() RETURNS integer LANGUAGE sql AS $$ SELECT 1 $$",
+                    f"CREATE FUNCTION {schema}.added() RETURNS integer LANGUAGE sql AS $$ SELECT 2 $$",
+                ],
+            )
+
+        assert not any("pg_pipeline ignored" in record.message for record in caplog.records)
+        assert "added()" in content
+        assert "same()" not in content, "an unchanged function must compare equal to its digest"